@@ -0,0 +1,7 @@
+"""
+Benchmark harness for the backend endpoints
+
+Run from the ``backend/`` directory:
+    python -m benchmarks.run --backend digitalocean --catalog-size 10000
+    python -m benchmarks.compare baseline.json candidate.json
+"""
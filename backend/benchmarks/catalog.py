@@ -0,0 +1,105 @@
+"""
+Synthetic product catalog generator
+
+Deterministic for a given size and seed, so runs are comparable. Catalogs
+from 1k to 1M products can be built in memory or written as a JSON Lines
+feed for ``shopping_core.import_catalog``:
+
+    python -m benchmarks.catalog 100000 --output products.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+from typing import Dict, Iterator, List, Tuple
+
+GROUPS = {
+    "electronics": (
+        ["laptop", "phone", "tablet", "headphones", "monitor", "camera", "speaker"],
+        ["wireless", "4k", "bluetooth", "noise cancelling", "portable", "gaming"],
+    ),
+    "clothing": (
+        ["jacket", "jeans", "shirt", "hoodie", "dress", "sweater", "coat"],
+        ["cotton", "slim fit", "waterproof", "organic", "lightweight", "vintage"],
+    ),
+    "footwear": (
+        ["sneakers", "boots", "sandals", "running shoes", "loafers", "slippers"],
+        ["leather", "cushioned", "breathable", "trail", "memory foam", "suede"],
+    ),
+    "home": (
+        ["blender", "lamp", "vacuum", "coffee maker", "air fryer", "kettle"],
+        ["smart", "stainless steel", "cordless", "compact", "energy efficient"],
+    ),
+    "books": (
+        ["novel", "cookbook", "biography", "guide", "anthology", "workbook"],
+        ["bestselling", "illustrated", "hardcover", "classic", "beginner"],
+    ),
+    "sports": (
+        ["yoga mat", "dumbbells", "bike helmet", "tent", "backpack", "racket"],
+        ["adjustable", "ultralight", "foldable", "professional", "durable"],
+    ),
+    "beauty": (
+        ["moisturizer", "serum", "shampoo", "perfume", "lipstick", "sunscreen"],
+        ["vegan", "fragrance free", "hydrating", "long lasting", "spf 50"],
+    ),
+    "toys": (
+        ["puzzle", "building set", "plush", "board game", "drone", "robot kit"],
+        ["educational", "remote control", "wooden", "family", "collectible"],
+    ),
+}
+
+BRANDS = [
+    "Acme", "Northwind", "Contoso", "Globex", "Initech", "Umbrella", "Stark",
+    "Wayne", "Hooli", "Vandelay", "Tyrell", "Soylent", "Aperture", "Cyberdyne",
+]  # fmt: skip
+
+
+def generate_entries(size: int, seed: int = 42) -> Iterator[Tuple[str, Dict]]:
+    """Yield ``size`` ``(group, product)`` pairs"""
+    rng = random.Random(seed)
+    groups = list(GROUPS)
+    for i in range(size):
+        group = groups[i % len(groups)]
+        nouns, features = GROUPS[group]
+        noun = rng.choice(nouns)
+        feature, other = rng.sample(features, 2)
+        brand = rng.choice(BRANDS)
+        yield group, {
+            "id": f"{group}_{i}",
+            "name": f"{brand} {feature.title()} {noun.title()}",
+            "price": round(rng.lognormvariate(4, 0.9), 2),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "category": group,
+            "description": f"{feature.capitalize()} {noun} by {brand}, {other} design",
+            "image": f"https://example.com/images/{group}_{i}.png",
+        }
+
+
+def generate_catalog(size: int, seed: int = 42) -> Dict[str, List[Dict]]:
+    """``{group: [product, ...]}`` catalog with ``size`` products"""
+    catalog: Dict[str, List[Dict]] = {group: [] for group in GROUPS}
+    for group, product in generate_entries(size, seed):
+        catalog[group].append(product)
+    return catalog
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("size", type=int, help="number of products")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="-", help="JSON Lines file, - for stdout")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for group, product in generate_entries(args.size, args.seed):
+            out.write(json.dumps({"group": group, **product}) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Compare two benchmark result files
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+
+Prints the change in throughput and latency percentiles per route and
+concurrency level, and exits with status 1 when any route regressed by
+more than ``--threshold`` (throughput down or p95 latency up).
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Tuple
+
+
+def load_results(path: str) -> Dict[Tuple[str, int], Dict]:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return {(r["route"], r["concurrency"]): r for r in report["results"]}
+
+
+def change(before: float, after: float) -> float:
+    """Relative change from ``before`` to ``after``"""
+    if not before:
+        return 0.0
+    return (after - before) / before
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative regression that fails the comparison (default 0.1)",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+
+    header = (
+        f"{'route':<28} {'conc':>5} {'rps':>9} {'p50':>9}"
+        f" {'p95':>9} {'p99':>9}  status"
+    )
+    print(header)
+    print("-" * len(header))
+
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        rps = change(before["throughput_rps"], after["throughput_rps"])
+        p50 = change(before["p50_ms"], after["p50_ms"])
+        p95 = change(before["p95_ms"], after["p95_ms"])
+        p99 = change(before["p99_ms"], after["p99_ms"])
+
+        regressed = rps < -args.threshold or p95 > args.threshold
+        regressions += regressed
+        route, concurrency = key
+        print(
+            f"{route:<28} {concurrency:>5} {rps:>+9.1%} {p50:>+9.1%}"
+            f" {p95:>+9.1%} {p99:>+9.1%}  {'❌ regressed' if regressed else '✅'}"
+        )
+
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        side = "baseline" if key in baseline else "candidate"
+        print(f"{key[0]:<28} {key[1]:>5}  only in {side}")
+
+    if regressions:
+        print(
+            f"\n❌ {regressions} route(s) regressed by more than {args.threshold:.0%}"
+        )
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+"""
+Load test the backend endpoints
+
+Starts the stub upstream model and the chosen backend on a synthetic
+catalog, then drives every route at each concurrency level for a fixed
+duration and records throughput and latency percentiles:
+
+    python -m benchmarks.run --backend digitalocean --catalog-size 100000 \\
+        --concurrency 1,8,32 --duration 10 --output results.json
+
+Results are written as JSON (see ``benchmarks.compare`` to diff two runs).
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from .serve import BACKEND_ROOT, BACKENDS
+
+# Whole-catalog GET /products is skipped above this size
+FULL_CATALOG_LIMIT = 10000
+
+SEARCH_TERMS = [
+    "laptop", "wireless headphones", "running shoes", "jacket", "coffee maker",
+    "novel", "yoga mat", "serum", "board game", "gaming", "leather boots",
+]  # fmt: skip
+CHAT_MESSAGES = [
+    "What {term} do you have?",
+    "Can you recommend a good {term} under $100?",
+    "I'm looking for {term} as a gift",
+    "Which {term} has the best rating?",
+    "Show me your cheapest {term}",
+]
+
+
+class Scenario:
+    """One route under test: ``send(client, rng)`` issues a single request"""
+
+    def __init__(self, name: str, path: str, send: Callable[..., Awaitable]):
+        self.name = name
+        self.path = path
+        self.send = send
+
+
+def build_scenarios(sample_ids: List[str], catalog_size: int) -> List[Scenario]:
+    def chat_message(rng: random.Random) -> Dict:
+        message = rng.choice(CHAT_MESSAGES).format(term=rng.choice(SEARCH_TERMS))
+        return {"message": message, "customer_id": f"bench-{rng.randrange(1000)}"}
+
+    async def root(client, rng):
+        return await client.get("/")
+
+    async def products_page(client, rng):
+        cursor = rng.choice(sample_ids)
+        return await client.get("/products", params={"limit": 24, "cursor": cursor})
+
+    async def products_all(client, rng):
+        return await client.get("/products")
+
+    async def product(client, rng):
+        return await client.get(f"/products/{rng.choice(sample_ids)}")
+
+    async def search(client, rng):
+        body = {"query": rng.choice(SEARCH_TERMS)}
+        if rng.random() < 0.5:
+            body["max_price"] = rng.choice([25, 50, 100, 250])
+        if rng.random() < 0.3:
+            body["min_rating"] = 4.0
+        return await client.post("/products/search", json=body)
+
+    async def categories(client, rng):
+        return await client.get("/categories")
+
+    async def chat(client, rng):
+        return await client.post("/chat", json=chat_message(rng))
+
+    async def chat_stream(client, rng):
+        async with client.stream(
+            "POST", "/chat/stream", json=chat_message(rng)
+        ) as response:
+            async for _ in response.aiter_bytes():
+                pass
+            return response
+
+    async def chat_batch(client, rng):
+        body = {"requests": [chat_message(rng) for _ in range(10)]}
+        return await client.post("/chat/batch", json=body)
+
+    async def memory_search(client, rng):
+        return await client.get("/memory/search", params={"query": "preferences"})
+
+    async def health(client, rng):
+        return await client.get("/health")
+
+    scenarios = [
+        Scenario("GET /", "/", root),
+        Scenario("GET /products?limit=24", "/products", products_page),
+        Scenario("GET /products/{id}", "/products/{product_id}", product),
+        Scenario("POST /products/search", "/products/search", search),
+        Scenario("GET /categories", "/categories", categories),
+        Scenario("POST /chat", "/chat", chat),
+        Scenario("POST /chat/stream", "/chat/stream", chat_stream),
+        Scenario("POST /chat/batch (10)", "/chat/batch", chat_batch),
+        Scenario("GET /memory/search", "/memory/search", memory_search),
+        Scenario("GET /health", "/health", health),
+    ]
+    if catalog_size <= FULL_CATALOG_LIMIT:
+        scenarios.insert(1, Scenario("GET /products", "/products", products_all))
+    return scenarios
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    # Rounded first so float noise (0.07 * 100 = 7.000000000000001) keeps its rank
+    rank = max(math.ceil(round(fraction * len(sorted_values), 9)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+async def measure(
+    base_url: str, scenario: Scenario, concurrency: int, duration: float, seed: int
+) -> Dict:
+    """Drive one scenario with ``concurrency`` workers for ``duration`` seconds"""
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=120.0
+    ) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(worker_id: int):
+            nonlocal errors
+            rng = random.Random(seed * 1000 + worker_id)
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await scenario.send(client, rng)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies.append(time.perf_counter() - started)
+                errors += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    to_ms = 1000.0
+    return {
+        "route": scenario.name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": (
+            round(sum(latencies) / len(latencies) * to_ms, 2) if latencies else 0.0
+        ),
+        "p50_ms": round(percentile(latencies, 0.50) * to_ms, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * to_ms, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * to_ms, 2),
+        "max_ms": round(latencies[-1] * to_ms, 2) if latencies else 0.0,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=2.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not start within {timeout:.0f}s")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: List[Dict]) -> None:
+    header = (
+        f"{'route':<28} {'conc':>5} {'req':>7} {'err':>5} {'rps':>9}"
+        f" {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['route']:<28} {r['concurrency']:>5} {r['requests']:>7}"
+            f" {r['errors']:>5} {r['throughput_rps']:>9.1f} {r['p50_ms']:>9.1f}"
+            f" {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the backend endpoints")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="digitalocean")
+    parser.add_argument("--catalog-size", type=int, default=1000)
+    parser.add_argument(
+        "--store",
+        choices=["memory", "sqlite"],
+        default="memory",
+        help="serve the synthetic catalog from memory or a SQLite store",
+    )
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument(
+        "--duration", type=float, default=5.0, help="seconds per route and level"
+    )
+    parser.add_argument(
+        "--upstream-latency", type=float, default=0.3, help="stub model latency (s)"
+    )
+    parser.add_argument(
+        "--routes", default="", help="comma separated route name filter (substring)"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--workdir", help="directory for Memori and catalog databases (reused)"
+    )
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.concurrency.split(",") if level]
+    workdir = args.workdir or tempfile.mkdtemp(prefix="shopping-bench-")
+    os.makedirs(workdir, exist_ok=True)
+
+    upstream_port, app_port = free_port(), free_port()
+    upstream_url = f"http://127.0.0.1:{upstream_port}"
+    base_url = f"http://127.0.0.1:{app_port}"
+
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(
+            filter(None, [BACKEND_ROOT, os.environ.get("PYTHONPATH")])
+        ),
+        # DigitalOcean backend
+        agent_endpoint=upstream_url,
+        agent_access_key="benchmark",
+        # Swarms (LiteLLM) and Memori use the OpenAI SDK
+        OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "benchmark"),
+        OPENAI_BASE_URL=f"{upstream_url}/v1",
+        OPENAI_API_BASE=f"{upstream_url}/v1",
+    )
+
+    processes = []
+    try:
+        upstream = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.stub_upstream"]
+            + ["--port", str(upstream_port)]
+            + ["--latency", str(args.upstream_latency)],
+            cwd=workdir,
+            env=env,
+        )
+        processes.append(upstream)
+        app = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.serve", args.backend]
+            + ["--catalog-size", str(args.catalog_size)]
+            + ["--store", args.store, "--seed", str(args.seed)]
+            + ["--port", str(app_port)],
+            cwd=workdir,
+            env=env,
+        )
+        processes.append(app)
+
+        print(f"⏳ Starting {args.backend} backend ({args.catalog_size} products)...")
+        wait_until_ready(f"{upstream_url}/docs", upstream, args.startup_timeout)
+        started = time.monotonic()
+        wait_until_ready(f"{base_url}/", app, args.startup_timeout)
+        startup_s = time.monotonic() - started
+
+        paths = set(httpx.get(f"{base_url}/openapi.json").json()["paths"])
+        sample = httpx.get(
+            f"{base_url}/products", params={"limit": 500, "fields": "id"}
+        ).json()
+        sample_ids = [product["id"] for product in sample]
+
+        route_filters = [name.strip() for name in args.routes.split(",") if name]
+        scenarios = [
+            scenario
+            for scenario in build_scenarios(sample_ids, args.catalog_size)
+            if scenario.path in paths
+            and (
+                not route_filters
+                or any(name in scenario.name for name in route_filters)
+            )
+        ]
+
+        results = []
+        for scenario in scenarios:
+            for level in levels:
+                print(f"🏃 {scenario.name} @ {level}")
+                results.append(
+                    asyncio.run(
+                        measure(base_url, scenario, level, args.duration, args.seed)
+                    )
+                )
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "backend": args.backend,
+            "catalog_size": args.catalog_size,
+            "store": args.store,
+            "concurrency": levels,
+            "duration_s": args.duration,
+            "upstream_latency_s": args.upstream_latency,
+            "startup_s": round(startup_s, 3),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as out:
+        json.dump(report, out, indent=2)
+
+    print()
+    print_table(results)
+    print(f"\n📄 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
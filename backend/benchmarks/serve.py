@@ -0,0 +1,78 @@
+"""
+Start a backend app on a synthetic catalog
+
+Used by ``benchmarks.run`` to launch the app under test in its own process:
+
+    python -m benchmarks.serve digitalocean --catalog-size 10000 --port 9200
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+from .catalog import generate_catalog, generate_entries
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKENDS = {
+    "catalog": "shopping_core",
+    "digitalocean": "with-digital-ocean-agent",
+    "swarms": "with-swarms-agent",
+}
+
+
+def prepare_sqlite_catalog(size: int, seed: int, directory: str) -> str:
+    """SQLite catalog URL for a synthetic catalog, imported once and reused"""
+    from shopping_core.store import open_store
+
+    path = os.path.abspath(os.path.join(directory, f"catalog_{size}_{seed}.db"))
+    url = f"sqlite:///{path}"
+    if not os.path.exists(path):
+        store = open_store(url)
+        try:
+            store.bulk_import(generate_entries(size, seed))
+        finally:
+            store.close()
+    return url
+
+
+def load_app(backend: str, catalog_size: int, store: str, seed: int):
+    """Import a backend's FastAPI app serving a synthetic catalog"""
+    if store == "sqlite":
+        os.environ["CATALOG_URL"] = prepare_sqlite_catalog(
+            catalog_size, seed, os.getcwd()
+        )
+    else:
+        os.environ.pop("CATALOG_URL", None)
+
+    sys.path.insert(0, BACKEND_ROOT)
+    if backend == "catalog":
+        # Catalog-only worker, no agent
+        backend_main = importlib.import_module("shopping_core.catalog_app")
+    else:
+        sys.path.insert(0, os.path.join(BACKEND_ROOT, BACKENDS[backend]))
+        backend_main = importlib.import_module("main")
+
+    if store == "memory":
+        backend_main.product_catalog.load(generate_catalog(catalog_size, seed))
+    return backend_main.app
+
+
+def main(argv=None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a backend for benchmarking")
+    parser.add_argument("backend", choices=sorted(BACKENDS))
+    parser.add_argument("--catalog-size", type=int, default=1000)
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=9200)
+    args = parser.parse_args(argv)
+
+    app = load_app(args.backend, args.catalog_size, args.store, args.seed)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Stub upstream model
+
+A minimal OpenAI-compatible chat completions server with configurable
+latency, so the backends can be benchmarked without a real model:
+
+    python -m benchmarks.stub_upstream --port 9100 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPLY = (
+    "Here are a few products from our catalog that match what you are "
+    "looking for, along with why each one might suit you."
+)
+
+app = FastAPI(title="Stub upstream model")
+app.state.latency = 0.3
+app.state.token_latency = 0.01
+
+
+def completion_chunk(content: str, finish_reason=None) -> str:
+    chunk = {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "stub",
+        "choices": [
+            {"index": 0, "delta": {"content": content}, "finish_reason": finish_reason}
+        ],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+@app.post("/api/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    await asyncio.sleep(app.state.latency)
+
+    if body.get("stream"):
+
+        async def stream():
+            for word in REPLY.split(" "):
+                yield completion_chunk(word + " ")
+                await asyncio.sleep(app.state.token_latency)
+            yield completion_chunk("", finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    prompt_tokens = sum(
+        len(str(message.get("content", "")).split())
+        for message in body.get("messages", [])
+    )
+    completion_tokens = len(REPLY.split())
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": REPLY},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def main(argv=None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Stub upstream model")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument(
+        "--latency", type=float, default=0.3, help="seconds before the reply starts"
+    )
+    parser.add_argument(
+        "--token-latency", type=float, default=0.01, help="seconds per streamed token"
+    )
+    args = parser.parse_args(argv)
+
+    app.state.latency = args.latency
+    app.state.token_latency = args.token_latency
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
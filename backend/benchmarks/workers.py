@@ -0,0 +1,208 @@
+"""
+Multi-worker write test
+
+Starts N worker processes that all write conversation records to one SQLite
+database at the same time, through the DigitalOcean backend's write path: a
+``WriteBehindQueue`` per worker whose batches are written record by record
+with ``write_each``, each record retried while another worker holds the
+write lock and invalidating cached memory when it states a new fact. Only
+Memori's ``record_conversation`` is replaced, by a one-row insert. Then it
+checks that every record and every invalidation arrived exactly once:
+
+    python -m benchmarks.workers --workers 8 --records 2000
+
+Exits 1 if anything was lost or duplicated. A short ``--busy-timeout``
+forces lock contention so the retry path is exercised.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+# Allow running from the backend directory without installing anything
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shopping_core.memory import (  # noqa: E402
+    MemoryContextCache,
+    WriteBehindQueue,
+    prepare_memory_database,
+    retry_when_locked,
+    write_each,
+)
+from shopping_core.shared_cache import open_shared_cache  # noqa: E402
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS conversations (
+        worker INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        customer_id TEXT NOT NULL,
+        user_input TEXT NOT NULL,
+        ai_output TEXT NOT NULL,
+        PRIMARY KEY (worker, seq)
+    )
+"""
+
+# Every n-th record states a customer fact and invalidates cached memory
+FACT_EVERY = 5
+
+
+def run_worker(
+    worker: int,
+    database: str,
+    shared_cache_url: str,
+    records: int,
+    batch_size: int,
+    busy_timeout: float,
+    start,
+    results,
+) -> None:
+    path = database[len("sqlite:///") :]
+    local = threading.local()
+    context_cache = MemoryContextCache(shared=open_shared_cache(shared_cache_url))
+    counters = {"retried_records": 0}
+
+    def record_conversation(record: Dict) -> None:
+        # Stands in for Memori: one committed row per conversation. The writer
+        # thread and inline backpressure writes use their own connections.
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            connection = local.connection = sqlite3.connect(
+                path, timeout=busy_timeout, isolation_level=None
+            )
+        connection.execute(
+            "INSERT INTO conversations VALUES"
+            " (:worker, :seq, :customer_id, :user_input, :ai_output)",
+            record,
+        )
+
+    def write_memory_record(record: Dict) -> None:
+        # As the backend's write_memory_record, plus a count of lock retries
+        try:
+            record_conversation(record)
+        except sqlite3.OperationalError:
+            counters["retried_records"] += 1
+            retry_when_locked(record_conversation, record, retries=10, delay=0.01)
+        if record["seq"] % FACT_EVERY == 0:
+            context_cache.invalidate(record["customer_id"])
+
+    def write_batch(batch: List[Dict]) -> None:
+        write_each(write_memory_record, batch)
+
+    writer = WriteBehindQueue(
+        write_batch, max_size=1000, batch_size=batch_size, name=f"writer-{worker}"
+    )
+    start.wait()
+    for seq in range(records):
+        record = {
+            "worker": worker,
+            "seq": seq,
+            "customer_id": f"customer-{seq % 10}",
+            "user_input": f"message {seq} from worker {worker}",
+            "ai_output": "reply",
+        }
+        # Same backpressure as the backends: write inline when the queue is full
+        if not writer.submit(record):
+            write_batch([record])
+    writer.stop()
+    results.put({"worker": worker, **writer.stats(), **counters})
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Write from N workers to one store")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--records", type=int, default=1000, help="Per worker")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument(
+        "--busy-timeout",
+        type=float,
+        default=5.0,
+        help="Seconds SQLite waits for the write lock before raising",
+    )
+    parser.add_argument("--database", help="sqlite:/// URL (default: temporary)")
+    parser.add_argument("--shared-cache", help="sqlite:/// or redis:// URL")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="workers-")
+    database = args.database or f"sqlite:///{os.path.join(directory, 'memory.db')}"
+    shared_cache_url = (
+        args.shared_cache or f"sqlite:///{os.path.join(directory, 'cache.db')}"
+    )
+    if not database.startswith("sqlite:///"):
+        parser.error("--database must be a sqlite:/// URL")
+
+    prepare_memory_database(database)
+    path = database[len("sqlite:///") :]
+    setup = sqlite3.connect(path)
+    setup.execute(SCHEMA)
+    setup.execute("DELETE FROM conversations")
+    setup.commit()
+    # Create the shared cache tables before the workers race for them
+    open_shared_cache(shared_cache_url).close()
+
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(
+                worker,
+                database,
+                shared_cache_url,
+                args.records,
+                args.batch_size,
+                args.busy_timeout,
+                start,
+                results,
+            ),
+        )
+        for worker in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    started = time.perf_counter()
+    start.set()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    expected = args.workers * args.records
+    stored = setup.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+    missing = setup.execute(
+        "SELECT COUNT(*) FROM ("
+        " SELECT worker, COUNT(*) AS n FROM conversations GROUP BY worker"
+        ") WHERE n != ?",
+        (args.records,),
+    ).fetchone()[0]
+    setup.close()
+
+    shared = open_shared_cache(shared_cache_url)
+    generations = sum(
+        shared.counter(f"memory-generation:customer-{customer}")
+        for customer in range(10)
+    )
+    expected_generations = args.workers * len(range(0, args.records, FACT_EVERY))
+
+    print(f"{args.workers} workers x {args.records} records in {elapsed:.2f}s")
+    print(f"  database: {database}")
+    print(f"  records stored: {stored}/{expected}")
+    print(f"  memory invalidations: {generations}/{expected_generations}")
+    retried = sum(worker["retried_records"] for worker in stats)
+    print(f"  records retried after lock contention: {retried}")
+    print(f"  failed writes: {sum(worker['failed'] for worker in stats)}")
+
+    if stored != expected or missing or generations != expected_generations:
+        print("❌ Lost or duplicated writes")
+        return 1
+    print("✅ No lost writes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
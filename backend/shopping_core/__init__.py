@@ -0,0 +1,6 @@
+"""
+Shared building blocks for the Smart Shopping Assistant backends.
+
+Both agent backends (DigitalOcean and Swarms) import this package from the
+parent ``backend/`` directory, so catalog and search work lives in one place.
+"""
@@ -0,0 +1,44 @@
+"""
+Batch request execution
+
+Runs many requests with bounded concurrency and streams each result back
+as one NDJSON line as soon as it is ready, so long offline jobs neither wait
+for the whole batch nor pay per-request HTTP overhead.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Sequence
+
+
+async def stream_batch(
+    items: Sequence[Any],
+    handle: Callable[[int, Any], Awaitable[Dict]],
+    concurrency: int,
+) -> AsyncIterator[str]:
+    """Yield ``handle(index, item)`` results as NDJSON lines in completion order.
+
+    At most ``concurrency`` items are handled at once. Every line carries the
+    item's ``index`` so clients can match results to requests; a handler
+    that raises produces an ``error`` line instead of ending the stream.
+    Remaining work is cancelled if the client goes away.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(index: int, item: Any) -> Dict:
+        async with semaphore:
+            try:
+                result = await handle(index, item)
+            except Exception as e:
+                result = {"error": str(e)}
+        return {"index": index, **result}
+
+    tasks = [
+        asyncio.ensure_future(run(index, item)) for index, item in enumerate(items)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield json.dumps(await next_done) + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,305 @@
+"""
+Product catalog with prebuilt lookup indexes
+
+The catalog is a ``{group: [product, ...]}`` mapping. ``ProductCatalog``
+stores its products in a compact columnar table (``shopping_core.columns``)
+and builds an id → position map and the search index once, rebuilding them
+together whenever the catalog is replaced, so the product routes never walk
+the catalog per request. Product dicts are only built for returned products.
+The indexes of one version live in a ``CatalogSnapshot`` that is swapped as
+a whole, so a reload never exposes half-built indexes. Small upserts and
+deletes patch the current snapshot in place instead of rebuilding it, so
+holding a snapshot pins it against reloads only, not against such changes.
+
+Large catalogs can instead be served from an on-disk store with
+``open_catalog()``, which returns a ``StoredCatalog`` with the same interface.
+"""
+
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .import_catalog import read_feed
+from .search import SearchIndex
+from .store import StoredCatalog, merge_change, normalize_product, open_store
+
+
+class CatalogSnapshot:
+    """Indexes of one catalog version.
+
+    Products live in the search index's columnar ``ProductTable``; the
+    snapshot adds the id lookup and group bookkeeping on top of it. A reload
+    builds a new snapshot. Incremental changes (``apply``) patch the current
+    one instead: products are replaced whole, never edited, so a reader sees
+    each product either before or after a change. Code holding the snapshot
+    sees those changes, and ``version`` going up, while it works.
+    """
+
+    def __init__(self, catalog: Dict[str, List[Dict]], version: int):
+        self.version = version
+        self.search_index = SearchIndex.from_catalog(catalog)
+        self._table = self.search_index.products
+        # Product id → document id, which is also its position in catalog
+        # order. Deleted ids keep theirs so page cursors stay valid.
+        self._positions = {
+            product["id"]: i
+            for i, product in enumerate(
+                product for products in catalog.values() for product in products
+            )
+        }
+        self._group_sizes = {group: len(items) for group, items in catalog.items()}
+        self._categories = [group for group, size in self._group_sizes.items() if size]
+
+    def snapshot(self) -> "CatalogSnapshot":
+        return self
+
+    def __len__(self) -> int:
+        return self._table.live
+
+    def get(self, product_id: str) -> Optional[Dict]:
+        """Look up a product by id"""
+        position = self._positions.get(product_id)
+        return None if position is None else self._table.get(position)
+
+    def group_of(self, product_id: str) -> Optional[str]:
+        """Catalog group of a product"""
+        position = self._positions.get(product_id)
+        return None if position is None else self._table.group(position)
+
+    def products(self) -> List[Dict]:
+        """All products in catalog order"""
+        return [
+            product
+            for product in map(self._table.get, range(len(self._table)))
+            if product
+        ]
+
+    def page(self, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Products in catalog order, starting after the product id ``after``"""
+        table = self._table
+        start = 0 if after is None else self._positions.get(after, len(table)) + 1
+        page = []
+        for position in range(start, len(table)):
+            product = table.get(position)
+            if product is not None:
+                page.append(product)
+                if len(page) == limit:
+                    break
+        return page
+
+    def categories(self) -> List[str]:
+        """Catalog group names (shared list, do not mutate)"""
+        return self._categories
+
+    def entries(self) -> Iterator[Tuple[str, Dict]]:
+        """Iterate ``(group, product)`` pairs in catalog order"""
+        table = self._table
+        for position in range(len(table)):
+            product = table.get(position)
+            if product is not None:
+                yield table.group(position), product
+
+    def stats(self) -> Dict:
+        """Product table size, see ``ProductTable.stats``"""
+        return self._table.stats()
+
+    def apply(self, changes: Dict[str, Optional[Tuple[str, Dict]]]) -> Dict:
+        """Patch this snapshot and bump its version.
+
+        ``changes`` maps product ids to their new ``(group, product)``, or to
+        ``None`` to delete them. The search index patches the product table
+        along with its own indexes; new ids become findable by id last.
+        Returns the number of products upserted and deleted.
+        """
+        table = self._table
+        index_changes = []
+        sizes = dict(self._group_sizes)
+        added = 0
+        upserted = deleted = 0
+        for product_id, change in changes.items():
+            position = self._positions.get(product_id)
+            old_group = None if position is None else table.group(position)
+            if old_group is not None:
+                sizes[old_group] -= 1
+            elif change is None:
+                continue
+
+            if change is None:
+                index_changes.append((product_id, position, None, None))
+                deleted += 1
+                continue
+            group, product = change
+            if old_group is None:
+                position = len(table) + added
+                added += 1
+            sizes[group] = sizes.get(group, 0) + 1
+            index_changes.append((product_id, position, group, product))
+            upserted += 1
+
+        self.search_index.apply(
+            (position, group, product) for _, position, group, product in index_changes
+        )
+        for product_id, position, _, product in index_changes:
+            if product is not None:
+                self._positions[product_id] = position
+
+        categories = [group for group, size in sizes.items() if size]
+        if categories != self._categories:
+            self._categories = categories
+        self._group_sizes = sizes
+        self.version += 1
+        return {"upserted": upserted, "deleted": deleted}
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        query: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Search products with filters, see ``SearchIndex.search``"""
+        return self.search_index.search(
+            category=category,
+            max_price=max_price,
+            min_rating=min_rating,
+            query=query,
+            limit=limit,
+        )
+
+    def rank(self, text: str, limit: int) -> List[Dict]:
+        """Products most relevant to free text, see ``SearchIndex.rank``"""
+        return self.search_index.rank(text, limit)
+
+
+class ProductCatalog:
+    """In-memory product catalog with O(1) lookups.
+
+    Every read goes to the current ``CatalogSnapshot``. ``load()`` builds the
+    next snapshot off to the side and swaps it in with a single assignment,
+    so callers holding ``snapshot()`` are not affected by reloads.
+    ``apply_changes()`` patches the current snapshot in place for small
+    updates, and those holders see the patched products and version.
+    """
+
+    def __init__(self, catalog: Dict[str, List[Dict]]):
+        self._snapshot = CatalogSnapshot({}, 0)
+        self._load_lock = threading.Lock()
+        self.load(catalog)
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @property
+    def search_index(self) -> SearchIndex:
+        return self._snapshot.search_index
+
+    def snapshot(self) -> CatalogSnapshot:
+        """The current catalog version, unaffected by later reloads.
+
+        ``apply_changes()`` still patches it in place.
+        """
+        return self._snapshot
+
+    def load(self, catalog: Dict[str, List[Dict]]) -> CatalogSnapshot:
+        """Replace the catalog contents, returns the new snapshot"""
+        with self._load_lock:
+            snapshot = CatalogSnapshot(catalog, self._snapshot.version + 1)
+            self._snapshot = snapshot
+        return snapshot
+
+    def apply_changes(self, upserts: List[Dict], deletes: List[str]) -> Dict:
+        """Upsert (see ``merge_change``) and delete products in place.
+
+        Only the affected index entries are patched, and the version goes up
+        by one. Every upsert is validated before anything changes, so an
+        invalid batch raises ``ValueError`` and leaves the catalog as it was.
+        """
+        with self._load_lock:
+            snapshot = self._snapshot
+            changes: Dict[str, Optional[Tuple[str, Dict]]] = {}
+            for change in upserts:
+                pending = changes.get(change.get("id"))
+                if pending is not None:
+                    current_group, current = pending
+                else:
+                    current = snapshot.get(change.get("id"))
+                    current_group = snapshot.group_of(change.get("id"))
+                changes[change["id"]] = merge_change(change, current, current_group)
+            for product_id in deletes:
+                changes[product_id] = None
+            counts = snapshot.apply(changes)
+        return {"version": snapshot.version, "products": len(snapshot), **counts}
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def stats(self) -> Dict:
+        """Product table size, see ``ProductTable.stats``"""
+        return self._snapshot.stats()
+
+    def get(self, product_id: str) -> Optional[Dict]:
+        """Look up a product by id"""
+        return self._snapshot.get(product_id)
+
+    def products(self) -> List[Dict]:
+        """All products in catalog order"""
+        return self._snapshot.products()
+
+    def page(self, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Products in catalog order, starting after the product id ``after``"""
+        return self._snapshot.page(after=after, limit=limit)
+
+    def categories(self) -> List[str]:
+        """Catalog group names (shared list, do not mutate)"""
+        return self._snapshot.categories()
+
+    def entries(self) -> Iterator[Tuple[str, Dict]]:
+        """Iterate ``(group, product)`` pairs in catalog order"""
+        return self._snapshot.entries()
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        query: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Search products with filters, see ``SearchIndex.search``"""
+        return self._snapshot.search(
+            category=category,
+            max_price=max_price,
+            min_rating=min_rating,
+            query=query,
+            limit=limit,
+        )
+
+    def rank(self, text: str, limit: int) -> List[Dict]:
+        """Products most relevant to free text, see ``SearchIndex.rank``"""
+        return self._snapshot.rank(text, limit)
+
+
+def read_catalog_file(path: str) -> Dict[str, List[Dict]]:
+    """Read a product feed into a ``{group: [product, ...]}`` catalog.
+
+    Takes the same feeds as ``import_catalog`` (.json, .jsonl or .csv); prices
+    and ratings are converted to numbers as the catalog stores do.
+    """
+    catalog: Dict[str, List[Dict]] = {}
+    for group, product in read_feed(path):
+        catalog.setdefault(group, []).append(normalize_product(product))
+    return catalog
+
+
+def open_catalog(
+    url: Optional[str], default: Dict[str, List[Dict]]
+) -> Union[ProductCatalog, StoredCatalog]:
+    """Open the catalog at ``url``, or serve ``default`` from memory if unset.
+
+    ``url`` is a catalog store URL such as ``sqlite:///catalog.db`` or
+    ``parquet:///catalog.parquet`` (see ``shopping_core.store``).
+    """
+    if not url:
+        return ProductCatalog(default)
+    return StoredCatalog(open_store(url))
@@ -0,0 +1,36 @@
+"""
+Catalog-only worker
+
+Serves the product routes (``/products*``, ``/categories``) with ``/health``,
+``/metrics`` and ``/admin`` but no agent, Memori or upstream client, so it
+starts without the agent SDKs and scales separately from the chat workers.
+Run it from the ``backend/`` directory:
+
+    uvicorn shopping_core.catalog_app:app --host 0.0.0.0 --port 8001
+
+It reads the same settings as the backends (``CATALOG_URL``,
+``CORS_ORIGINS``, ...) from the environment or a ``.env`` file in the
+working directory.
+"""
+
+from dotenv import find_dotenv, load_dotenv
+
+# Load environment variables (before shopping_core reads its settings)
+load_dotenv(find_dotenv(usecwd=True))
+
+from .service import ShoppingService  # noqa: E402
+
+core = ShoppingService(
+    title="Smart Shopping Catalog API",
+    description="Product catalog routes of the shopping assistant",
+    version="1.0.0",
+    namespace="smart_shopping_catalog",
+)
+app = core.app
+product_catalog = core.catalog
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -0,0 +1,258 @@
+"""
+Compact in-memory product storage
+
+A dict per product costs several hundred bytes before its strings are
+counted, and every product repeats its group, category and (often long)
+image URL. At millions of products that dominates each worker's memory, so
+the in-memory catalog keeps products column by column instead:
+
+- price and rating in ``array('d')`` columns, 8 bytes per product each
+- group and category interned: each distinct string is stored once and
+  products hold a 4-byte code
+- image URLs split after their last ``/``: the shared prefix (host and
+  path) is interned, the file name is packed like the text below
+- names and descriptions packed as UTF-8 into one buffer addressed by offsets
+
+Product dicts are only built, by ``ProductTable.get()``, for the products a
+route actually returns. Rows are append-only: replacing a product appends a
+new row and repoints its document id to it with a single store, so readers
+see a product either before or after a change. A change to only the price or
+only the rating, the common catalog update, is one store into its column
+instead and adds no row. Rows left behind by other changes are reclaimed by
+the next full catalog load.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# Document id → row entry of a deleted product
+DELETED = 0xFFFFFFFF
+
+
+class StringPool:
+    """Interned strings addressed by a small integer code"""
+
+    __slots__ = ("values", "keys", "_codes")
+
+    def __init__(self):
+        self.values: List[str] = []
+        # Lowercased values, for case-insensitive filters
+        self.keys: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: str) -> int:
+        """Code of ``value``, added to the pool if new"""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.keys.append(value.lower())
+            self._codes[value] = code
+        return code
+
+
+class TextColumn:
+    """Strings packed as UTF-8 into one buffer, addressed by offsets"""
+
+    __slots__ = ("_buffer", "_offsets")
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._offsets = array("Q", [0])
+
+    def append(self, text: str) -> None:
+        self._buffer += text.encode()
+        self._offsets.append(len(self._buffer))
+
+    def __getitem__(self, row: int) -> str:
+        return self._buffer[self._offsets[row] : self._offsets[row + 1]].decode()
+
+    def nbytes(self) -> int:
+        return len(self._buffer) + self._offsets.itemsize * len(self._offsets)
+
+
+class ProductTable:
+    """Products by document id, stored column by column"""
+
+    __slots__ = (
+        "ids",
+        "live",
+        "_docs",
+        "_names",
+        "_descriptions",
+        "_prices",
+        "_ratings",
+        "_groups",
+        "_categories",
+        "_image_prefixes",
+        "_image_names",
+        "_group_codes",
+        "_category_codes",
+        "_image_codes",
+    )
+
+    def __init__(self):
+        # Row columns, one entry per row
+        self.ids: List[str] = []
+        self._names = TextColumn()
+        self._descriptions = TextColumn()
+        self._prices = array("d")
+        self._ratings = array("d")
+        self._group_codes = array("I")
+        self._category_codes = array("I")
+        self._image_codes = array("I")
+        self._groups = StringPool()
+        self._categories = StringPool()
+        self._image_prefixes = StringPool()
+        self._image_names = TextColumn()
+        # Document id → row, DELETED for deleted products
+        self._docs = array("I")
+        self.live = 0
+
+    def __len__(self) -> int:
+        """Number of document ids, deleted ones included"""
+        return len(self._docs)
+
+    def _append_row(self, group: str, product: Dict) -> int:
+        row = len(self.ids)
+        # Every column is written before the row is returned (and published)
+        self._names.append(product["name"])
+        self._descriptions.append(product.get("description", ""))
+        self._prices.append(product["price"])
+        self._ratings.append(product["rating"])
+        self._group_codes.append(self._groups.code(group))
+        self._category_codes.append(self._categories.code(product["category"]))
+        image = product.get("image", "")
+        split = image.rfind("/") + 1
+        self._image_codes.append(self._image_prefixes.code(image[:split]))
+        self._image_names.append(image[split:])
+        self.ids.append(product["id"])
+        return row
+
+    def _update_in_place(self, doc_id: int, group: str, product: Dict) -> bool:
+        """Write a change to the price or the rating alone into its column.
+
+        Returns ``False`` for any other change, which needs a new row.
+        """
+        current = self.get(doc_id)
+        if current is None or self.group(doc_id) != group:
+            return False
+        changed = [
+            field for field, value in current.items() if product.get(field, "") != value
+        ]
+        if len(changed) > 1:
+            return False
+        row = self._docs[doc_id]
+        if changed == ["price"]:
+            self._prices[row] = product["price"]
+        elif changed == ["rating"]:
+            self._ratings[row] = product["rating"]
+        elif changed:
+            return False
+        return True
+
+    def put(self, doc_id: int, group: str, product: Dict) -> None:
+        """Add (``doc_id`` past the end) or replace a product"""
+        if doc_id < len(self._docs) and self._update_in_place(doc_id, group, product):
+            return
+        row = self._append_row(group, product)
+        while len(self._docs) < doc_id:
+            self._docs.append(DELETED)
+        if doc_id == len(self._docs):
+            self._docs.append(row)
+            self.live += 1
+            return
+        if self._docs[doc_id] == DELETED:
+            self.live += 1
+        self._docs[doc_id] = row
+
+    def delete(self, doc_id: int) -> None:
+        if self._docs[doc_id] != DELETED:
+            self._docs[doc_id] = DELETED
+            self.live -= 1
+
+    def exists(self, doc_id: int) -> bool:
+        return self._docs[doc_id] != DELETED
+
+    def get(self, doc_id: int) -> Optional[Dict]:
+        """The product as a dict, ``None`` if deleted"""
+        row = self._docs[doc_id]
+        if row == DELETED:
+            return None
+        return {
+            "id": self.ids[row],
+            "name": self._names[row],
+            "price": self._prices[row],
+            "rating": self._ratings[row],
+            "category": self._categories.values[self._category_codes[row]],
+            "description": self._descriptions[row],
+            "image": self._image_prefixes.values[self._image_codes[row]]
+            + self._image_names[row],
+        }
+
+    def group(self, doc_id: int) -> Optional[str]:
+        row = self._docs[doc_id]
+        if row == DELETED:
+            return None
+        return self._groups.values[self._group_codes[row]]
+
+    def keys(self, doc_id: int) -> Tuple[str, str]:
+        """Lowercased group and category of a live product"""
+        row = self._docs[doc_id]
+        return (
+            self._groups.keys[self._group_codes[row]],
+            self._categories.keys[self._category_codes[row]],
+        )
+
+    def price(self, doc_id: int) -> float:
+        return self._prices[self._docs[doc_id]]
+
+    def rating(self, doc_id: int) -> float:
+        return self._ratings[self._docs[doc_id]]
+
+    def matches(
+        self,
+        doc_id: int,
+        category_key: Optional[str],
+        max_price: Optional[float],
+        min_rating: Optional[float],
+    ) -> bool:
+        """Whether a live product passes the search filters"""
+        row = self._docs[doc_id]
+        if row == DELETED:
+            return False
+        if max_price and self._prices[row] > max_price:
+            return False
+        if min_rating and self._ratings[row] < min_rating:
+            return False
+        if category_key and category_key not in (
+            self._groups.keys[self._group_codes[row]],
+            self._categories.keys[self._category_codes[row]],
+        ):
+            return False
+        return True
+
+    def stats(self) -> Dict:
+        """Row counts and approximate column sizes"""
+        numeric = (
+            self._prices,
+            self._ratings,
+            self._group_codes,
+            self._category_codes,
+            self._image_codes,
+            self._docs,
+        )
+        return {
+            "products": self.live,
+            "rows": len(self.ids),
+            "groups": len(self._groups),
+            "categories": len(self._categories),
+            "image_prefixes": len(self._image_prefixes),
+            "column_bytes": self._names.nbytes()
+            + self._descriptions.nbytes()
+            + self._image_names.nbytes()
+            + sum(column.itemsize * len(column) for column in numeric),
+        }
@@ -0,0 +1,84 @@
+"""
+Bulk import a product feed into a catalog store
+
+Usage (from the ``backend/`` directory):
+    python -m shopping_core.import_catalog products.jsonl --catalog-url sqlite:///catalog.db
+
+Feeds can be JSON (``{group: [product, ...]}`` or a list of products), JSON
+Lines or CSV. Flat records take their catalog group from a ``group`` field and
+fall back to the product category. Existing products with the same id are
+replaced. ``--catalog-url`` defaults to the ``CATALOG_URL`` environment variable.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, Tuple
+
+from .store import open_store
+
+
+def _entry(record: Dict) -> Tuple[str, Dict]:
+    product = dict(record)
+    group = product.pop("group", None) or product["category"]
+    return group, product
+
+
+def read_feed(path: str) -> Iterator[Tuple[str, Dict]]:
+    """Stream ``(group, product)`` pairs from a JSON, JSON Lines or CSV feed"""
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as feed:
+            for line in feed:
+                if line.strip():
+                    yield _entry(json.loads(line))
+
+    elif extension == ".csv":
+        with open(path, encoding="utf-8", newline="") as feed:
+            for record in csv.DictReader(feed):
+                yield _entry(record)
+
+    elif extension == ".json":
+        with open(path, encoding="utf-8") as feed:
+            data = json.load(feed)
+        if isinstance(data, dict):
+            for group, products in data.items():
+                for product in products:
+                    yield group, product
+        else:
+            for record in data:
+                yield _entry(record)
+
+    else:
+        raise ValueError(f"Unsupported feed format: {path}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("feed", help="Product feed (.json, .jsonl or .csv)")
+    parser.add_argument(
+        "--catalog-url",
+        default=os.environ.get("CATALOG_URL"),
+        help="Target store, e.g. sqlite:///catalog.db (default: $CATALOG_URL)",
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    if not args.catalog_url:
+        parser.error("--catalog-url or CATALOG_URL is required")
+
+    store = open_store(args.catalog_url)
+    started = time.perf_counter()
+    imported = store.bulk_import(read_feed(args.feed), batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Imported {imported} products into {args.catalog_url} in {elapsed:.1f}s")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
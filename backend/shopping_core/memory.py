@@ -0,0 +1,319 @@
+"""
+Memory helpers shared by the agent backends
+
+``WriteBehindQueue`` takes conversation recording off the chat request path:
+requests enqueue a record and return, a background thread drains the queue
+in batches and hands each batch to a writer in one go.
+
+``MemoryContextCache`` keeps recent memory search results per customer so
+most chat turns skip the Memori lookup.
+
+``prepare_memory_database`` and ``memori_pool_options`` set up the Memori
+database for several workers sharing it.
+"""
+
+import inspect
+import json
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from .cache import TTLCache
+from .search import STOPWORDS, TOKEN_PATTERN
+from .shared_cache import SharedCache
+
+_STOP = object()
+
+# Statements about the customer (preferences, possessions, constraints) are
+# what memory ingestion turns into new facts; plain product questions are not
+CUSTOMER_FACT_PATTERN = re.compile(
+    r"\b(i am|i'm|im|i like|i love|i prefer|i hate|i dislike|i don't like|"
+    r"i dont like|i bought|i own|i have|i already have|my|mine|we have|our|"
+    r"allergic|budget)\b",
+    re.IGNORECASE,
+)
+
+
+def adds_customer_facts(user_input: str) -> bool:
+    """Whether a customer message states something memory should learn"""
+    return bool(CUSTOMER_FACT_PATTERN.search(user_input))
+
+
+def prepare_memory_database(url: str) -> None:
+    """Switch a SQLite memory database to WAL mode.
+
+    WAL lets every worker read while one of them writes. The mode is stored
+    in the database file, so it also applies to Memori's own connections.
+    Other databases (PostgreSQL, MySQL) are left alone.
+    """
+    if not url.startswith("sqlite:///"):
+        return
+    path = url[len("sqlite:///") :]
+    if not path or path == ":memory:":
+        return
+    connection = sqlite3.connect(path, timeout=30)
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+    finally:
+        connection.close()
+
+
+def memori_pool_options(memori_class, pool_size: int, max_overflow: int) -> Dict:
+    """Connection pool arguments, limited to those the installed Memori accepts"""
+    options = {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_pre_ping": True,
+    }
+    parameters = inspect.signature(memori_class).parameters
+    return {name: value for name, value in options.items() if name in parameters}
+
+
+def is_database_locked(error: Exception) -> bool:
+    """Whether an error is SQLite lock contention between workers"""
+    message = str(error).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def retry_when_locked(func: Callable, *args, retries: int = 5, delay: float = 0.1):
+    """Call ``func``, retrying with backoff while another worker holds the lock"""
+    for attempt in range(retries + 1):
+        try:
+            return func(*args)
+        except Exception as e:
+            if attempt == retries or not is_database_locked(e):
+                raise
+            time.sleep(delay * 2**attempt)
+
+
+class PartialWriteError(Exception):
+    """A batch write that failed after writing its first ``written`` records"""
+
+    def __init__(self, written: int, error: Exception):
+        super().__init__(str(error))
+        self.written = written
+        self.error = error
+
+
+def write_each(write_record: Callable[[Dict], None], records: List[Dict]) -> None:
+    """Write records in order, stopping at the first failure.
+
+    Raises ``PartialWriteError`` so a retry can skip the records already written.
+    """
+    for written, record in enumerate(records):
+        try:
+            write_record(record)
+        except Exception as e:
+            raise PartialWriteError(written, e) from e
+
+
+def write_batch_with_retry(
+    write_batch: Callable[[List[Dict]], None], batch: List[Dict]
+) -> Tuple[int, int]:
+    """Write a batch, retrying what was not written one record at a time.
+
+    ``write_batch`` either writes everything or nothing (one transaction), or
+    raises ``PartialWriteError`` telling how far it got, so no record is
+    written twice. Returns the number of records written and failed.
+    """
+    try:
+        write_batch(batch)
+        return len(batch), 0
+    except Exception as e:
+        written = e.written if isinstance(e, PartialWriteError) else 0
+        if len(batch) == 1:
+            print(f"❌ Failed to write memory record: {e}")
+            return 0, 1
+
+    # Retry one by one so a single bad record does not lose the batch
+    failed = 0
+    for record in batch[written:]:
+        try:
+            write_batch([record])
+            written += 1
+        except Exception as e:
+            failed += 1
+            print(f"❌ Failed to write memory record: {e}")
+    return written, failed
+
+
+class WriteBehindQueue:
+    """Bounded background queue that writes records in batches.
+
+    ``write_batch`` must not write part of a batch and then raise anything
+    but ``PartialWriteError`` (see ``write_batch_with_retry``).
+
+    ``submit()`` never blocks: when the queue is full it returns ``False`` and
+    counts the rejection, leaving the caller to apply backpressure (e.g. write
+    the record inline). ``stop()`` flushes everything still queued.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Dict]], None],
+        max_size: int = 1000,
+        batch_size: int = 50,
+        name: str = "memory-writer",
+    ):
+        self._write_batch = write_batch
+        self._queue = queue.Queue(maxsize=max_size)
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.submitted = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.high_watermark = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, record: Dict) -> bool:
+        """Queue a record for writing, ``False`` if the queue is full"""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.rejected += 1
+            return False
+        self.submitted += 1
+        self.high_watermark = max(self.high_watermark, self._queue.qsize())
+        return True
+
+    def stats(self) -> Dict:
+        """Queue depth and throughput counters"""
+        return {
+            "pending": self._queue.qsize(),
+            "max_size": self.max_size,
+            "high_watermark": self.high_watermark,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Flush queued records and stop the writer thread"""
+        if self._thread.is_alive():
+            # Blocks while the queue is full, the writer keeps draining it
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            stopping = record is _STOP
+            batch = [] if stopping else [record]
+
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stopping = True
+                else:
+                    batch.append(record)
+
+            if batch:
+                self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch: List[Dict]) -> None:
+        self.batches += 1
+        written, failed = write_batch_with_retry(self._write_batch, batch)
+        self.written += written
+        self.failed += failed
+
+
+class MemoryContextCache:
+    """LRU + TTL cache of memory search results, keyed per customer.
+
+    Call ``invalidate()`` when a write adds new facts for a customer (see
+    ``adds_customer_facts``), the TTL bounds staleness for everything else.
+    Keys carry a per-customer generation, so ``invalidate()`` is O(1): it
+    bumps the generation and older entries are never hit again (they age out
+    through LRU/TTL). Take the key *before* the lookup and store the result
+    under that same key, so a write that lands mid-lookup is not masked.
+
+    With ``shared`` set, generations live in the shared cache so an
+    invalidation by one worker reaches all of them, and cached context is
+    shared too. If the shared cache fails, the local state is used.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl: float = 300.0,
+        shared: Optional[SharedCache] = None,
+    ):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.shared = shared
+        self.invalidations = 0
+        self.shared_hits = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Lowercase, punctuation-free query without filler words"""
+        terms = TOKEN_PATTERN.findall(query.lower())
+        return " ".join(term for term in terms if term not in STOPWORDS)
+
+    def generation(self, customer_id: str) -> int:
+        """Bumped every time the customer's memories change"""
+        if self.shared is not None:
+            try:
+                return self.shared.counter(f"memory-generation:{customer_id}")
+            except Exception as e:
+                print(f"⚠️ Shared memory cache unavailable: {e}")
+        with self._lock:
+            return self._generations.get(customer_id, 0)
+
+    def key(self, customer_id: str, query: str) -> Hashable:
+        return (customer_id, self.generation(customer_id), self.normalize(query))
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Cached context for ``key``, ``None`` on a miss"""
+        context = self._cache.get(key)
+        if context is None and self.shared is not None:
+            try:
+                context = self.shared.get("memory-context:" + json.dumps(key))
+            except Exception as e:
+                print(f"⚠️ Shared memory cache unavailable: {e}")
+            if context is not None:
+                self._cache.set(key, context)
+                self.shared_hits += 1
+        return context
+
+    def set(self, key: Hashable, context: str) -> None:
+        self._cache.set(key, context)
+        if self.shared is not None:
+            try:
+                self.shared.set(
+                    "memory-context:" + json.dumps(key), context, self._cache.ttl
+                )
+            except Exception as e:
+                print(f"⚠️ Shared memory cache unavailable: {e}")
+
+    def invalidate(self, customer_id: str) -> None:
+        """Forget cached context for a customer whose memories changed"""
+        with self._lock:
+            self._generations[customer_id] = self._generations.get(customer_id, 0) + 1
+            self.invalidations += 1
+        if self.shared is not None:
+            try:
+                self.shared.incr(f"memory-generation:{customer_id}")
+            except Exception as e:
+                print(f"⚠️ Shared memory cache unavailable: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            **self._cache.stats(),
+            "invalidations": self.invalidations,
+            "shared_hits": self.shared_hits,
+        }
@@ -0,0 +1,332 @@
+"""
+Prometheus metrics
+
+A small dependency-free registry of counters, histograms and gauges rendered
+in the Prometheus text format for ``GET /metrics``, plus the shared metrics
+both backends report: request latency per route, chat pipeline stage timings,
+upstream token counts and event-loop lag.
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)  # fmt: skip
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labels, key), value
+
+
+class Gauge(_Metric):
+    """Gauge set directly, or read from ``collect()`` at scrape time.
+
+    ``collect`` returns ``{label values tuple: value}``.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+        kind: str = "gauge",
+    ):
+        super().__init__(name, help, labels)
+        self.kind = kind
+        self._collect = collect
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self):
+        if self._collect is not None:
+            values = self._collect()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labels, key), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (bucket counts, sum, count)
+        self._series: Dict[LabelValues, List] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            series = {
+                key: (list(counts), total, count)
+                for key, (counts, total, count) in self._series.items()
+            }
+        names = self.labels + ("le",)
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield (
+                    f"{self.name}_bucket",
+                    _format_labels(names, key + (_format_value(bound),)),
+                    cumulative,
+                )
+            yield f"{self.name}_bucket", _format_labels(names, key + ("+Inf",)), count
+            yield f"{self.name}_sum", _format_labels(self.labels, key), total
+            yield f"{self.name}_count", _format_labels(self.labels, key), count
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together for ``GET /metrics``"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(
+        self, name: str, help: str, labels: Sequence[str] = (), **kwargs
+    ) -> Gauge:
+        return self.register(Gauge(name, help, labels, **kwargs))
+
+    def histogram(
+        self, name: str, help: str, labels: Sequence[str] = (), **kwargs
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labels, **kwargs))
+
+    def cache_metrics(self, caches: Dict[str, Callable[[], Dict]]) -> None:
+        """Export hit/miss counters of caches exposing ``stats()`` dicts"""
+
+        def collect(field: str):
+            def values():
+                return {
+                    (name,): stats().get(field, 0) for name, stats in caches.items()
+                }
+
+            return values
+
+        self.gauge(
+            "cache_hits_total",
+            "Cache lookups served from the cache",
+            ["cache"],
+            collect=collect("hits"),
+            kind="counter",
+        )
+        self.gauge(
+            "cache_misses_total",
+            "Cache lookups that missed",
+            ["cache"],
+            collect=collect("misses"),
+            kind="counter",
+        )
+        self.gauge(
+            "cache_hit_ratio",
+            "Fraction of cache lookups served from the cache",
+            ["cache"],
+            collect=collect("hit_rate"),
+        )
+        self.gauge(
+            "cache_entries",
+            "Entries currently cached",
+            ["cache"],
+            collect=collect("size"),
+        )
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Per-request breakdown of chat stage timings, see ``ChatMetrics.stage()``
+request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "request_stages", default=None
+)
+
+
+class ChatMetrics:
+    """Metrics shared by both backends"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.requests = registry.histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route (streaming routes: until headers)",
+            ["method", "route", "status"],
+        )
+        self.stages = registry.histogram(
+            "chat_stage_duration_seconds",
+            "Time spent in each chat pipeline stage",
+            ["stage"],
+        )
+        self.tokens = registry.counter(
+            "upstream_tokens_total",
+            "Tokens reported by the upstream model",
+            ["type"],
+        )
+        self.loop_lag = registry.gauge(
+            "event_loop_lag_seconds",
+            "Delay of the last event-loop lag probe beyond its scheduled time",
+        )
+        self.loop_lag_histogram = registry.histogram(
+            "event_loop_lag_distribution_seconds",
+            "Event-loop lag probe delays",
+        )
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        """Record a stage timing, also in the current request's breakdown"""
+        self.stages.observe(seconds, stage=stage)
+        breakdown = request_stages.get()
+        if breakdown is not None:
+            breakdown[stage] = breakdown.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - started)
+
+    def count_tokens(self, usage) -> None:
+        """Count tokens from an OpenAI-style ``usage`` object, if present"""
+        if usage is None:
+            return
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None)
+            if tokens:
+                self.tokens.inc(tokens, type=kind)
+
+    async def track_request(self, request, call_next):
+        """HTTP middleware recording request latency by route template"""
+        breakdown: Dict[str, float] = {}
+        request_stages.set(breakdown)
+        request.state.stages = breakdown
+
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            self.requests.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            )
+
+    async def monitor_event_loop(self, interval: float = 0.5) -> None:
+        """Measure how late the event loop wakes up a sleeping task"""
+        while True:
+            scheduled = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lag = max(time.perf_counter() - scheduled, 0.0)
+            self.loop_lag.set(lag)
+            self.loop_lag_histogram.observe(lag)
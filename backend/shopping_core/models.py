@@ -0,0 +1,59 @@
+"""
+Pydantic models shared by the backend routes
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ChatRequest(BaseModel):
+    message: str
+    customer_id: Optional[str] = "default"
+
+
+class ChatBatchRequest(BaseModel):
+    requests: List[ChatRequest]
+
+
+class ChatResponse(BaseModel):
+    response: str
+    timestamp: str
+
+
+class Product(BaseModel):
+    id: str
+    name: str
+    price: float
+    rating: float
+    category: str
+    description: str
+    image: str
+
+
+class ProductSearchRequest(BaseModel):
+    category: Optional[str] = None
+    max_price: Optional[float] = None
+    min_rating: Optional[float] = None
+    query: Optional[str] = None
+
+
+class ProductChange(BaseModel):
+    """Full or partial product keyed by ``id``, optionally with a new ``group``"""
+
+    model_config = ConfigDict(extra="forbid")
+
+    id: str = Field(min_length=1)
+    name: Optional[str] = None
+    price: Optional[float] = Field(None, ge=0, allow_inf_nan=False)
+    rating: Optional[float] = Field(None, ge=0, allow_inf_nan=False)
+    category: Optional[str] = None
+    description: Optional[str] = None
+    image: Optional[str] = None
+    group: Optional[str] = None
+
+
+class CatalogChanges(BaseModel):
+    # Only the fields sent are applied (see ProductChange)
+    upserts: List[ProductChange] = []
+    deletes: List[str] = []
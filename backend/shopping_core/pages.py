@@ -0,0 +1,110 @@
+"""
+Precomputed product listing pages
+
+``GET /products`` pages are serialized to JSON once per catalog version and
+served as raw bytes with a content ETag, so repeat requests skip both the
+catalog walk and per-item pydantic validation, and clients holding the
+current ETag get a ``304 Not Modified``.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+
+from .store import PRODUCT_FIELDS
+
+MAX_PAGE_SIZE = 1000
+
+
+class ProductPage(NamedTuple):
+    body: bytes
+    etag: str
+    next_cursor: Optional[str]
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Validate a ``fields=a,b,c`` projection, ``None`` means every field"""
+    if not fields:
+        return None
+    selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [field for field in selected if field not in PRODUCT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown product fields: {', '.join(unknown)}")
+    return selected
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag``"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ProductPageCache:
+    """LRU cache of serialized product pages, keyed by catalog version"""
+
+    def __init__(self, catalog, max_entries: int = 256):
+        self.catalog = catalog
+        self.max_entries = max_entries
+        self._pages = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[str] = None,
+    ) -> ProductPage:
+        """Serialized page of products after ``cursor`` (all products if no limit)"""
+        selected = parse_fields(fields)
+        # Render from one catalog version even if a reload swaps it meanwhile
+        catalog = self.catalog.snapshot()
+        version = catalog.version
+        key = (cursor, limit, selected)
+
+        with self._lock:
+            if version != self._version:
+                self._pages.clear()
+                self._version = version
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                return page
+
+        page = self._render(catalog, cursor, limit, selected)
+
+        with self._lock:
+            if version == self._version:
+                self._pages[key] = page
+                while len(self._pages) > self.max_entries:
+                    self._pages.popitem(last=False)
+        return page
+
+    def _render(
+        self,
+        catalog,
+        cursor: Optional[str],
+        limit: Optional[int],
+        selected: Optional[Tuple[str, ...]],
+    ) -> ProductPage:
+        next_cursor = None
+        if limit is None and cursor is None:
+            products: List = catalog.products()
+        else:
+            page_size = limit or MAX_PAGE_SIZE
+            # Read one extra product to know whether there is a next page
+            products = catalog.page(after=cursor, limit=page_size + 1)
+            if len(products) > page_size:
+                products = products[:page_size]
+                next_cursor = products[-1]["id"]
+
+        if selected is not None:
+            products = [{field: p[field] for field in selected} for p in products]
+
+        body = json.dumps(products, separators=(",", ":")).encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        return ProductPage(body=body, etag=etag, next_cursor=next_cursor)
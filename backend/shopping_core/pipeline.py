@@ -0,0 +1,67 @@
+"""
+Concurrent pre-LLM stages
+
+The work done before calling the model (memory search, product retrieval,
+preference lookup) is independent, so it runs concurrently. Each stage has
+its own timeout and a fallback value, so one slow dependency degrades the
+prompt instead of delaying the response.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    timeout: float
+    fallback: Any = None
+
+
+class StageStats:
+    """Per-stage run, timeout and error counters.
+
+    ``on_timing(stage, seconds)`` is called with every stage's duration.
+    """
+
+    def __init__(self, on_timing: Optional[Callable[[str, float], None]] = None):
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._on_timing = on_timing
+
+    def record(self, name: str, outcome: str, seconds: float = 0.0) -> None:
+        if self._on_timing is not None:
+            self._on_timing(name, seconds)
+        with self._lock:
+            counts = self._counts.setdefault(
+                name, {"runs": 0, "timeouts": 0, "errors": 0}
+            )
+            counts["runs"] += 1
+            if outcome != "ok":
+                counts[outcome] += 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+
+async def _run_stage(stage: Stage, stats: StageStats) -> Any:
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(stage.run(), stage.timeout)
+    except asyncio.TimeoutError:
+        stats.record(stage.name, "timeouts", time.perf_counter() - started)
+        return stage.fallback
+    except Exception:
+        stats.record(stage.name, "errors", time.perf_counter() - started)
+        return stage.fallback
+    stats.record(stage.name, "ok", time.perf_counter() - started)
+    return result
+
+
+async def run_stages(*stages: Stage, stats: StageStats) -> Dict[str, Any]:
+    """Run stages concurrently, returns ``{stage name: result or fallback}``"""
+    results = await asyncio.gather(*(_run_stage(stage, stats) for stage in stages))
+    return {stage.name: result for stage, result in zip(stages, results)}
@@ -0,0 +1,259 @@
+"""
+Sampled request profiling and slow-request log
+
+While a sampled request is in flight, a background thread samples every
+thread's Python stack at a fixed interval and aggregates them as collapsed
+stacks (``frame;frame;frame count``), the input format of flamegraph.pl,
+speedscope and inferno. Only a configurable fraction of requests to the
+profiled routes is sampled, so it can stay on under production traffic.
+
+Requests slower than a threshold are kept in a bounded log together with
+the per-stage breakdown recorded by ``ChatMetrics``.
+"""
+
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from pydantic import BaseModel
+
+# Leaf frames of threads that are waiting rather than working
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+}
+
+
+class StackSampler:
+    """Samples thread stacks while at least one profiled request is active"""
+
+    def __init__(self, interval: float = 0.005, max_stacks: int = 20000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._stacks = Counter()
+        self._active = 0
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.samples = 0
+
+    def start(self) -> None:
+        with self._lock:
+            self._active += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="stack-sampler", daemon=True
+                )
+                self._thread.start()
+            self._wake.set()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._active -= 1
+            if self._active <= 0:
+                self._active = 0
+                self._wake.clear()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            self._wake.wait()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    stack = self._collapse(names.get(thread_id, "thread"), frame)
+                    if stack:
+                        stacks.append(stack)
+            with self._lock:
+                for stack in stacks:
+                    if stack in self._stacks or len(self._stacks) < self.max_stacks:
+                        self._stacks[stack] += 1
+                    else:
+                        self._stacks["[truncated]"] += 1
+                self.samples += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> Optional[str]:
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+            return None
+
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            module = os.path.basename(code.co_filename)
+            frames.append(f"{module}:{code.co_name}:{code.co_firstlineno}")
+            frame = frame.f_back
+        frames.append(thread_name.replace(" ", "_").replace(";", "_"))
+        return ";".join(reversed(frames))
+
+    def collapsed(self) -> str:
+        """Aggregated stacks in collapsed (folded) flamegraph format"""
+        with self._lock:
+            stacks = sorted(self._stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def stats(self) -> Dict:
+        return {
+            "samples": self.samples,
+            "distinct_stacks": len(self._stacks),
+            "active_requests": self._active,
+        }
+
+
+class RequestProfiler:
+    """HTTP middleware sampling requests for profiling and logging slow ones"""
+
+    def __init__(
+        self,
+        routes: Iterable[str],
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+        slow_threshold: float = 2.0,
+        slow_log_size: int = 200,
+    ):
+        self.routes = set(routes)
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.sampler = StackSampler(interval=interval)
+        self.slow_requests = deque(maxlen=slow_log_size)
+        self.sampled_requests = 0
+
+    def _sampled(self, path: str) -> bool:
+        return (
+            self.sample_rate > 0
+            and path in self.routes
+            and random.random() < self.sample_rate
+        )
+
+    async def track_request(self, request, call_next):
+        sampled = self._sampled(request.url.path)
+        if sampled:
+            self.sampler.start()
+            self.sampled_requests += 1
+
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            if sampled:
+                self.sampler.stop()
+            duration = time.perf_counter() - started
+            if duration >= self.slow_threshold:
+                self._log_slow(request, status, duration)
+
+    def _log_slow(self, request, status: int, duration: float) -> None:
+        stages = getattr(request.state, "stages", None) or {}
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "method": request.method,
+            "path": request.url.path,
+            "status": status,
+            "duration_ms": round(duration * 1000, 1),
+            "stages_ms": {
+                stage: round(seconds * 1000, 1) for stage, seconds in stages.items()
+            },
+        }
+        self.slow_requests.append(entry)
+        print(
+            f"🐢 Slow request {entry['method']} {entry['path']}"
+            f" {entry['duration_ms']}ms stages={entry['stages_ms']}"
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "routes": sorted(self.routes),
+            "slow_threshold_ms": round(self.slow_threshold * 1000, 1),
+            "sampled_requests": self.sampled_requests,
+            "slow_requests_logged": len(self.slow_requests),
+            **self.sampler.stats(),
+        }
+
+
+class ProfilingSettings(BaseModel):
+    sample_rate: Optional[float] = None
+    slow_threshold_ms: Optional[float] = None
+
+
+def admin_guard(admin_token: Optional[str]):
+    """Dependency requiring ``X-Admin-Token``; admin routes are off without a token"""
+
+    async def require_admin(x_admin_token: Optional[str] = Header(None)):
+        if not admin_token:
+            raise HTTPException(
+                status_code=403, detail="Admin API disabled, set ADMIN_TOKEN"
+            )
+        if not x_admin_token or not hmac.compare_digest(x_admin_token, admin_token):
+            raise HTTPException(status_code=401, detail="Invalid admin token")
+
+    return require_admin
+
+
+def profiling_router(profiler: RequestProfiler, admin_token: Optional[str]):
+    """Admin routes to tune profiling, download flamegraphs and read the slow log"""
+    router = APIRouter(
+        prefix="/admin",
+        tags=["admin"],
+        dependencies=[Depends(admin_guard(admin_token))],
+    )
+
+    @router.get("/profiling")
+    def profiling_status():
+        """Current profiling settings and counters"""
+        return profiler.stats()
+
+    @router.post("/profiling")
+    def update_profiling(settings: ProfilingSettings):
+        """Change the sample rate or slow-request threshold at runtime"""
+        if settings.sample_rate is not None:
+            if not 0 <= settings.sample_rate <= 1:
+                raise HTTPException(
+                    status_code=400, detail="sample_rate must be between 0 and 1"
+                )
+            profiler.sample_rate = settings.sample_rate
+        if settings.slow_threshold_ms is not None:
+            profiler.slow_threshold = settings.slow_threshold_ms / 1000
+        return profiler.stats()
+
+    @router.get("/profiling/flamegraph")
+    def download_flamegraph():
+        """Collapsed stacks for flamegraph.pl / speedscope"""
+        return Response(
+            content=profiler.sampler.collapsed(),
+            media_type="text/plain",
+            headers={"Content-Disposition": 'attachment; filename="profile.folded"'},
+        )
+
+    @router.delete("/profiling/flamegraph")
+    def reset_flamegraph():
+        """Discard the aggregated stacks"""
+        profiler.sampler.reset()
+        return profiler.stats()
+
+    @router.get("/slow-requests")
+    def slow_requests() -> List[Dict]:
+        """Recent requests slower than the threshold, newest first"""
+        return list(reversed(profiler.slow_requests))
+
+    return router
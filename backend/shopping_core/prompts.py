@@ -0,0 +1,57 @@
+"""
+Cached system prompts
+
+The assistant's system prompt only depends on the catalog, so it is rendered
+once per catalog version instead of on every chat turn. Keeping it identical
+between turns also keeps the request prefix byte-stable, which lets the
+upstream provider's prompt caching apply. Per-turn content (retrieved
+products, customer context) goes after the cached prefix.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+def format_products(products: Iterable[Dict]) -> str:
+    """One prompt line per product"""
+    return "\n".join(
+        f"- {product['name']} (${product['price']}) - {product['description']}"
+        for product in products
+    )
+
+
+class PromptBuilder:
+    """Renders a prompt from the catalog and caches it by catalog version"""
+
+    def __init__(self, catalog, render: Callable[..., str]):
+        self.catalog = catalog
+        self._render = render
+        self._cached: Optional[Tuple[int, str]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[int]:
+        """Catalog version of the cached prompt"""
+        cached = self._cached
+        return cached[0] if cached else None
+
+    def get(self) -> str:
+        """The prompt for the current catalog version"""
+        catalog = self.catalog.snapshot()
+        version = catalog.version
+        cached = self._cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with self._lock:
+            cached = self._cached
+            if cached is None or cached[0] != version:
+                cached = (version, self._render(catalog))
+                # A turn still on an older snapshot must not replace a newer prompt
+                if self._cached is None or self._cached[0] < version:
+                    self._cached = cached
+        return cached[1]
+
+    def invalidate(self) -> None:
+        """Drop the cached prompt, the next ``get()`` renders it again"""
+        self._cached = None
@@ -0,0 +1,176 @@
+"""
+Hot catalog reload and incremental updates
+
+``CatalogReloader`` reads a new catalog from a product feed file, builds its
+id, group and search indexes on a worker thread and swaps them into the
+running ``ProductCatalog`` in one assignment, so price updates need no
+restart. Requests already running finish on the snapshot they started with,
+and caches keyed by catalog version (product pages, prompts, replies) move
+to the new version on their own.
+
+Reloads are triggered through ``POST /admin/catalog/reload`` or by watching
+the file's modification time. Catalogs served from a store (``CATALOG_URL``)
+pick up ``import_catalog`` runs by themselves and are not reloaded here.
+
+Smaller updates go through ``POST /admin/catalog/changes`` instead: a batch
+of upserts and deletes patches the affected index entries of the running
+catalog, in memory or in a SQLite store, and bumps its version by one.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .catalog import ProductCatalog, read_catalog_file
+
+
+class CatalogReloader:
+    """Reloads an in-memory catalog from its feed file"""
+
+    def __init__(self, catalog, path: Optional[str]):
+        self.catalog = catalog
+        self.path = path
+        self._hooks: List[Callable[[], object]] = []
+        self._lock = threading.Lock()
+        # Modification time and size of the file last loaded
+        self._signature = self._stat()
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload: Optional[str] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.change_batches = 0
+        self.changed_products = 0
+        self.last_change: Optional[str] = None
+        self.last_change_ms: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and isinstance(self.catalog, ProductCatalog)
+
+    def on_reload(self, hook: Callable[[], object]) -> None:
+        """Call ``hook`` after each reload or change batch, e.g. to warm a cache"""
+        self._hooks.append(hook)
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        if not self.path:
+            return None
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed(self) -> bool:
+        """Whether the file differs from the one last loaded"""
+        signature = self._stat()
+        return signature is not None and signature != self._signature
+
+    def reload(self) -> Dict:
+        """Load the file and swap the new catalog in (blocking).
+
+        Raises ``ValueError`` when reloading is not configured, and the
+        read error when the file cannot be loaded; the current catalog then
+        stays in place.
+        """
+        if not self.path:
+            raise ValueError("Catalog reload needs CATALOG_FILE to be set")
+        if not isinstance(self.catalog, ProductCatalog):
+            raise ValueError("Store catalogs pick up imports without a reload")
+
+        with self._lock:
+            started = time.perf_counter()
+            signature = self._stat()
+            try:
+                snapshot = self.catalog.load(read_catalog_file(self.path))
+            except Exception as e:
+                # Wait for the file to change again instead of retrying it
+                self._signature = signature
+                self.failures += 1
+                self.last_error = str(e)
+                raise
+            self._signature = signature
+            self.reloads += 1
+            self.last_reload = datetime.now().isoformat()
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.last_error = None
+
+        self._run_hooks()
+        print(
+            f"✅ Catalog version {snapshot.version} loaded"
+            f" ({len(snapshot)} products, {self.last_duration_ms}ms)"
+        )
+        return {
+            "version": snapshot.version,
+            "products": len(snapshot),
+            "duration_ms": self.last_duration_ms,
+        }
+
+    def apply_changes(self, upserts: List[Dict], deletes: List[str]) -> Dict:
+        """Upsert and delete products in the running catalog (blocking).
+
+        Raises ``ValueError`` for an invalid batch, which is then not applied,
+        and ``NotImplementedError`` for stores without incremental updates.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            result = self.catalog.apply_changes(upserts, deletes)
+            self.change_batches += 1
+            self.changed_products += result["upserted"] + result["deleted"]
+            self.last_change = datetime.now().isoformat()
+            self.last_change_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        self._run_hooks()
+        return {**result, "duration_ms": self.last_change_ms}
+
+    def _run_hooks(self) -> None:
+        for hook in self._hooks:
+            try:
+                hook()
+            except Exception as e:
+                print(f"❌ Catalog reload hook failed: {e}")
+
+    async def watch(self, interval: float) -> None:
+        """Reload whenever the file changes, checking every ``interval`` seconds.
+
+        A change is only loaded once the file has stopped changing between
+        two checks, so a feed that is still being written is not read.
+        """
+        loop = asyncio.get_running_loop()
+        pending = None
+        while True:
+            await asyncio.sleep(interval)
+            if not self.changed():
+                pending = None
+                continue
+            signature = self._stat()
+            if signature != pending:
+                pending = signature
+                continue
+            pending = None
+            try:
+                await loop.run_in_executor(None, self.reload)
+            except Exception as e:
+                print(
+                    f"❌ Catalog reload failed, keeping version"
+                    f" {self.catalog.version}: {e}"
+                )
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_reload": self.last_reload,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+            "change_batches": self.change_batches,
+            "changed_products": self.changed_products,
+            "last_change": self.last_change,
+            "last_change_ms": self.last_change_ms,
+        }
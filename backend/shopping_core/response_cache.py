@@ -0,0 +1,241 @@
+"""
+Semantic response cache
+
+Many shopping questions repeat almost verbatim ("what laptops do you have",
+"cheapest headphones"). Replies are cached under the normalized question,
+scoped to the catalog version they were generated against, so a catalog
+change never serves a reply about stale products. Optionally a miss falls
+back to the most similar cached question, compared as hashed term vectors.
+With a ``SharedCache`` exact replies are also shared between workers.
+"""
+
+import json
+import math
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from .search import STOPWORDS, tokenize
+from .shared_cache import SharedCache
+
+# Words that change the meaning of a shopping question stay in the key
+CACHE_STOPWORDS = STOPWORDS - {"best", "under"}
+
+# Similar-question lookups score at most this many candidates
+MAX_SIMILAR_CANDIDATES = 32
+
+
+class _Entry(NamedTuple):
+    expires_at: float
+    response: str
+    vector: Dict[int, float]
+    numbers: Tuple[str, ...]
+
+
+class ResponseCache:
+    """LRU + TTL cache of assistant replies for repeated questions.
+
+    Keys are ``(catalog version, scope, normalized question)``. Use the empty
+    scope for replies that depend only on the catalog, and a customer-specific
+    scope (e.g. customer id plus memory generation) for replies built with a
+    customer's memory context.
+
+    With ``similarity`` above 0 an exact miss is retried against cached
+    questions in the same version and scope: the question whose hashed
+    unigram/bigram vector has the highest cosine similarity is served if it
+    reaches ``similarity`` and mentions the same numbers (prices, sizes).
+
+    With ``shared`` set, replies are also written to the shared cache and an
+    exact local miss is looked up there before the similarity fallback.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 5000,
+        ttl: float = 600.0,
+        similarity: float = 0.0,
+        dimensions: int = 4096,
+        shared: Optional[SharedCache] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity = similarity
+        self.dimensions = dimensions
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._buckets: Dict[Hashable, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def normalize(message: str) -> List[str]:
+        """Question terms without filler words, plurals folded"""
+        return [term for term in tokenize(message) if term not in CACHE_STOPWORDS]
+
+    def key(
+        self, version: Hashable, scope: Hashable, message: str
+    ) -> Optional[Hashable]:
+        """Cache key for a question, ``None`` if it has no meaningful terms"""
+        terms = self.normalize(message)
+        if not terms:
+            return None
+        return (version, scope, " ".join(terms))
+
+    def _vector(self, terms: List[str]) -> Dict[int, float]:
+        features = terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+        counts = Counter(
+            zlib.crc32(feature.encode()) % self.dimensions for feature in features
+        )
+        norm = math.sqrt(sum(count * count for count in counts.values())) or 1.0
+        return {bucket: count / norm for bucket, count in counts.items()}
+
+    def get(self, version: Hashable, scope: Hashable, message: str) -> Optional[str]:
+        """Cached reply for the question, ``None`` on a miss"""
+        if not self.enabled:
+            return None
+
+        terms = self.normalize(message)
+        if not terms:
+            return None
+
+        key = (version, scope, " ".join(terms))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.response
+            if entry is not None:
+                self._remove(key)
+
+        if self.shared is not None:
+            response = self._shared_get(key)
+            if response is not None:
+                self._store(key, terms, response)
+                with self._lock:
+                    self.shared_hits += 1
+                return response
+
+        with self._lock:
+            if self.similarity > 0:
+                similar = self._similar(version, scope, terms, now)
+                if similar is not None:
+                    self._entries.move_to_end(similar)
+                    self.similar_hits += 1
+                    return self._entries[similar].response
+
+            self.misses += 1
+            return None
+
+    def _similar(
+        self, version: Hashable, scope: Hashable, terms: List[str], now: float
+    ) -> Optional[Hashable]:
+        vector = self._vector(terms)
+        numbers = tuple(sorted(term for term in terms if term.isdigit()))
+
+        # Candidates are cached questions sharing the most vector buckets
+        overlap = Counter()
+        for bucket in vector:
+            overlap.update(self._buckets.get((version, scope, bucket), ()))
+
+        best_key, best_score = None, self.similarity
+        for key, _ in overlap.most_common(MAX_SIMILAR_CANDIDATES):
+            entry = self._entries[key]
+            if entry.expires_at <= now or entry.numbers != numbers:
+                continue
+            score = sum(
+                weight * entry.vector.get(bucket, 0.0)
+                for bucket, weight in vector.items()
+            )
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def set(
+        self, version: Hashable, scope: Hashable, message: str, response: str
+    ) -> None:
+        """Cache a reply, evicting the least recently used entries when full"""
+        if not self.enabled:
+            return
+
+        terms = self.normalize(message)
+        if not terms:
+            return
+
+        key = (version, scope, " ".join(terms))
+        self._store(key, terms, response)
+        if self.shared is not None:
+            try:
+                self.shared.set(self._shared_key(key), response, self.ttl)
+            except Exception as e:
+                print(f"⚠️ Shared response cache unavailable: {e}")
+
+    @staticmethod
+    def _shared_key(key: Hashable) -> str:
+        return "response:" + json.dumps(key, default=str)
+
+    def _shared_get(self, key: Hashable) -> Optional[str]:
+        try:
+            return self.shared.get(self._shared_key(key))
+        except Exception as e:
+            print(f"⚠️ Shared response cache unavailable: {e}")
+            return None
+
+    def _store(self, key: Hashable, terms: List[str], response: str) -> None:
+        version, scope, _ = key
+        entry = _Entry(
+            expires_at=time.monotonic() + self.ttl,
+            response=response,
+            vector=self._vector(terms) if self.similarity > 0 else {},
+            numbers=tuple(sorted(term for term in terms if term.isdigit())),
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for bucket in entry.vector:
+                self._buckets.setdefault((version, scope, bucket), set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        version, scope, _ = key
+        for bucket in entry.vector:
+            keys = self._buckets.get((version, scope, bucket))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[(version, scope, bucket)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> Dict:
+        """Size and hit/miss counters"""
+        hits = self.hits + self.similar_hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
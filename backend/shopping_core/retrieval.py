@@ -0,0 +1,60 @@
+"""
+Catalog retrieval for chat prompts
+
+Instead of pasting the whole catalog (or its first few products) into the
+prompt, each chat turn gets the top-K products most relevant to the customer's
+message, boosted by their memory context. The two rankings are merged with
+reciprocal rank fusion so the catalog only has to provide an ordered list.
+"""
+
+from typing import Dict, List
+
+# Reciprocal rank fusion damping constant
+RRF_K = 60
+
+
+class ProductRetriever:
+    """Picks the catalog products relevant to a chat turn"""
+
+    def __init__(self, catalog, top_k: int = 8, context_weight: float = 0.5):
+        self.catalog = catalog
+        self.top_k = top_k
+        self.context_weight = context_weight
+
+    def rank(self, text: str) -> List[Dict]:
+        """Candidate products for one text, best first"""
+        if not text:
+            return []
+        return self.catalog.rank(text, self.top_k * 2)
+
+    def fuse(
+        self, message_ranked: List[Dict], context_ranked: List[Dict] = ()
+    ) -> List[Dict]:
+        """Merge message and context rankings into the top-K products.
+
+        Falls back to the first catalog page when nothing matches, so the
+        assistant always has some products to talk about.
+        """
+        scores: Dict[str, float] = {}
+        products: Dict[str, Dict] = {}
+
+        for ranked, weight in (
+            (message_ranked, 1.0),
+            (context_ranked, self.context_weight),
+        ):
+            for position, product in enumerate(ranked):
+                product_id = product["id"]
+                scores[product_id] = scores.get(product_id, 0.0) + weight / (
+                    RRF_K + position + 1
+                )
+                products[product_id] = product
+
+        if not scores:
+            return self.catalog.page(limit=self.top_k)
+
+        best = sorted(scores, key=lambda product_id: -scores[product_id])
+        return [products[product_id] for product_id in best[: self.top_k]]
+
+    def retrieve(self, message: str, context: str = "") -> List[Dict]:
+        """Top-K products for a message and optional customer context"""
+        return self.fuse(self.rank(message), self.rank(context))
@@ -0,0 +1,165 @@
+"""
+Product and catalog admin routes shared by both backends
+"""
+
+import asyncio
+from functools import partial
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from .catalog import ProductCatalog
+from .models import CatalogChanges, Product, ProductSearchRequest
+from .pages import MAX_PAGE_SIZE, ProductPageCache, etag_matches
+from .profiling import admin_guard
+from .reload import CatalogReloader
+from .search import search_key
+from .singleflight import SingleFlight
+
+
+def product_router(
+    catalog, pages: ProductPageCache, search_flight: SingleFlight
+) -> APIRouter:
+    """``/products*`` and ``/categories`` routes over a catalog"""
+    router = APIRouter()
+
+    @router.get("/products")
+    async def get_all_products(
+        request: Request,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+    ):
+        """Get available products.
+
+        Without ``limit``/``cursor`` the whole catalog is returned. With them the
+        response is one page and ``X-Next-Cursor`` holds the cursor of the next
+        page. ``fields=id,name,price`` limits the fields returned per product.
+        """
+        # A cache miss renders from the catalog, which for stores is disk I/O
+        loop = asyncio.get_running_loop()
+        render = partial(pages.get, cursor=cursor, limit=limit, fields=fields)
+        try:
+            page = await loop.run_in_executor(None, render)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+        if page.next_cursor:
+            headers["X-Next-Cursor"] = page.next_cursor
+
+        if etag_matches(request.headers.get("if-none-match"), page.etag):
+            return Response(status_code=304, headers=headers)
+
+        return Response(
+            content=page.body, media_type="application/json", headers=headers
+        )
+
+    @router.post("/products/search", response_model=List[Product])
+    async def search_products(request: ProductSearchRequest):
+        """Search products with filters"""
+        snapshot = catalog.snapshot()
+        search = partial(
+            snapshot.search,
+            category=request.category,
+            max_price=request.max_price,
+            min_rating=request.min_rating,
+            query=request.query,
+        )
+        key = (
+            snapshot.version,
+            search_key(
+                request.category, request.max_price, request.min_rating, request.query
+            ),
+        )
+
+        # Identical concurrent searches share one catalog query, run off the
+        # event loop since store-backed catalogs do I/O
+        loop = asyncio.get_running_loop()
+        return await search_flight.do(key, lambda: loop.run_in_executor(None, search))
+
+    @router.get("/products/{product_id}", response_model=Product)
+    async def get_product(product_id: str):
+        """Get a specific product by ID"""
+        loop = asyncio.get_running_loop()
+        product = await loop.run_in_executor(None, catalog.get, product_id)
+        if product is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+
+        return product
+
+    @router.get("/categories")
+    async def get_categories():
+        """Get all product categories"""
+        loop = asyncio.get_running_loop()
+        return {"categories": await loop.run_in_executor(None, catalog.categories)}
+
+    return router
+
+
+def catalog_admin_router(
+    reloader: CatalogReloader, admin_token: Optional[str], max_changes: int
+) -> APIRouter:
+    """Admin routes to inspect, hot-reload and patch the catalog"""
+    router = APIRouter(
+        prefix="/admin",
+        tags=["admin"],
+        dependencies=[Depends(admin_guard(admin_token))],
+    )
+
+    @router.get("/catalog")
+    def catalog_status():
+        """Catalog version, memory footprint and reload counters"""
+        catalog = reloader.catalog
+        return {
+            "version": catalog.version,
+            "products": len(catalog),
+            "table": catalog.stats() if isinstance(catalog, ProductCatalog) else None,
+            "reload": reloader.stats(),
+        }
+
+    @router.post("/catalog/reload")
+    async def reload_catalog():
+        """Load CATALOG_FILE again and swap it in without a restart.
+
+        The new indexes are built off the event loop; requests keep being
+        served from the current catalog until the swap.
+        """
+        if not reloader.enabled:
+            raise HTTPException(
+                status_code=409,
+                detail="Catalog reload needs an in-memory catalog and CATALOG_FILE",
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, reloader.reload)
+        except Exception as e:
+            raise HTTPException(
+                status_code=422, detail=f"Catalog reload failed: {str(e)}"
+            )
+
+    @router.post("/catalog/changes")
+    async def apply_catalog_changes(changes: CatalogChanges):
+        """Upsert and delete products without reloading the whole catalog.
+
+        Upserts may be partial (``{"id": ..., "price": ...}``). The batch is
+        applied as one new catalog version, or not at all if any upsert is
+        invalid.
+        """
+        size = len(changes.upserts) + len(changes.deletes)
+        if size > max_changes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {max_changes} changes per batch, got {size}",
+            )
+        loop = asyncio.get_running_loop()
+        upserts = [change.model_dump(exclude_unset=True) for change in changes.upserts]
+        apply = partial(reloader.apply_changes, upserts, changes.deletes)
+        try:
+            return await loop.run_in_executor(None, apply)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except NotImplementedError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    return router
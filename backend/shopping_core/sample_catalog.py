@@ -0,0 +1,126 @@
+"""
+Built-in sample catalog
+
+Served from memory by both backends unless ``CATALOG_URL`` points at an
+on-disk store.
+"""
+
+# Mock product database - same as Azure version for consistency
+PRODUCT_CATALOG = {
+    "electronics": [
+        {
+            "id": "iphone15",
+            "name": "iPhone 15 Pro",
+            "price": 999,
+            "rating": 4.8,
+            "category": "smartphone",
+            "description": "Latest iPhone with Pro camera system and titanium design",
+            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/iphone-15-pro-finish-select-202309-6-1inch-naturaltitanium?wid=5120&hei=2880",
+        },
+        {
+            "id": "macbook",
+            "name": "MacBook Air M2",
+            "price": 1199,
+            "rating": 4.9,
+            "category": "laptop",
+            "description": "Powerful M2 chip with all-day battery life",
+            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/macbook-air-midnight-select-20220606?wid=904&hei=840",
+        },
+        {
+            "id": "airpods",
+            "name": "AirPods Pro",
+            "price": 249,
+            "rating": 4.7,
+            "category": "audio",
+            "description": "Active noise cancellation and spatial audio",
+            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/MQD83?wid=2000&hei=2000",
+        },
+        {
+            "id": "ipad",
+            "name": "iPad Air",
+            "price": 599,
+            "rating": 4.6,
+            "category": "tablet",
+            "description": "Versatile iPad with M1 chip for creativity and productivity",
+            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/ipad-air-select-wifi-blue-202203?wid=940&hei=1112",
+        },
+    ],
+    "clothing": [
+        {
+            "id": "nike_shoes",
+            "name": "Nike Air Max",
+            "price": 120,
+            "rating": 4.5,
+            "category": "footwear",
+            "description": "Comfortable running shoes with Air Max cushioning",
+            "image": "https://static.nike.com/a/images/t_PDP_1728_v1/f_auto,q_auto:eco/99486859-0ff3-46b4-949b-2d16af2ad421/air-max-90-mens-shoes-6n7391.png",
+        },
+        {
+            "id": "levi_jeans",
+            "name": "Levi's 501 Jeans",
+            "price": 80,
+            "rating": 4.4,
+            "category": "pants",
+            "description": "Classic straight-leg jeans with authentic fit",
+            "image": "https://lsco.scene7.com/is/image/lsco/005010000-front-pdp?fmt=jpeg&qlt=70,1&op_sharpen=0&resMode=sharp2&op_usm=0.9,1.0,8,0&iccEmbed=0&printRes=72&_tparam_layer_1_src=sw/005010000-front-pdp&_tparam_layer_1_anchor=c&_tparam_layer_1_origin=1",
+        },
+        {
+            "id": "sweater",
+            "name": "Cashmere Sweater",
+            "price": 150,
+            "rating": 4.6,
+            "category": "tops",
+            "description": "Luxurious 100% cashmere sweater for ultimate comfort",
+            "image": "https://images.unsplash.com/photo-1551488831-00ddcb6c6bd3?w=500&h=500&fit=crop",
+        },
+    ],
+    "home": [
+        {
+            "id": "coffee_maker",
+            "name": "Breville Coffee Maker",
+            "price": 300,
+            "rating": 4.7,
+            "category": "kitchen",
+            "description": "Professional-grade espresso machine for home use",
+            "image": "https://images.unsplash.com/photo-1559056199-641a0ac8b55e?w=500&h=500&fit=crop",
+        },
+        {
+            "id": "vacuum",
+            "name": "Dyson V15",
+            "price": 450,
+            "rating": 4.8,
+            "category": "cleaning",
+            "description": "Powerful cordless vacuum with laser detect technology",
+            "image": "https://images.unsplash.com/photo-1558618047-3c8c76ca7d13?w=500&h=500&fit=crop",
+        },
+        {
+            "id": "mattress",
+            "name": "Memory Foam Mattress",
+            "price": 800,
+            "rating": 4.5,
+            "category": "bedroom",
+            "description": "Premium memory foam for optimal sleep comfort",
+            "image": "https://images.unsplash.com/photo-1586023492125-27b2c045efd7?w=500&h=500&fit=crop",
+        },
+    ],
+    "books": [
+        {
+            "id": "ai_book",
+            "name": "AI for Everyone",
+            "price": 25,
+            "rating": 4.3,
+            "category": "technology",
+            "description": "Non-technical guide to understanding artificial intelligence",
+            "image": "https://images.unsplash.com/photo-1485988512492-1d364fe2c5ac?w=500&h=500&fit=crop",
+        },
+        {
+            "id": "cookbook",
+            "name": "Mediterranean Cookbook",
+            "price": 30,
+            "rating": 4.6,
+            "category": "cooking",
+            "description": "Authentic Mediterranean recipes for healthy living",
+            "image": "https://images.unsplash.com/photo-1481627834876-b7833e8f5570?w=500&h=500&fit=crop",
+        },
+    ],
+}
@@ -0,0 +1,501 @@
+"""
+Product search index
+
+An inverted index over the product catalog, built once and queried on every
+``POST /products/search`` call instead of scanning the whole catalog:
+
+- text is tokenized into lowercase terms with a light plural folding
+- each term keeps a posting list of ``{doc_id: term_frequency}``
+- query terms are AND-ed together (the last term also matches as a prefix,
+  so search-as-you-type keeps working) and ranked with BM25
+- price and rating live in sorted typed arrays so ``max_price``/``min_rating``
+  become a bisect and a slice instead of a comparison per product
+
+Products themselves are stored column by column in a ``ProductTable`` (see
+``shopping_core.columns``); dicts are only built for the products returned.
+
+``apply()`` patches the index for a batch of changed products without a
+rebuild. Structures searches iterate (posting lists, category lists, the
+sorted arrays) are copied, patched and swapped in, never edited in place,
+so concurrent searches see each of them either before or after the batch.
+Deleted documents keep their id, matching nothing, until the next full build.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .columns import ProductTable
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Free-text ranking (``rank``) ignores these, they say nothing about products
+STOPWORDS = frozenset(
+    "a about an and any are as at be best can do does for from get have help "
+    "hi hello how i im in is it looking me my need of on or please recommend "
+    "show some something suggest that the there this to under want what "
+    "which with would you your".split()
+)
+
+# Terms matching more documents than this only re-score candidates found
+# through rarer terms when ranking free text
+MAX_RANK_POSTINGS = 20000
+
+# Above this many changed prices/ratings in one batch, the sorted arrays are
+# rebuilt with one merge instead of an insert per change
+SORTED_PATCH_LIMIT = 64
+
+# Posting lists matched by one query term, each with its precomputed IDF
+TermPostings = List[Tuple[Dict[int, int], float]]
+
+# Unranked searches with a limit walk the catalog in order, checking each
+# product, when that is expected to check this many times fewer products
+# than the most selective filter matches
+FILTER_SCAN_RATIO = 4
+
+# Parallel sorted keys (array('d')) and doc ids (array('I')), swapped together
+SortedIndex = Tuple[array, array]
+
+
+def normalize_term(term: str) -> str:
+    """Fold simple plurals so "laptops" finds "laptop" """
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized search terms"""
+    return [normalize_term(term) for term in TOKEN_PATTERN.findall(text.lower())]
+
+
+def search_key(
+    category: Optional[str] = None,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+    query: Optional[str] = None,
+) -> Tuple:
+    """Normalized search filters, equal for searches returning the same products"""
+    return (
+        category.lower() if category else None,
+        max_price or None,
+        min_rating or None,
+        " ".join(TOKEN_PATTERN.findall(query.lower())) if query else None,
+    )
+
+
+def product_text(group: str, product: Dict) -> str:
+    """Searchable text for a product"""
+    return f"{product['name']} {product['category']} {product['description']} {group}"
+
+
+class SearchIndex:
+    """Inverted index with BM25 ranking and sorted numeric filter indexes"""
+
+    def __init__(self, entries: Iterable[Tuple[str, Dict]] = ()):
+        self.products = ProductTable()
+        self._doc_norms = array("d")
+        self._average_length = 0.0
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._vocabulary: List[str] = []
+        self._categories: Dict[str, array] = {}
+        self._price_index: SortedIndex = (array("d"), array("I"))
+        self._rating_index: SortedIndex = (array("d"), array("I"))
+        self.build(entries)
+
+    @classmethod
+    def from_catalog(cls, catalog: Dict[str, List[Dict]]) -> "SearchIndex":
+        """Build an index from a ``{group: [product, ...]}`` catalog"""
+        return cls(
+            (group, product)
+            for group, products in catalog.items()
+            for product in products
+        )
+
+    def __len__(self) -> int:
+        return self.products.live
+
+    def build(self, entries: Iterable[Tuple[str, Dict]]) -> None:
+        """(Re)build the index from ``(group, product)`` pairs"""
+        products = ProductTable()
+        doc_lengths = []
+        postings: Dict[str, Dict[int, int]] = {}
+        categories: Dict[str, array] = {}
+
+        for doc_id, (group, product) in enumerate(entries):
+            products.put(doc_id, group, product)
+            group_key = group.lower()
+            category_key = product["category"].lower()
+
+            categories.setdefault(group_key, array("I")).append(doc_id)
+            if category_key != group_key:
+                categories.setdefault(category_key, array("I")).append(doc_id)
+
+            terms = tokenize(product_text(group, product))
+            doc_lengths.append(len(terms))
+            for term in terms:
+                term_docs = postings.setdefault(term, {})
+                term_docs[doc_id] = term_docs.get(doc_id, 0) + 1
+
+        average_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+        self._average_length = average_length
+        # Per-document part of the BM25 denominator, precomputed once
+        self._doc_norms = array("d", (self._norm(length) for length in doc_lengths))
+
+        price_order = sorted(range(len(products)), key=products.price)
+        rating_order = sorted(range(len(products)), key=products.rating)
+
+        self.products = products
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+        self._categories = categories
+        self._price_index = (
+            array("d", map(products.price, price_order)),
+            array("I", price_order),
+        )
+        self._rating_index = (
+            array("d", map(products.rating, rating_order)),
+            array("I", rating_order),
+        )
+
+    def _norm(self, length: int) -> float:
+        """Per-document part of the BM25 denominator"""
+        if not self._average_length:
+            return BM25_K1
+        return BM25_K1 * (1 - BM25_B + BM25_B * length / self._average_length)
+
+    def apply(self, changes: Iterable[Tuple[int, str, Optional[Dict]]]) -> None:
+        """Patch the index for changed documents instead of rebuilding it.
+
+        ``changes`` are ``(doc_id, group, product)`` triples, one per
+        document: ``product`` replaces the document (a ``doc_id`` past the
+        end adds one) and ``None`` deletes it. Only products whose text
+        changed are re-tokenized, and a price update only touches the
+        price index. New documents use the average length of the last build
+        for BM25 length normalization.
+        """
+        products = self.products
+        postings: Dict[str, Dict[int, int]] = {}
+        categories: Dict[str, Tuple[set, set]] = {}
+        prices: Dict[int, Tuple[Optional[float], Optional[float]]] = {}
+        ratings: Dict[int, Tuple[Optional[float], Optional[float]]] = {}
+        deleted = []
+
+        for doc_id, group, product in changes:
+            old = products.get(doc_id) if doc_id < len(products) else None
+            if old is None and product is None:
+                continue
+
+            old_keys: Tuple[str, ...] = ()
+            old_text = new_text = None
+            if old is not None:
+                old_keys = products.keys(doc_id)
+                old_text = product_text(old_keys[0], old)
+            new_keys: Tuple[str, ...] = ()
+            if product is not None:
+                new_keys = (group.lower(), product["category"].lower())
+                new_text = product_text(new_keys[0], product)
+
+            # Price and rating updates leave the text, and the postings, alone
+            old_terms: Counter = Counter()
+            new_terms: Counter = Counter()
+            if old_text != new_text:
+                old_terms = Counter(tokenize(old_text or ""))
+                new_terms = Counter(tokenize(new_text or ""))
+            for term in old_terms.keys() - new_terms.keys():
+                postings.setdefault(term, {})[doc_id] = 0
+            for term, frequency in new_terms.items():
+                if old_terms.get(term) != frequency:
+                    postings.setdefault(term, {})[doc_id] = frequency
+
+            for key in set(old_keys) - set(new_keys):
+                categories.setdefault(key, (set(), set()))[0].add(doc_id)
+            for key in set(new_keys) - set(old_keys):
+                categories.setdefault(key, (set(), set()))[1].add(doc_id)
+
+            for field, changed in (("price", prices), ("rating", ratings)):
+                before = old[field] if old is not None else None
+                after = product[field] if product is not None else None
+                if before != after:
+                    changed[doc_id] = (before, after)
+
+            if product is None:
+                deleted.append(doc_id)
+                continue
+
+            # Documents are replaced whole before the indexes point at them
+            while len(self._doc_norms) <= doc_id:
+                self._doc_norms.append(BM25_K1)
+            if old_terms != new_terms:
+                self._doc_norms[doc_id] = self._norm(sum(new_terms.values()))
+            products.put(doc_id, group, product)
+
+        new_terms_seen = False
+        for term, docs in postings.items():
+            term_docs = dict(self._postings.get(term, ()))
+            new_terms_seen = new_terms_seen or term not in self._postings
+            for doc_id, frequency in docs.items():
+                if frequency:
+                    term_docs[doc_id] = frequency
+                else:
+                    term_docs.pop(doc_id, None)
+            # Emptied terms stay (matching nothing) so lookups never race a delete
+            self._postings[term] = term_docs
+        if new_terms_seen:
+            self._vocabulary = sorted(self._postings)
+
+        for key, (removed, added) in categories.items():
+            doc_ids = array(
+                "I",
+                (
+                    doc_id
+                    for doc_id in self._categories.get(key, ())
+                    if doc_id not in removed
+                ),
+            )
+            for doc_id in sorted(added):
+                insort(doc_ids, doc_id)
+            self._categories[key] = doc_ids
+
+        if prices:
+            self._price_index = self._patch_sorted(self._price_index, prices)
+        if ratings:
+            self._rating_index = self._patch_sorted(self._rating_index, ratings)
+
+        for doc_id in deleted:
+            products.delete(doc_id)
+
+    @staticmethod
+    def _patch_sorted(
+        index: SortedIndex,
+        changed: Dict[int, Tuple[Optional[float], Optional[float]]],
+    ) -> SortedIndex:
+        """Copy of a sorted index with ``{doc_id: (old, new)}`` keys replaced"""
+        keys, docs = index
+        if len(changed) > SORTED_PATCH_LIMIT:
+            kept = ((key, doc) for key, doc in zip(keys, docs) if doc not in changed)
+            added = sorted(
+                (after, doc) for doc, (_, after) in changed.items() if after is not None
+            )
+            merged = list(heapq.merge(kept, added))
+            return (
+                array("d", (key for key, _ in merged)),
+                array("I", (doc for _, doc in merged)),
+            )
+
+        keys, docs = array("d", keys), array("I", docs)
+        for doc, (before, after) in changed.items():
+            if before is not None:
+                start = bisect_left(keys, before)
+                position = docs.index(doc, start, bisect_right(keys, before, start))
+                del keys[position]
+                del docs[position]
+            if after is not None:
+                position = bisect_right(keys, after)
+                keys.insert(position, after)
+                docs.insert(position, doc)
+        return keys, docs
+
+    def _expand(self, term: str, prefix: bool) -> List[str]:
+        """Vocabulary terms matched by a query term"""
+        if not prefix:
+            return [term] if term in self._postings else []
+        start = bisect_left(self._vocabulary, term)
+        end = bisect_left(self._vocabulary, term + "\uffff", start)
+        return self._vocabulary[start:end]
+
+    def _idf(self, term_docs: Dict[int, int]) -> float:
+        total = self.products.live
+        return math.log(1 + (total - len(term_docs) + 0.5) / (len(term_docs) + 0.5))
+
+    def _match_query(self, query: str) -> Tuple[set, List[TermPostings]]:
+        """Documents matching every query term, plus the postings to score them.
+
+        Doc id sets are intersected first (in C, smallest first) so BM25 is
+        only computed for documents that actually match.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        term_postings = []
+        doc_sets = []
+        for i, term in enumerate(terms):
+            postings = [
+                (self._postings[indexed_term], self._idf(self._postings[indexed_term]))
+                for indexed_term in self._expand(term, prefix=(i == len(terms) - 1))
+            ]
+            if not postings:
+                return set(), []
+            docs = postings[0][0].keys()
+            if len(postings) > 1:
+                docs = set().union(*(term_docs.keys() for term_docs, _ in postings))
+            term_postings.append(postings)
+            doc_sets.append(docs)
+
+        doc_sets.sort(key=len)
+        matches = set(doc_sets[0])
+        for docs in doc_sets[1:]:
+            matches &= docs
+            if not matches:
+                break
+        return matches, term_postings
+
+    def _bm25(self, doc_id: int, term_postings: List[TermPostings]) -> float:
+        """BM25 score of a document for the matched query terms"""
+        score = 0.0
+        norm = self._doc_norms[doc_id]
+        for postings in term_postings:
+            for term_docs, idf in postings:
+                frequency = term_docs.get(doc_id)
+                if frequency:
+                    score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return score
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        query: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Search products with filters.
+
+        Results are ranked by relevance when a text query is given and keep
+        catalog order otherwise.
+        """
+        category_key = category.lower() if category else None
+        term_postings = None
+        candidates: Optional[Iterable[int]] = None
+
+        # Doc ids allowed by each filter, straight from the filter indexes
+        options = []
+        if category_key:
+            options.append(self._categories.get(category_key, []))
+        if max_price:
+            price_keys, price_docs = self._price_index
+            options.append(price_docs[: bisect_right(price_keys, max_price)])
+        if min_rating:
+            rating_keys, rating_docs = self._rating_index
+            options.append(rating_docs[bisect_left(rating_keys, min_rating) :])
+
+        if query and tokenize(query):
+            candidates, term_postings = self._match_query(query)
+            # Narrow text matches with any filter that is more selective
+            for option in sorted(options, key=len):
+                if len(option) >= len(candidates):
+                    break
+                candidates = candidates.intersection(option)
+        elif options:
+            # Start from the most selective filter, check the others per document
+            candidates = min(options, key=len)
+
+        products = self.products
+        if candidates is None:
+            matched = range(len(products))
+            if products.live < len(products):
+                matched = [doc_id for doc_id in matched if products.exists(doc_id)]
+        else:
+            matched = None
+            if term_postings is None and limit is not None:
+                matched = self._scan(
+                    limit, len(candidates), category_key, max_price, min_rating
+                )
+            if matched is None:
+                matched = [
+                    doc_id
+                    for doc_id in candidates
+                    if products.matches(doc_id, category_key, max_price, min_rating)
+                ]
+                if term_postings is not None:
+                    scores = {
+                        doc_id: self._bm25(doc_id, term_postings) for doc_id in matched
+                    }
+
+                    def rank(doc_id: int) -> Tuple[float, int]:
+                        return (-scores[doc_id], doc_id)
+
+                    if limit is not None:
+                        matched = heapq.nsmallest(limit, matched, key=rank)
+                    else:
+                        matched.sort(key=rank)
+                else:
+                    matched.sort()
+
+        if limit is not None:
+            matched = matched[:limit]
+        # A document deleted while this search ran is left out
+        return [product for product in map(products.get, matched) if product]
+
+    def _scan(
+        self,
+        limit: int,
+        candidates: int,
+        category_key: Optional[str],
+        max_price: Optional[float],
+        min_rating: Optional[float],
+    ) -> Optional[List[int]]:
+        """First ``limit`` matching doc ids in catalog order, found by checking
+        products in order, or ``None`` when that is not worth it.
+
+        With broad filters the first matches are near the start of the
+        catalog, which beats collecting and sorting all ``candidates``. The
+        scan gives up after a fraction of that work if the filters turn out
+        to be narrower together than apart.
+        """
+        products = self.products
+        if limit * len(products) * FILTER_SCAN_RATIO >= candidates**2:
+            return None
+        scanned = range(min(len(products), candidates // FILTER_SCAN_RATIO))
+        matched = list(
+            islice(
+                (
+                    doc_id
+                    for doc_id in scanned
+                    if products.matches(doc_id, category_key, max_price, min_rating)
+                ),
+                limit,
+            )
+        )
+        if len(matched) < limit and len(scanned) < len(products):
+            return None
+        return matched
+
+    def rank(self, text: str, limit: int) -> List[Dict]:
+        """Top ``limit`` products matching any term of free text, by BM25.
+
+        Used to pick the products relevant to a chat message, so unlike
+        ``search`` a document only needs to match one of the terms.
+        """
+        terms = [
+            term
+            for term in dict.fromkeys(tokenize(text))
+            if term not in STOPWORDS and term in self._postings
+        ]
+        terms.sort(key=lambda term: len(self._postings[term]))
+
+        scores: Dict[int, float] = {}
+        for term in terms:
+            term_docs = self._postings[term]
+            idf = self._idf(term_docs)
+            if scores and len(term_docs) > MAX_RANK_POSTINGS:
+                doc_ids = [doc_id for doc_id in scores if doc_id in term_docs]
+            else:
+                doc_ids = term_docs
+            for doc_id in doc_ids:
+                frequency = term_docs[doc_id]
+                norm = self._doc_norms[doc_id]
+                weight = idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+
+        top = heapq.nsmallest(
+            limit, scores, key=lambda doc_id: (-scores[doc_id], doc_id)
+        )
+        return [product for product in map(self.products.get, top) if product]
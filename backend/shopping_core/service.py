@@ -0,0 +1,175 @@
+"""
+The app shared by both agent backends
+
+``ShoppingService`` builds the FastAPI app with everything that does not
+depend on the agent: CORS, the catalog and its product routes, the response
+cache, metrics, profiling and ``/health``. An agent backend is a thin adapter
+that adds its chat routes and registers its own caches and health checks.
+
+Only light dependencies are imported here, so workers that never chat do not
+pay for loading the agent SDKs.
+"""
+
+import asyncio
+from typing import Callable, Dict
+
+from fastapi import FastAPI, Response
+from fastapi.middleware.cors import CORSMiddleware
+
+from . import settings
+from .catalog import open_catalog, read_catalog_file
+from .metrics import CONTENT_TYPE, ChatMetrics, MetricsRegistry
+from .pages import ProductPageCache
+from .profiling import RequestProfiler, profiling_router
+from .reload import CatalogReloader
+from .response_cache import ResponseCache
+from .routers import catalog_admin_router, product_router
+from .sample_catalog import PRODUCT_CATALOG
+from .shared_cache import open_shared_cache
+from .singleflight import SingleFlight
+
+
+class ShoppingService:
+    """Catalog, caches, metrics and routes common to every backend"""
+
+    def __init__(
+        self,
+        title: str,
+        description: str,
+        version: str,
+        namespace: str,
+    ):
+        # Catalog with prebuilt id, category and search indexes, or an on-disk
+        # store when CATALOG_URL is set (e.g. sqlite:///catalog.db)
+        default_catalog = PRODUCT_CATALOG
+        if settings.CATALOG_FILE and not settings.CATALOG_URL:
+            default_catalog = read_catalog_file(settings.CATALOG_FILE)
+        self.catalog = open_catalog(settings.CATALOG_URL, default_catalog)
+
+        # Hot reload of CATALOG_FILE, backends warm their prompts on reload
+        self.reloader = CatalogReloader(self.catalog, settings.CATALOG_FILE)
+
+        # Serialized GET /products pages, invalidated when the catalog changes
+        self.pages = ProductPageCache(self.catalog)
+
+        # Identical concurrent catalog searches share one computation
+        self.search_flight = SingleFlight()
+
+        self.shared_cache = open_shared_cache(
+            settings.SHARED_CACHE_URL, namespace=namespace
+        )
+        self.response_cache = ResponseCache(
+            max_size=settings.RESPONSE_CACHE_SIZE,
+            ttl=settings.RESPONSE_CACHE_TTL,
+            similarity=settings.RESPONSE_CACHE_SIMILARITY,
+            shared=self.shared_cache,
+        )
+
+        self.metrics_registry = MetricsRegistry()
+        self.metrics = ChatMetrics(self.metrics_registry)
+        # Read at scrape time, backends add their own caches with add_cache()
+        self.caches: Dict[str, Callable[[], Dict]] = {
+            "response": self.response_cache.stats
+        }
+        self.metrics_registry.cache_metrics(self.caches)
+
+        # Sampled stack profiles and slow-request log, read through /admin
+        self.profiler = RequestProfiler(
+            routes=["/chat", "/products/search"],
+            sample_rate=settings.PROFILE_SAMPLE_RATE,
+            interval=settings.PROFILE_INTERVAL_MS / 1000,
+            slow_threshold=settings.SLOW_REQUEST_THRESHOLD_MS / 1000,
+            slow_log_size=settings.SLOW_REQUEST_LOG_SIZE,
+        )
+
+        # Sections of GET /health, backends add theirs with add_health()
+        self.health_checks: Dict[str, Callable[[], object]] = {
+            "catalog": lambda: {
+                "version": self.catalog.version,
+                "products": len(self.catalog),
+                "reloads": self.reloader.reloads,
+            },
+            "response_cache": self.response_cache.stats,
+            "shared_cache": lambda: (
+                type(self.shared_cache).__name__ if self.shared_cache else None
+            ),
+            "single_flight": lambda: {"search": self.search_flight.stats()},
+        }
+
+        # Event-loop lag probe and catalog file watcher, started with the app
+        self.loop_monitor = None
+        self.catalog_watcher = None
+
+        self.app = self._create_app(title, description, version)
+
+    def add_cache(self, name: str, stats: Callable[[], Dict]) -> None:
+        """Export a cache's hit/miss counters on /metrics"""
+        self.caches[name] = stats
+
+    def add_health(self, name: str, check: Callable[[], object]) -> None:
+        """Add (or replace) a section of the /health response"""
+        self.health_checks[name] = check
+
+    def _create_app(self, title: str, description: str, version: str) -> FastAPI:
+        app = FastAPI(title=title, description=description, version=version)
+
+        # CORS middleware to allow frontend connections
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=settings.CORS_ORIGINS,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+            expose_headers=["ETag", "X-Next-Cursor"],
+        )
+
+        # Request latency histograms per route for /metrics, then profiling
+        app.middleware("http")(self.metrics.track_request)
+        app.middleware("http")(self.profiler.track_request)
+
+        app.include_router(product_router(self.catalog, self.pages, self.search_flight))
+        app.include_router(profiling_router(self.profiler, settings.ADMIN_TOKEN))
+        app.include_router(
+            catalog_admin_router(
+                self.reloader, settings.ADMIN_TOKEN, settings.CATALOG_CHANGES_MAX_SIZE
+            )
+        )
+
+        @app.on_event("startup")
+        async def start_background_tasks():
+            self.loop_monitor = asyncio.create_task(self.metrics.monitor_event_loop())
+            if self.reloader.enabled and settings.CATALOG_WATCH_INTERVAL > 0:
+                self.catalog_watcher = asyncio.create_task(
+                    self.reloader.watch(settings.CATALOG_WATCH_INTERVAL)
+                )
+
+        @app.on_event("shutdown")
+        async def stop_background_tasks():
+            if self.loop_monitor:
+                self.loop_monitor.cancel()
+            if self.catalog_watcher:
+                self.catalog_watcher.cancel()
+
+        @app.get("/")
+        async def root():
+            """Health check endpoint"""
+            return {
+                "message": "Smart Shopping Assistant API is running",
+                "status": "healthy",
+            }
+
+        @app.get("/metrics")
+        def metrics():
+            """Prometheus metrics"""
+            return Response(
+                content=self.metrics_registry.render(), media_type=CONTENT_TYPE
+            )
+
+        @app.get("/health")
+        def health():
+            status = {"status": "ok"}
+            for name, check in self.health_checks.items():
+                status[name] = check()
+            return status
+
+        return app
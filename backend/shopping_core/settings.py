@@ -0,0 +1,61 @@
+"""
+Settings shared by both backends
+
+Read from the environment when the module is first imported, so backends
+load their ``.env`` file before importing ``shopping_core``.
+"""
+
+import os
+
+# Catalog store URL (e.g. sqlite:///catalog.db), unset serves the sample
+# catalog from memory
+CATALOG_URL = os.environ.get("CATALOG_URL")
+
+# Product feed (.json, .jsonl or .csv) served from memory instead of the
+# sample catalog. It can be reloaded without a restart through
+# POST /admin/catalog/reload, or automatically when it changes by checking
+# it every CATALOG_WATCH_INTERVAL seconds (0 = off).
+CATALOG_FILE = os.environ.get("CATALOG_FILE")
+CATALOG_WATCH_INTERVAL = float(os.environ.get("CATALOG_WATCH_INTERVAL", "0"))
+
+# POST /admin/catalog/changes: max upserts plus deletes per batch
+CATALOG_CHANGES_MAX_SIZE = int(os.environ.get("CATALOG_CHANGES_MAX_SIZE", "10000"))
+
+# Cache shared by all workers (sqlite:///... on one host, redis://... across
+# nodes); unset keeps every cache inside its worker process
+SHARED_CACHE_URL = os.environ.get("SHARED_CACHE_URL")
+
+# Frontend origins allowed by CORS, comma separated
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.environ.get(
+        "CORS_ORIGINS",
+        "http://localhost:8080,http://127.0.0.1:8080,"
+        "http://localhost:3000,http://127.0.0.1:3000,http://localhost:3001,"
+        "https://preview--smart-shopping-assistant-fastapi.lovable.app",
+    ).split(",")
+    if origin.strip()
+]
+
+# Number of catalog products retrieved into each chat turn
+PROMPT_TOP_K = int(os.environ.get("PROMPT_TOP_K", "8"))
+
+# Replies to repeated questions are cached per catalog version. Set
+# RESPONSE_CACHE_SIMILARITY (0-1) to also serve near-identical questions.
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "5000"))
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "600"))
+RESPONSE_CACHE_SIMILARITY = float(os.environ.get("RESPONSE_CACHE_SIMILARITY", "0"))
+
+# POST /chat/batch: max requests per batch and turns run concurrently
+CHAT_BATCH_MAX_SIZE = int(os.environ.get("CHAT_BATCH_MAX_SIZE", "1000"))
+CHAT_BATCH_CONCURRENCY = int(os.environ.get("CHAT_BATCH_CONCURRENCY", "8"))
+
+# Admin routes (/admin/*) need the X-Admin-Token header; disabled when unset
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Fraction of /chat and /products/search requests profiled (0 = off), and the
+# latency above which requests go to the slow-request log (milliseconds)
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+SLOW_REQUEST_THRESHOLD_MS = float(os.environ.get("SLOW_REQUEST_THRESHOLD_MS", "2000"))
+SLOW_REQUEST_LOG_SIZE = int(os.environ.get("SLOW_REQUEST_LOG_SIZE", "200"))
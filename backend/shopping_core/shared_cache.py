@@ -0,0 +1,197 @@
+"""
+Caches shared between worker processes
+
+With several uvicorn workers (or nodes) every process has its own caches.
+That is only a missed opportunity for cached replies, but it is wrong for
+memory invalidation: the worker that records new customer facts would only
+bump its own memory generation. A ``SharedCache`` holds the generation
+counters every worker must agree on, plus cached replies and memory context
+the other workers can reuse. It is opened from a URL:
+
+- ``sqlite:///path/to/cache.db`` - workers on one host (WAL mode)
+- ``redis://host:6379/0`` - workers on several nodes (requires ``redis``)
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class SharedCache:
+    """Base class for cross-process caches with string keys and values.
+
+    Keys are prefixed with ``namespace`` so several backends can share one
+    cache without seeing each other's entries.
+    """
+
+    namespace = ""
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached value, ``None`` if missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        raise NotImplementedError
+
+    def counter(self, key: str) -> int:
+        """Current value of a counter, 0 if never incremented"""
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        """Atomically increment a counter, returns the new value"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteSharedCache(SharedCache):
+    """Cache in a SQLite file shared by the workers of one host.
+
+    WAL mode lets readers proceed while one worker writes; writers wait up to
+    ``busy_timeout`` seconds for the lock instead of failing. Expired entries
+    are purged every ``purge_every`` writes.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_expires
+            ON cache_entries (expires_at);
+        CREATE TABLE IF NOT EXISTS cache_counters (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 30.0, purge_every: int = 1000):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[str]:
+        key = self.namespace + key
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        key = self.namespace + key
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at)"
+            " VALUES (?, ?, ?)",
+            (key, value, now + ttl),
+        )
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            connection.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (now,)
+            )
+
+    def counter(self, key: str) -> int:
+        key = self.namespace + key
+        row = (
+            self._connection()
+            .execute("SELECT value FROM cache_counters WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def incr(self, key: str) -> int:
+        key = self.namespace + key
+        connection = self._connection()
+        # The write lock is taken up front, so concurrent increments serialize
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR IGNORE INTO cache_counters (key, value) VALUES (?, 0)",
+                (key,),
+            )
+            connection.execute(
+                "UPDATE cache_counters SET value = value + 1 WHERE key = ?", (key,)
+            )
+            value = connection.execute(
+                "SELECT value FROM cache_counters WHERE key = ?", (key,)
+            ).fetchone()[0]
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return value
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class RedisSharedCache(SharedCache):
+    """Cache in Redis, shared by workers on any number of nodes"""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "Redis shared caches require redis: pip install redis"
+            ) from e
+
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(self.namespace + key)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(self.namespace + key, value, px=max(int(ttl * 1000), 1))
+
+    def counter(self, key: str) -> int:
+        return int(self._client.get(self.namespace + key) or 0)
+
+    def incr(self, key: str) -> int:
+        return self._client.incr(self.namespace + key)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def open_shared_cache(url: Optional[str], namespace: str = "") -> Optional[SharedCache]:
+    """Open a shared cache from a ``sqlite:///`` or ``redis://`` URL, ``None`` if unset"""
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        cache = SQLiteSharedCache(url[len("sqlite:///") :])
+    elif url.startswith(("redis://", "rediss://", "unix://")):
+        cache = RedisSharedCache(url)
+    else:
+        raise ValueError(f"Unsupported shared cache URL: {url}")
+    cache.namespace = f"{namespace}:" if namespace else ""
+    return cache
@@ -0,0 +1,83 @@
+"""
+Request coalescing
+
+Concurrent requests with the same key share one computation instead of
+each doing the full work, which protects the upstream model and the memory
+store from thundering herds of identical requests.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that have the same key.
+
+    ``do()`` is for coroutines on the event loop, ``call()`` for blocking
+    functions on worker threads. The first caller of a key runs the
+    computation; callers arriving while it is in flight wait for and share
+    its result (or exception). Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``func()``, or the in-flight call with the same key"""
+        task = self._tasks.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finish_task(key, done))
+        else:
+            self.shared += 1
+
+        # A caller that is cancelled (client went away) must not cancel the
+        # computation the other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _finish_task(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved, so an unawaited failure is not logged
+
+    def call(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Run ``func()``, or wait for the in-flight call with the same key"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.leaders += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": len(self._tasks) + len(self._calls),
+            "leaders": self.leaders,
+            "shared": self.shared,
+        }
@@ -0,0 +1,764 @@
+"""
+On-disk catalog stores
+
+Large catalogs live on disk instead of in a Python literal. A store is opened
+from a catalog URL and read lazily - nothing is materialized at startup:
+
+- ``sqlite:///path/to/catalog.db`` - products table with indexes on price,
+  rating and category plus an FTS5 full-text index for ``query``
+- ``parquet:///path/to/catalog.parquet`` - columnar file read in batches,
+  filters are pushed down to row-group statistics (requires ``pyarrow``)
+
+``StoredCatalog`` wraps a store behind the same interface as
+``ProductCatalog`` so the routes do not care where products come from.
+"""
+
+import heapq
+import math
+import os
+import sqlite3
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .search import STOPWORDS, TOKEN_PATTERN, product_text, tokenize
+
+PRODUCT_FIELDS = ("id", "name", "price", "rating", "category", "description", "image")
+
+# Fields a new product must have, description and image default to ""
+REQUIRED_FIELDS = ("id", "name", "price", "rating", "category")
+
+# Fields holding numbers, every other field (and "group") holds text
+NUMERIC_FIELDS = ("price", "rating")
+
+
+def normalize_product(record: Dict) -> Dict:
+    """Product with exactly ``PRODUCT_FIELDS``, prices and ratings as numbers"""
+    return {
+        "id": record["id"],
+        "name": record["name"],
+        "price": float(record["price"]),
+        "rating": float(record["rating"]),
+        "category": record["category"],
+        "description": record.get("description", ""),
+        "image": record.get("image", ""),
+    }
+
+
+def check_fields(product_id: str, fields: Dict) -> None:
+    """Raise ``ValueError`` unless prices and ratings are finite, non-negative
+    numbers and every other field is text"""
+    for field, value in fields.items():
+        if field in NUMERIC_FIELDS:
+            valid = (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and math.isfinite(value)
+                and value >= 0
+            )
+            expected = "a finite non-negative number"
+        else:
+            valid = isinstance(value, str)
+            expected = "text"
+        if not valid:
+            raise ValueError(f"Product {product_id}: {field} must be {expected}")
+
+
+def merge_change(
+    change: Dict, current: Optional[Dict], current_group: Optional[str]
+) -> Tuple[str, Dict]:
+    """``(group, product)`` after applying an upsert to a product.
+
+    ``change`` holds the product id, the fields to set and optionally a new
+    ``group``; fields it leaves out keep their current values, so a price
+    update only needs ``{"id": ..., "price": ...}``. Raises ``ValueError``
+    for unknown fields, fields of the wrong type, negative or non-finite
+    numbers and new products missing a required field.
+    """
+    if not change.get("id") or not isinstance(change["id"], str):
+        raise ValueError("Every upsert needs a product id string")
+    fields = dict(change)
+    group = fields.pop("group", None)
+    unknown = [field for field in fields if field not in PRODUCT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown product fields: {', '.join(unknown)}")
+    check_fields(change["id"], {**fields, "group": group or ""})
+
+    merged = {**current, **fields} if current else fields
+    missing = [field for field in REQUIRED_FIELDS if field not in merged]
+    if missing:
+        raise ValueError(
+            f"New product {change.get('id')} is missing: {', '.join(missing)}"
+        )
+    product = normalize_product(merged)
+    return group or current_group or product["category"], product
+
+
+class CatalogStore:
+    """Base class for on-disk catalog stores"""
+
+    def version(self) -> int:
+        """Changes whenever the stored catalog changes"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def categories(self) -> List[str]:
+        """Catalog group names"""
+        raise NotImplementedError
+
+    def get(self, product_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def page(self, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Products in catalog order, starting after the product id ``after``"""
+        raise NotImplementedError
+
+    def products_in(self, group: str) -> List[Dict]:
+        """Products in one catalog group"""
+        raise NotImplementedError
+
+    def iter_entries(self, batch_size: int = 1000) -> Iterator[Tuple[str, Dict]]:
+        """Lazily iterate ``(group, product)`` pairs in catalog order"""
+        raise NotImplementedError
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        query: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Search products with filters, evaluated inside the store"""
+        raise NotImplementedError
+
+    def rank(self, text: str, limit: int) -> List[Dict]:
+        """Top ``limit`` products matching any term of free text"""
+        raise NotImplementedError
+
+    def bulk_import(
+        self, entries: Iterable[Tuple[str, Dict]], batch_size: int = 5000
+    ) -> int:
+        """Append ``(group, product)`` pairs, returns the number imported"""
+        raise NotImplementedError
+
+    def apply_changes(self, upserts: List[Dict], deletes: List[str]) -> Dict:
+        """Upsert (see ``merge_change``) and delete products as one new version.
+
+        Returns the number of products upserted and deleted.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support incremental changes,"
+            " import the catalog again instead"
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteCatalogStore(CatalogStore):
+    """Catalog stored in a SQLite database"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS products (
+            seq INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            grp TEXT NOT NULL,
+            grp_key TEXT NOT NULL,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            rating REAL NOT NULL,
+            category TEXT NOT NULL,
+            category_key TEXT NOT NULL,
+            description TEXT NOT NULL,
+            image TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_products_price ON products (price);
+        CREATE INDEX IF NOT EXISTS idx_products_rating ON products (rating);
+        CREATE INDEX IF NOT EXISTS idx_products_grp ON products (grp_key, seq);
+        CREATE INDEX IF NOT EXISTS idx_products_category
+            ON products (category_key, seq);
+        -- Position of deleted products, so page cursors pointing at them
+        -- keep working
+        CREATE TABLE IF NOT EXISTS deleted_products (
+            id TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_deleted_products_seq
+            ON deleted_products (seq);
+        CREATE TRIGGER IF NOT EXISTS products_tombstone AFTER DELETE ON products
+        BEGIN
+            INSERT OR REPLACE INTO deleted_products (id, seq)
+            VALUES (old.id, old.seq);
+        END;
+        CREATE TABLE IF NOT EXISTS catalog_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('version', 0);
+    """
+
+    # New products go after every product ever stored, deleted ones included,
+    # so a cursor at a deleted product never skips them
+    UPSERT = (
+        "INSERT INTO products (seq, id, grp, grp_key, name, price, rating,"
+        " category, category_key, description, image)"
+        " VALUES (MAX(COALESCE((SELECT MAX(seq) FROM products), 0),"
+        " COALESCE((SELECT MAX(seq) FROM deleted_products), 0)) + 1,"
+        " ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (id) DO UPDATE SET"
+        " grp = excluded.grp, grp_key = excluded.grp_key,"
+        " name = excluded.name, price = excluded.price,"
+        " rating = excluded.rating, category = excluded.category,"
+        " category_key = excluded.category_key,"
+        " description = excluded.description, image = excluded.image"
+    )
+
+    BUMP_VERSION = "UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'"
+
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5 (
+            name, category, description, grp,
+            content='products', content_rowid='seq', tokenize='porter unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products
+        BEGIN
+            INSERT INTO products_fts (rowid, name, category, description, grp)
+            VALUES (new.seq, new.name, new.category, new.description, new.grp);
+        END;
+        CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products
+        BEGIN
+            INSERT INTO products_fts
+                (products_fts, rowid, name, category, description, grp)
+            VALUES ('delete', old.seq, old.name, old.category, old.description,
+                    old.grp);
+        END;
+        CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE ON products
+        BEGIN
+            INSERT INTO products_fts
+                (products_fts, rowid, name, category, description, grp)
+            VALUES ('delete', old.seq, old.name, old.category, old.description,
+                    old.grp);
+            INSERT INTO products_fts (rowid, name, category, description, grp)
+            VALUES (new.seq, new.name, new.category, new.description, new.grp);
+        END;
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # (catalog version, group names): the GROUP BY scans the whole table
+        self._categories: Optional[Tuple[int, List[str]]] = None
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(self.SCHEMA)
+        try:
+            connection.executescript(self.FTS_SCHEMA)
+            self.full_text = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5, text queries fall back to LIKE
+            self.full_text = False
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def _rows(self, sql: str, params: Iterable = ()) -> List[Dict]:
+        cursor = self._connection().execute(sql, tuple(params))
+        return [{field: row[field] for field in PRODUCT_FIELDS} for row in cursor]
+
+    def version(self) -> int:
+        row = (
+            self._connection()
+            .execute("SELECT value FROM catalog_meta WHERE key = 'version'")
+            .fetchone()
+        )
+        return row[0]
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def categories(self) -> List[str]:
+        version = self.version()
+        cached = self._categories
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        # Read after the version, so a concurrent import only causes a rescan
+        cursor = self._connection().execute(
+            "SELECT grp FROM products GROUP BY grp ORDER BY MIN(seq)"
+        )
+        categories = [row[0] for row in cursor]
+        self._categories = (version, categories)
+        return categories
+
+    def get(self, product_id: str) -> Optional[Dict]:
+        rows = self._rows("SELECT * FROM products WHERE id = ?", (product_id,))
+        return rows[0] if rows else None
+
+    def page(self, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        if after is None:
+            return self._rows("SELECT * FROM products ORDER BY seq LIMIT ?", (limit,))
+        return self._rows(
+            "SELECT * FROM products WHERE seq > COALESCE("
+            " (SELECT seq FROM products WHERE id = ?),"
+            " (SELECT seq FROM deleted_products WHERE id = ?)"
+            ") ORDER BY seq LIMIT ?",
+            (after, after, limit),
+        )
+
+    def products_in(self, group: str) -> List[Dict]:
+        return self._rows(
+            "SELECT * FROM products WHERE grp_key = ? AND grp = ? ORDER BY seq",
+            (group.lower(), group),
+        )
+
+    def iter_entries(self, batch_size: int = 1000) -> Iterator[Tuple[str, Dict]]:
+        last_seq = 0
+        while True:
+            cursor = self._connection().execute(
+                "SELECT * FROM products WHERE seq > ? ORDER BY seq LIMIT ?",
+                (last_seq, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row["grp"], {field: row[field] for field in PRODUCT_FIELDS}
+            last_seq = rows[-1]["seq"]
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        query: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        clauses = []
+        params: List = []
+        terms = TOKEN_PATTERN.findall(query.lower()) if query else []
+
+        if terms and self.full_text:
+            # Every term must match, the last one as a prefix (search-as-you-type)
+            match = " ".join(f'"{term}"' for term in terms) + "*"
+            sql = (
+                "SELECT p.* FROM products_fts JOIN products p"
+                " ON p.seq = products_fts.rowid"
+            )
+            clauses.append("products_fts MATCH ?")
+            params.append(match)
+            order = "products_fts.rank, p.seq"
+        else:
+            sql = "SELECT p.* FROM products p"
+            order = "p.seq"
+            for term in terms:
+                clauses.append(
+                    "(p.name || ' ' || p.category || ' ' || p.description"
+                    " || ' ' || p.grp) LIKE ?"
+                )
+                params.append(f"%{term}%")
+
+        if category:
+            clauses.append("(p.grp_key = ? OR p.category_key = ?)")
+            params.extend([category.lower(), category.lower()])
+        if max_price:
+            clauses.append("p.price <= ?")
+            params.append(max_price)
+        if min_rating:
+            clauses.append("p.rating >= ?")
+            params.append(min_rating)
+
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._rows(sql, params)
+
+    def rank(self, text: str, limit: int) -> List[Dict]:
+        terms = [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+        if not terms or not self.full_text:
+            return []
+        return self._rows(
+            "SELECT p.* FROM products_fts JOIN products p"
+            " ON p.seq = products_fts.rowid"
+            " WHERE products_fts MATCH ? ORDER BY products_fts.rank LIMIT ?",
+            (" OR ".join(f'"{term}"' for term in dict.fromkeys(terms)), limit),
+        )
+
+    def bulk_import(
+        self, entries: Iterable[Tuple[str, Dict]], batch_size: int = 5000
+    ) -> int:
+        connection = self._connection()
+        imported = 0
+        batch = []
+
+        def flush():
+            connection.executemany(self.UPSERT, batch)
+            batch.clear()
+
+        with connection:
+            for group, product in entries:
+                batch.append(self._row(group, product))
+                imported += 1
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+            connection.execute(self.BUMP_VERSION)
+        return imported
+
+    def apply_changes(self, upserts: List[Dict], deletes: List[str]) -> Dict:
+        connection = self._connection()
+        with connection:
+            for change in upserts:
+                row = connection.execute(
+                    "SELECT * FROM products WHERE id = ?", (change.get("id"),)
+                ).fetchone()
+                current = (
+                    {field: row[field] for field in PRODUCT_FIELDS} if row else None
+                )
+                group, product = merge_change(
+                    change, current, row["grp"] if row else None
+                )
+                connection.execute(self.UPSERT, self._row(group, product))
+            deleted = connection.executemany(
+                "DELETE FROM products WHERE id = ?",
+                [(product_id,) for product_id in deletes],
+            ).rowcount
+            connection.execute(self.BUMP_VERSION)
+        return {"upserted": len(upserts), "deleted": max(deleted, 0)}
+
+    @staticmethod
+    def _row(group: str, product: Dict) -> Tuple:
+        return (
+            product["id"],
+            group,
+            group.lower(),
+            product["name"],
+            float(product["price"]),
+            float(product["rating"]),
+            product["category"],
+            product["category"].lower(),
+            product.get("description", ""),
+            product.get("image", ""),
+        )
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class ParquetCatalogStore(CatalogStore):
+    """Catalog stored in a Parquet file (one row per product plus a group column)"""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow.compute as pc
+            import pyarrow.dataset as ds
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Parquet catalogs require pyarrow: pip install pyarrow"
+            ) from e
+
+        self.path = path
+        self._pc = pc
+        self._ds = ds
+        self._pq = pq
+        # (version, categories) of the last scan of the group column
+        self._categories: Optional[Tuple[int, List[str]]] = None
+        # (version, sorted ids, their row offsets) for page cursors
+        self._id_rows = None
+
+    def _dataset(self):
+        return self._ds.dataset(self.path, format="parquet")
+
+    def _products(self, table) -> List[Dict]:
+        columns = {field: table.column(field).to_pylist() for field in PRODUCT_FIELDS}
+        return [
+            {field: columns[field][i] for field in PRODUCT_FIELDS}
+            for i in range(table.num_rows)
+        ]
+
+    def version(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        return os.stat(self.path).st_mtime_ns
+
+    def count(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        return self._pq.ParquetFile(self.path).metadata.num_rows
+
+    def categories(self) -> List[str]:
+        version = self.version()
+        if not version:
+            return []
+        cached = self._categories
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        groups = self._dataset().to_table(columns=["group"]).column("group")
+        categories = list(dict.fromkeys(groups.to_pylist()))
+        self._categories = (version, categories)
+        return categories
+
+    def get(self, product_id: str) -> Optional[Dict]:
+        if not os.path.exists(self.path):
+            return None
+        field = self._ds.field
+        table = self._dataset().to_table(filter=field("id") == product_id)
+        products = self._products(table.slice(0, 1))
+        return products[0] if products else None
+
+    def _row_of(self, product_id: str) -> Optional[int]:
+        """Row offset of a product, by binary search over the sorted ids"""
+        version = self.version()
+        cached = self._id_rows
+        if cached is None or cached[0] != version:
+            table = self._pq.read_table(self.path, columns=["id"])
+            ids = table.column("id").combine_chunks()
+            order = self._pc.sort_indices(ids)
+            cached = self._id_rows = (version, ids.take(order), order)
+        _, sorted_ids, rows = cached
+        index = bisect_left(sorted_ids, product_id, key=lambda value: value.as_py())
+        if index < len(sorted_ids) and sorted_ids[index].as_py() == product_id:
+            return rows[index].as_py()
+        return None
+
+    def page(self, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        start = 0
+        if after is not None:
+            row = self._row_of(after)
+            if row is None:
+                return []
+            start = row + 1
+
+        # Read only the row groups holding rows start .. start + limit
+        parquet_file = self._pq.ParquetFile(self.path)
+        products: List[Dict] = []
+        first = 0
+        for index in range(parquet_file.num_row_groups):
+            rows = parquet_file.metadata.row_group(index).num_rows
+            if first + rows > start:
+                table = parquet_file.read_row_group(index, columns=list(PRODUCT_FIELDS))
+                offset = max(start - first, 0)
+                products += self._products(table.slice(offset, limit - len(products)))
+                if len(products) >= limit:
+                    break
+            first += rows
+        return products
+
+    def products_in(self, group: str) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        table = self._dataset().to_table(filter=self._ds.field("group") == group)
+        return self._products(table)
+
+    def iter_entries(self, batch_size: int = 1000) -> Iterator[Tuple[str, Dict]]:
+        if not os.path.exists(self.path):
+            return
+        parquet_file = self._pq.ParquetFile(self.path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            groups = batch.column("group").to_pylist()
+            for group, product in zip(groups, self._products(batch)):
+                yield group, product
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        query: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        import pyarrow.compute as pc
+
+        field = self._ds.field
+        expression = None
+
+        def require(condition):
+            nonlocal expression
+            expression = condition if expression is None else expression & condition
+
+        if category:
+            key = category.lower()
+            require(
+                (pc.utf8_lower(field("group")) == key)
+                | (pc.utf8_lower(field("category")) == key)
+            )
+        if max_price:
+            require(field("price") <= max_price)
+        if min_rating:
+            require(field("rating") >= min_rating)
+        if query:
+            text = pc.binary_join_element_wise(
+                field("name"),
+                field("category"),
+                field("description"),
+                field("group"),
+                " ",
+            )
+            for term in TOKEN_PATTERN.findall(query.lower()):
+                require(pc.match_substring(text, term, ignore_case=True))
+
+        table = self._dataset().to_table(filter=expression)
+        if limit is not None:
+            table = table.slice(0, limit)
+        return self._products(table)
+
+    def rank(self, text: str, limit: int) -> List[Dict]:
+        """Scans the file in batches, ranking by the number of matched terms"""
+        terms = set(tokenize(text)) - STOPWORDS
+        if not terms:
+            return []
+
+        def scored():
+            for position, (group, product) in enumerate(self.iter_entries()):
+                text_terms = tokenize(product_text(group, product))
+                matched = len(terms.intersection(text_terms))
+                if matched:
+                    yield -matched, position, product
+
+        return [product for _, _, product in heapq.nsmallest(limit, scored())]
+
+    def bulk_import(
+        self, entries: Iterable[Tuple[str, Dict]], batch_size: int = 50000
+    ) -> int:
+        import pyarrow as pa
+
+        schema = pa.schema(
+            [
+                ("id", pa.string()),
+                ("group", pa.string()),
+                ("name", pa.string()),
+                ("price", pa.float64()),
+                ("rating", pa.float64()),
+                ("category", pa.string()),
+                ("description", pa.string()),
+                ("image", pa.string()),
+            ]
+        )
+        columns = {name: [] for name in schema.names}
+        imported = 0
+
+        def append(group: str, product: Dict) -> None:
+            columns["group"].append(group)
+            for field in PRODUCT_FIELDS:
+                value = product.get(field, "")
+                if field in ("price", "rating"):
+                    value = float(value)
+                columns[field].append(value)
+
+        tmp_path = f"{self.path}.tmp"
+        with self._pq.ParquetWriter(tmp_path, schema) as writer:
+
+            def flush() -> None:
+                writer.write_table(pa.table(columns, schema=schema))
+                for values in columns.values():
+                    values.clear()
+
+            # Parquet files are immutable: rewrite the existing rows, minus
+            # the ones being replaced, followed by the new ones
+            new_entries = list(entries)
+            replaced = {product["id"] for _group, product in new_entries}
+            for group, product in self.iter_entries(batch_size=batch_size):
+                if product["id"] not in replaced:
+                    append(group, product)
+                    if len(columns["id"]) >= batch_size:
+                        flush()
+            for group, product in new_entries:
+                append(group, product)
+                imported += 1
+                if len(columns["id"]) >= batch_size:
+                    flush()
+            if columns["id"]:
+                flush()
+        os.replace(tmp_path, self.path)
+        return imported
+
+
+def open_store(url: str) -> CatalogStore:
+    """Open a catalog store from a ``sqlite:///`` or ``parquet:///`` URL"""
+    scheme, _, path = url.partition(":///")
+    if scheme == "sqlite":
+        return SQLiteCatalogStore(path)
+    if scheme == "parquet":
+        return ParquetCatalogStore(path)
+    raise ValueError(f"Unsupported catalog URL: {url}")
+
+
+class StoredCatalog:
+    """Catalog backed by a ``CatalogStore``, same interface as ``ProductCatalog``"""
+
+    def __init__(self, store: CatalogStore):
+        self.store = store
+
+    @property
+    def version(self) -> int:
+        return self.store.version()
+
+    def snapshot(self) -> "StoredCatalog":
+        """Stores are read on every call, there is no in-memory snapshot to pin"""
+        return self
+
+    def __len__(self) -> int:
+        return self.store.count()
+
+    def get(self, product_id: str) -> Optional[Dict]:
+        return self.store.get(product_id)
+
+    def products(self) -> List[Dict]:
+        """All products - reads the whole store, prefer ``page()``"""
+        return [product for _group, product in self.store.iter_entries()]
+
+    def page(self, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        return self.store.page(after=after, limit=limit)
+
+    def categories(self) -> List[str]:
+        return self.store.categories()
+
+    def products_in(self, category: str) -> List[Dict]:
+        return self.store.products_in(category)
+
+    def entries(self) -> Iterator[Tuple[str, Dict]]:
+        return self.store.iter_entries()
+
+    def rank(self, text: str, limit: int) -> List[Dict]:
+        return self.store.rank(text, limit)
+
+    def apply_changes(self, upserts: List[Dict], deletes: List[str]) -> Dict:
+        """Upsert and delete products in the store, see ``CatalogStore``"""
+        counts = self.store.apply_changes(upserts, deletes)
+        return {"version": self.version, "products": len(self), **counts}
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        query: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        return self.store.search(
+            category=category,
+            max_price=max_price,
+            min_rating=min_rating,
+            query=query,
+            limit=limit,
+        )
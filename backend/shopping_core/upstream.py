@@ -0,0 +1,194 @@
+"""
+Upstream model client policy
+
+A shared, tuned HTTP connection pool plus the retry and circuit breaker
+policy for calls to the upstream model. Retries use full jitter and are
+limited by a retry budget, so a struggling upstream is not hit with a retry
+storm; once it keeps failing the breaker opens and callers degrade instead
+of waiting on calls that will not succeed.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream is down (breaker open or retries exhausted)"""
+
+
+def create_http_client(
+    connect_timeout: float = 3.0,
+    read_timeout: float = 30.0,
+    max_connections: int = 100,
+    max_keepalive: int = 20,
+    keepalive_expiry: float = 60.0,
+):
+    """Shared keep-alive connection pool, HTTP/2 when ``h2`` is installed"""
+    import httpx
+
+    timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry,
+    )
+    try:
+        return httpx.AsyncClient(http2=True, timeout=timeout, limits=limits)
+    except ImportError:
+        print("⚠️ HTTP/2 support not installed (pip install 'httpx[http2]')")
+        return httpx.AsyncClient(timeout=timeout, limits=limits)
+
+
+class RetryBudget:
+    """Caps retries to a fraction of recent requests.
+
+    Every request deposits ``ratio`` tokens and every retry spends one, so
+    retries add at most ``ratio`` extra load on top of normal traffic. The
+    budget starts with ``min_retries`` tokens for low-traffic periods and
+    never holds more than ``max_tokens``.
+    """
+
+    def __init__(
+        self, ratio: float = 0.2, min_retries: int = 10, max_tokens: int = 100
+    ):
+        self.ratio = ratio
+        self._max_tokens = float(max(max_tokens, min_retries))
+        self._tokens = float(min_retries)
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self._max_tokens)
+
+    def withdraw(self) -> bool:
+        """Take a retry token, ``False`` if the budget is spent"""
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.retries += 1
+                return True
+            self.exhausted += 1
+            return False
+
+    def stats(self) -> Dict:
+        return {
+            "tokens": round(self._tokens, 2),
+            "retries": self.retries,
+            "exhausted": self.exhausted,
+        }
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures.
+
+    While open, calls are rejected without touching the upstream. After
+    ``reset_timeout`` seconds one probe call is let through (half-open): its
+    success closes the breaker, its failure opens it again. A probe that
+    never reports back (cancelled) is replaced after another timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go to the upstream now"""
+        now = time.monotonic()
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            probe_due = now - self._opened_at >= self.reset_timeout and (
+                self._probe_started is None
+                or now - self._probe_started >= self.reset_timeout
+            )
+            if probe_due:
+                self._probe_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    self.trips += 1
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+async def call_with_retries(
+    func: Callable[[], Awaitable[Any]],
+    *,
+    breaker: CircuitBreaker,
+    budget: RetryBudget,
+    retryable: Callable[[Exception], bool],
+    max_retries: int = 2,
+    base_delay: float = 0.2,
+    max_delay: float = 2.0,
+) -> Any:
+    """Call the upstream with jittered retries, behind the circuit breaker.
+
+    Errors that ``retryable`` rejects (bad requests, auth) are raised as is
+    and do not count against the upstream's health. Raises
+    ``UpstreamUnavailable`` when the breaker is open or retryable failures
+    outlast the retries or the budget.
+    """
+    if not breaker.allow():
+        raise UpstreamUnavailable("Upstream circuit breaker is open")
+
+    budget.deposit()
+    attempt = 0
+    while True:
+        try:
+            result = await func()
+        except Exception as e:
+            if not retryable(e):
+                # Says nothing about the upstream's health either way
+                raise
+            breaker.record_failure()
+            if attempt >= max_retries or not breaker.allow() or not budget.withdraw():
+                raise UpstreamUnavailable(str(e)) from e
+
+            # Full jitter: anywhere between no delay and the backoff cap
+            attempt += 1
+            await asyncio.sleep(
+                random.uniform(0, min(max_delay, base_delay * 2**attempt))
+            )
+            continue
+
+        breaker.record_success()
+        return result
@@ -0,0 +1,25 @@
+import importlib.util
+import os
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_backend(name: str, directory: str):
+    """A backend's main module, loaded without starting its services"""
+    path = os.path.join(BACKEND, directory, "main.py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def do_main():
+    return load_backend("do_main", "with-digital-ocean-agent")
+
+
+@pytest.fixture(scope="session")
+def swarms_main():
+    return load_backend("swarms_main", "with-swarms-agent")
@@ -0,0 +1,79 @@
+import threading
+import time
+from types import SimpleNamespace
+
+
+def make_agent(customer_id):
+    history = [{"role": "system", "content": "prompt"}]
+    return SimpleNamespace(
+        customer_id=customer_id,
+        short_memory=SimpleNamespace(conversation_history=history),
+    )
+
+
+def test_each_customer_gets_their_own_agent(swarms_main):
+    pool = swarms_main.AgentPool(make_agent, max_size=2, window=4)
+
+    with pool.session("alice") as alice:
+        pass
+    with pool.session("bob") as bob:
+        pass
+    with pool.session("alice") as again:
+        pass
+
+    assert alice is again
+    assert alice is not bob
+    assert (alice.customer_id, bob.customer_id) == ("alice", "bob")
+
+
+def test_least_recently_used_agents_are_evicted(swarms_main):
+    pool = swarms_main.AgentPool(make_agent, max_size=2, window=4)
+
+    for customer_id in ["a", "b", "a", "c"]:
+        with pool.session(customer_id) as agent:
+            agent.short_memory.conversation_history.append(customer_id)
+
+    assert len(pool) == 2
+    with pool.session("a") as a:
+        assert a.short_memory.conversation_history[1:] == ["a", "a"]
+    with pool.session("b") as b:
+        assert b.short_memory.conversation_history[1:] == []
+
+
+def test_conversations_are_trimmed_to_the_window(swarms_main):
+    pool = swarms_main.AgentPool(make_agent, max_size=2, window=3)
+
+    with pool.session("alice") as agent:
+        agent.short_memory.conversation_history.extend(range(10))
+
+    assert agent.short_memory.conversation_history == [
+        {"role": "system", "content": "prompt"},
+        7,
+        8,
+        9,
+    ]
+
+
+def test_sessions_of_one_customer_are_exclusive(swarms_main):
+    prepared = []
+    pool = swarms_main.AgentPool(
+        make_agent, max_size=4, window=10, prepare=lambda a: prepared.append(a)
+    )
+    active = []
+    overlaps = []
+
+    def turn(customer_id):
+        with pool.session(customer_id):
+            active.append(customer_id)
+            overlaps.append(active.count(customer_id))
+            time.sleep(0.01)
+            active.remove(customer_id)
+
+    threads = [threading.Thread(target=turn, args=(c,)) for c in "aaabbb"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(overlaps) == 1
+    assert len(prepared) == 6
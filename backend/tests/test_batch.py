@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+from shopping_core.batch import stream_batch
+from shopping_core.models import ChatRequest
+
+
+async def collect(lines):
+    return [line async for line in lines]
+
+
+def test_batch_lines_carry_the_index_in_completion_order():
+    async def handle(index, delay):
+        await asyncio.sleep(delay)
+        if index == 1:
+            raise ValueError("bad request")
+        return {"response": f"reply {index}"}
+
+    lines = asyncio.run(collect(stream_batch([0.03, 0.0, 0.01], handle, 3)))
+
+    assert all(line.endswith("\n") and line.count("\n") == 1 for line in lines)
+    assert [json.loads(line) for line in lines] == [
+        {"index": 1, "error": "bad request"},
+        {"index": 2, "response": "reply 2"},
+        {"index": 0, "response": "reply 0"},
+    ]
+
+
+def test_batch_runs_at_most_concurrency_items_at_once():
+    running = []
+    peak = []
+
+    async def handle(index, item):
+        running.append(index)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(index)
+        return {}
+
+    lines = asyncio.run(collect(stream_batch(range(10), handle, 3)))
+
+    assert sorted(json.loads(line)["index"] for line in lines) == list(range(10))
+    assert max(peak) == 3
+
+
+def test_chat_batch_streams_one_line_per_request(do_main, monkeypatch):
+    written = []
+
+    async def lookup_customer_preferences(customer_id):
+        return ""
+
+    async def run_chat_turn(user_input, customer_id):
+        if user_input == "fail":
+            raise RuntimeError("boom")
+        return f"{customer_id}: {user_input}", {"customer_id": customer_id}
+
+    async def write_record_group(records):
+        written.extend(records)
+
+    monkeypatch.setattr(
+        do_main, "lookup_customer_preferences", lookup_customer_preferences
+    )
+    monkeypatch.setattr(do_main, "run_chat_turn", run_chat_turn)
+    monkeypatch.setattr(do_main, "write_record_group", write_record_group)
+
+    requests = [
+        ChatRequest(message=message, customer_id=customer_id)
+        for message, customer_id in [("shoes", "a"), ("fail", "b"), ("desk", "b")]
+    ]
+    lines = asyncio.run(collect(do_main.stream_chat_batch(requests)))
+    results = sorted((json.loads(line) for line in lines), key=lambda r: r["index"])
+
+    assert all(line.endswith("\n") and line.count("\n") == 1 for line in lines)
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["response"] == "a: shoes"
+    assert results[1] == {"index": 1, "error": "boom"}
+    assert results[2]["customer_id"] == "b"
+    assert sorted(r["customer_id"] for r in written) == ["a", "b"]
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks import compare, stub_upstream
+from benchmarks.catalog import generate_catalog
+from benchmarks.run import build_scenarios, percentile
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 1.0) == 100.0
+    assert percentile(values, 0.07) == 7.0
+    assert percentile([3.0], 0.99) == 3.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_generated_catalog_is_deterministic():
+    catalog = generate_catalog(250, seed=1)
+    ids = [p["id"] for products in catalog.values() for p in products]
+
+    assert catalog == generate_catalog(250, seed=1)
+    assert catalog != generate_catalog(250, seed=2)
+    assert len(ids) == len(set(ids)) == 250
+
+
+def test_large_catalogs_skip_the_full_listing():
+    small = [s.name for s in build_scenarios(["p1"], catalog_size=100)]
+    large = [s.name for s in build_scenarios(["p1"], catalog_size=10**6)]
+
+    assert "GET /products" in small
+    assert "GET /products" not in large
+    assert set(large) < set(small)
+
+
+def write_results(path, rps, p95):
+    result = {"route": "POST /chat", "concurrency": 8, "throughput_rps": rps}
+    result.update({"p50_ms": 10.0, "p95_ms": p95, "p99_ms": 40.0})
+    path.write_text(json.dumps({"results": [result]}))
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "rps, p95, status",
+    [(100.0, 20.0, 0), (95.0, 21.0, 0), (80.0, 20.0, 1), (100.0, 30.0, 1)],
+)
+def test_compare_fails_on_regressions(tmp_path, rps, p95, status):
+    baseline = write_results(tmp_path / "baseline.json", 100.0, 20.0)
+    candidate = write_results(tmp_path / "candidate.json", rps, p95)
+
+    assert compare.main([baseline, candidate, "--threshold", "0.1"]) == status
+
+
+def test_stub_upstream_speaks_chat_completions(monkeypatch):
+    monkeypatch.setattr(stub_upstream.app.state, "latency", 0)
+    monkeypatch.setattr(stub_upstream.app.state, "token_latency", 0)
+    body = {"model": "n/a", "messages": [{"role": "user", "content": "hi there"}]}
+
+    with TestClient(stub_upstream.app) as client:
+        completion = client.post("/api/v1/chat/completions", json=body).json()
+        stream = client.post("/v1/chat/completions", json={**body, "stream": True}).text
+
+    assert completion["choices"][0]["message"]["content"] == stub_upstream.REPLY
+    assert completion["usage"]["prompt_tokens"] == 2
+    events = [e[len("data: ") :] for e in stream.strip().split("\n\n")]
+    assert events[-1] == "[DONE]"
+    tokens = [json.loads(e)["choices"][0]["delta"]["content"] for e in events[:-1]]
+    assert "".join(tokens).strip() == stub_upstream.REPLY
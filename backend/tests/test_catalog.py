@@ -0,0 +1,51 @@
+import copy
+
+from shopping_core.catalog import ProductCatalog
+from shopping_core.sample_catalog import PRODUCT_CATALOG
+
+
+def linear_get(catalog, product_id):
+    """Reference: the catalog walk the id index replaced"""
+    for group, products in catalog.items():
+        for product in products:
+            if product["id"] == product_id:
+                return group, product
+    return None
+
+
+def test_get_matches_a_linear_scan():
+    raw = copy.deepcopy(PRODUCT_CATALOG)
+    catalog = ProductCatalog(raw)
+
+    for group, products in raw.items():
+        for product in products:
+            assert catalog.get(product["id"]) == product
+            assert linear_get(raw, product["id"]) == (group, product)
+            assert catalog.snapshot().group_of(product["id"]) == group
+
+    assert catalog.get("no-such-product") is None
+    assert catalog.snapshot().group_of("no-such-product") is None
+
+
+def test_get_sees_changes_and_deletes():
+    catalog = ProductCatalog(copy.deepcopy(PRODUCT_CATALOG))
+    first, second = [p["id"] for p in catalog.products()[:2]]
+
+    catalog.apply_changes(
+        [
+            {"id": first, "price": 1.0},
+            {
+                "id": "new-lamp",
+                "name": "Desk Lamp",
+                "price": 20.0,
+                "rating": 4.0,
+                "category": "home",
+            },
+        ],
+        [second],
+    )
+
+    assert catalog.get(first)["price"] == 1.0
+    assert catalog.get(second) is None
+    assert catalog.get("new-lamp")["name"] == "Desk Lamp"
+    assert len(catalog) == len(catalog.products())
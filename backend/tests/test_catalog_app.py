@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+
+from shopping_core.catalog_app import app, product_catalog
+
+
+def test_catalog_worker_serves_product_routes():
+    with TestClient(app) as client:
+        products = client.get("/products").json()
+        assert products == product_catalog.products()
+
+        first = products[0]
+        assert client.get(f"/products/{first['id']}").json() == first
+        assert client.get("/products/no-such-product").status_code == 404
+        assert client.get("/categories").json() == {
+            "categories": product_catalog.categories()
+        }
+
+        found = client.post("/products/search", json={"query": first["name"]})
+        assert first["id"] in [p["id"] for p in found.json()]
+
+        assert client.get("/health").status_code == 200
+        assert "http_request_duration_seconds" in client.get("/metrics").text
+        assert client.post("/chat", json={"message": "hi"}).status_code == 404
+
+
+def test_catalog_worker_pages_with_etags():
+    with TestClient(app) as client:
+        page = client.get("/products", params={"limit": 2, "fields": "id,price"})
+        assert page.status_code == 200
+        assert len(page.json()) == 2
+        assert set(page.json()[0]) == {"id", "price"}
+        assert page.headers["x-next-cursor"] == page.json()[-1]["id"]
+
+        cached = client.get(
+            "/products",
+            params={"limit": 2, "fields": "id,price"},
+            headers={"If-None-Match": page.headers["etag"]},
+        )
+        assert cached.status_code == 304
+        assert client.get("/products", params={"fields": "colour"}).status_code == 400
@@ -0,0 +1,72 @@
+import math
+
+import pytest
+from pydantic import ValidationError
+
+from shopping_core.catalog import ProductCatalog
+from shopping_core.models import CatalogChanges
+
+
+def make_catalog() -> ProductCatalog:
+    return ProductCatalog(
+        {
+            "audio": [
+                {
+                    "id": "headphones",
+                    "name": "Headphones",
+                    "price": 99.0,
+                    "rating": 4.5,
+                    "category": "audio",
+                    "description": "Wireless headphones",
+                    "image": "",
+                }
+            ]
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"id": "headphones", "name": None},
+        {"id": "headphones", "rating": None},
+        {"id": "headphones", "price": math.nan},
+        {"id": "headphones", "price": -1.0},
+        {"id": 7, "name": "Speaker", "price": 1.0, "rating": 1.0, "category": "a"},
+    ],
+)
+def test_invalid_upsert_leaves_catalog_unchanged(change):
+    catalog = make_catalog()
+    valid = {"id": "speaker", "name": "Speaker", "price": 5.0, "rating": 4.0}
+
+    with pytest.raises(ValueError):
+        catalog.apply_changes([{**valid, "category": "audio"}, change], [])
+
+    assert catalog.version == 1
+    assert catalog.get("speaker") is None
+    assert catalog.get("headphones")["price"] == 99.0
+    assert [p["id"] for p in catalog.search(max_price=1000)] == ["headphones"]
+
+
+def test_partial_upsert_updates_only_given_fields():
+    catalog = make_catalog()
+
+    catalog.apply_changes([{"id": "headphones", "price": 79}], [])
+
+    product = catalog.get("headphones")
+    assert (product["price"], product["rating"]) == (79.0, 4.5)
+    assert catalog.version == 2
+
+
+@pytest.mark.parametrize(
+    "upsert",
+    [
+        {"id": "headphones", "price": "nan"},
+        {"id": "headphones", "price": -1},
+        {"id": "headphones", "colour": "red"},
+        {"id": ""},
+    ],
+)
+def test_changes_model_rejects_invalid_upserts(upsert):
+    with pytest.raises(ValidationError):
+        CatalogChanges(upserts=[upsert])
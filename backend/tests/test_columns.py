@@ -0,0 +1,35 @@
+from shopping_core.columns import ProductTable
+
+PRODUCT = {
+    "id": "lamp",
+    "name": "Desk Lamp",
+    "price": 30.0,
+    "rating": 4.0,
+    "category": "lighting",
+    "description": "LED desk lamp",
+    "image": "https://cdn.example.com/img/lamp.png",
+}
+
+
+def test_price_or_rating_change_is_written_in_place():
+    table = ProductTable()
+    table.put(0, "home", PRODUCT)
+
+    table.put(0, "home", {**PRODUCT, "price": 25.0})
+    table.put(0, "home", {**PRODUCT, "price": 25.0, "rating": 4.5})
+
+    assert table.get(0) == {**PRODUCT, "price": 25.0, "rating": 4.5}
+    assert table.stats()["rows"] == 1
+
+
+def test_other_changes_append_a_row():
+    table = ProductTable()
+    table.put(0, "home", PRODUCT)
+
+    table.put(0, "home", {**PRODUCT, "price": 20.0, "rating": 3.0})
+    table.put(0, "office", {**PRODUCT, "price": 20.0, "rating": 3.0})
+    table.put(0, "office", {**PRODUCT, "name": "Lamp", "price": 20.0, "rating": 3.0})
+
+    assert table.get(0)["name"] == "Lamp"
+    assert table.group(0) == "office"
+    assert table.stats()["rows"] == 4
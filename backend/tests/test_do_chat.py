@@ -0,0 +1,68 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+
+def reply(text: str):
+    message = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+async def ticks_while(work):
+    """Run ``work`` and count event-loop ticks of 10ms meanwhile"""
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.ensure_future(ticker())
+    try:
+        result = await work
+    finally:
+        task.cancel()
+    return result, ticks
+
+
+def test_slow_completions_do_not_block_the_loop(do_main, monkeypatch):
+    async def build_chat_messages(user_input, customer_id):
+        return [{"role": "user", "content": user_input}], False
+
+    async def call_upstream(messages, stream=False):
+        await asyncio.sleep(0.2)
+        return reply(f"answer to {messages[0]['content']}")
+
+    monkeypatch.setattr(do_main, "build_chat_messages", build_chat_messages)
+    monkeypatch.setattr(do_main, "call_upstream", call_upstream)
+
+    async def turns():
+        return await asyncio.gather(
+            *(
+                do_main.run_chat_turn(f"question {i} for the loop", "a")
+                for i in range(3)
+            )
+        )
+
+    started = time.perf_counter()
+    results, ticks = asyncio.run(ticks_while(turns()))
+
+    assert [answer for answer, _ in results] == [
+        f"answer to question {i} for the loop" for i in range(3)
+    ]
+    assert time.perf_counter() - started < 0.5
+    assert ticks >= 10
+
+
+def test_blocking_memory_calls_run_off_the_loop(do_main):
+    def search_memory(query):
+        time.sleep(0.2)
+        return f"memories about {query}"
+
+    result, ticks = asyncio.run(
+        ticks_while(do_main.run_memory_call(search_memory, "shoes"))
+    )
+
+    assert result == "memories about shoes"
+    assert ticks >= 10
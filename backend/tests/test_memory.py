@@ -0,0 +1,80 @@
+from shopping_core.memory import (
+    MemoryContextCache,
+    WriteBehindQueue,
+    write_batch_with_retry,
+    write_each,
+)
+
+
+class FlakyStore:
+    """Records written one at a time, failing the given calls"""
+
+    def __init__(self, fail_calls=(), bad_records=()):
+        self.records = []
+        self.calls = 0
+        self.fail_calls = set(fail_calls)
+        self.bad_records = set(bad_records)
+
+    def write_record(self, record):
+        self.calls += 1
+        if self.calls in self.fail_calls or record["n"] in self.bad_records:
+            raise RuntimeError("database is locked")
+        self.records.append(record["n"])
+
+    def write_batch(self, records):
+        write_each(self.write_record, records)
+
+
+def records(count):
+    return [{"n": n} for n in range(count)]
+
+
+def test_partial_failure_retries_only_unwritten_records():
+    store = FlakyStore(fail_calls={4})
+
+    assert write_batch_with_retry(store.write_batch, records(10)) == (10, 0)
+    assert store.records == list(range(10))
+
+
+def test_bad_record_is_skipped_and_the_rest_written_once():
+    store = FlakyStore(bad_records={2})
+
+    assert write_batch_with_retry(store.write_batch, records(5)) == (4, 1)
+    assert store.records == [0, 1, 3, 4]
+
+
+def test_queue_writes_every_record_once_and_flushes_on_stop():
+    store = FlakyStore(fail_calls={3, 20})
+    writer = WriteBehindQueue(store.write_batch, max_size=100, batch_size=7)
+
+    for record in records(30):
+        assert writer.submit(record)
+    writer.stop()
+
+    assert sorted(store.records) == list(range(30))
+    assert writer.stats()["written"] == 30
+    assert writer.stats()["failed"] == 0
+
+
+def test_context_cache_misses_after_invalidation():
+    cache = MemoryContextCache(max_size=10, ttl=60)
+    key = cache.key("alice", "What running shoes?")
+    cache.set(key, "likes trail running")
+
+    assert cache.key("alice", "what   running shoes") == key
+    assert cache.get(key) == "likes trail running"
+    assert cache.get(cache.key("bob", "what running shoes")) is None
+
+    cache.invalidate("alice")
+
+    assert cache.get(cache.key("alice", "what running shoes")) is None
+    assert cache.get(cache.key("bob", "what running shoes")) is None
+    assert cache.invalidations == 1
+
+
+def test_context_cache_entries_expire():
+    cache = MemoryContextCache(max_size=10, ttl=0)
+    key = cache.key("alice", "shoes")
+    cache.set(key, "context")
+
+    assert cache.get(key) is None
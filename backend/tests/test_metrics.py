@@ -0,0 +1,52 @@
+from shopping_core.metrics import ChatMetrics, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram(
+        "latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0)
+    )
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value, route="/chat")
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/chat",le="0.1"} 1',
+        'latency_seconds_bucket{route="/chat",le="1.0"} 3',
+        'latency_seconds_bucket{route="/chat",le="+Inf"} 4',
+        'latency_seconds_sum{route="/chat"} 6.05',
+        'latency_seconds_count{route="/chat"} 4',
+    ]
+
+
+def test_counters_gauges_and_label_escaping():
+    registry = MetricsRegistry()
+    errors = registry.counter("errors_total", "Errors", ["detail"])
+    errors.inc(detail='bad "input"\n')
+    errors.inc(2, detail='bad "input"\n')
+    registry.cache_metrics({"pages": lambda: {"hits": 3, "misses": 1, "size": 2}})
+
+    lines = registry.render().splitlines()
+
+    assert 'errors_total{detail="bad \\"input\\"\\n"} 3' in lines
+    assert "# TYPE cache_hits_total counter" in lines
+    assert 'cache_hits_total{cache="pages"} 3' in lines
+    assert 'cache_entries{cache="pages"} 2' in lines
+
+
+def test_chat_metrics_stage_timings_and_tokens():
+    registry = MetricsRegistry()
+    metrics = ChatMetrics(registry)
+
+    with metrics.stage("retrieval"):
+        pass
+    metrics.observe_stage("upstream_call", 0.2)
+    metrics.count_tokens(type("Usage", (), {"prompt_tokens": 7})())
+    metrics.count_tokens(None)
+
+    text = registry.render()
+    assert 'chat_stage_duration_seconds_count{stage="retrieval"} 1' in text
+    assert 'chat_stage_duration_seconds_sum{stage="upstream_call"} 0.2' in text
+    assert 'upstream_tokens_total{type="prompt"} 7' in text
+    assert 'type="completion"' not in text
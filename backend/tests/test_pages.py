@@ -0,0 +1,69 @@
+import copy
+import json
+
+import pytest
+
+from shopping_core.catalog import ProductCatalog
+from shopping_core.pages import ProductPageCache, etag_matches, parse_fields
+from shopping_core.sample_catalog import PRODUCT_CATALOG
+
+
+def make_pages():
+    catalog = ProductCatalog(copy.deepcopy(PRODUCT_CATALOG))
+    return catalog, ProductPageCache(catalog, max_entries=4)
+
+
+def test_pages_walk_the_whole_catalog_in_order():
+    catalog, pages = make_pages()
+
+    seen = []
+    cursor = None
+    while True:
+        page = pages.get(cursor=cursor, limit=3)
+        products = json.loads(page.body)
+        assert len(products) <= 3
+        seen.extend(products)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+        assert cursor == products[-1]["id"]
+
+    assert seen == catalog.products()
+    assert json.loads(pages.get().body) == catalog.products()
+
+
+def test_fields_project_each_product():
+    catalog, pages = make_pages()
+
+    products = json.loads(pages.get(limit=2, fields="price, id,price").body)
+
+    assert products == [
+        {"price": p["price"], "id": p["id"]} for p in catalog.products()[:2]
+    ]
+    with pytest.raises(ValueError):
+        parse_fields("id,colour")
+
+
+def test_pages_are_cached_until_the_catalog_changes():
+    catalog, pages = make_pages()
+
+    page = pages.get(limit=2)
+    assert pages.get(limit=2) is page
+
+    first = catalog.products()[0]["id"]
+    catalog.apply_changes([{"id": first, "price": 1.0}], [])
+    changed = pages.get(limit=2)
+
+    assert changed is not page
+    assert changed.etag != page.etag
+    assert json.loads(changed.body)[0]["price"] == 1.0
+
+
+def test_etag_matching():
+    etag = '"abc"'
+
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abd"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+from shopping_core.pipeline import Stage, StageStats, run_stages
+
+
+def test_stages_run_concurrently_with_fallbacks():
+    timings = []
+    stats = StageStats(on_timing=lambda name, seconds: timings.append(name))
+
+    async def value(result, delay=0.05):
+        await asyncio.sleep(delay)
+        return result
+
+    async def fail():
+        raise RuntimeError("memory offline")
+
+    started = time.perf_counter()
+    results = asyncio.run(
+        run_stages(
+            Stage("memory", lambda: value("context"), timeout=1.0),
+            Stage("retrieval", lambda: value(["p1"]), timeout=1.0),
+            Stage("slow", lambda: value("late", delay=5), timeout=0.05, fallback=""),
+            Stage("broken", fail, timeout=1.0, fallback=[]),
+            stats=stats,
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    assert results == {
+        "memory": "context",
+        "retrieval": ["p1"],
+        "slow": "",
+        "broken": [],
+    }
+    assert elapsed < 0.5
+    assert sorted(timings) == ["broken", "memory", "retrieval", "slow"]
+    assert stats.stats() == {
+        "memory": {"runs": 1, "timeouts": 0, "errors": 0},
+        "retrieval": {"runs": 1, "timeouts": 0, "errors": 0},
+        "slow": {"runs": 1, "timeouts": 1, "errors": 0},
+        "broken": {"runs": 1, "timeouts": 0, "errors": 1},
+    }
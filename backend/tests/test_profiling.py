@@ -0,0 +1,82 @@
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from shopping_core.profiling import RequestProfiler, StackSampler, profiling_router
+
+
+def make_app(profiler: RequestProfiler, admin_token="secret") -> FastAPI:
+    app = FastAPI()
+    app.middleware("http")(profiler.track_request)
+    app.include_router(profiling_router(profiler, admin_token))
+
+    @app.get("/slow")
+    def slow():
+        time.sleep(0.05)
+        return {}
+
+    return app
+
+
+def test_admin_routes_need_the_token():
+    profiler = RequestProfiler(routes=["/slow"])
+
+    with TestClient(make_app(profiler)) as client:
+        assert client.get("/admin/profiling").status_code == 401
+        assert (
+            client.get("/admin/profiling", headers={"X-Admin-Token": "x"}).status_code
+            == 401
+        )
+        assert (
+            client.get(
+                "/admin/profiling", headers={"X-Admin-Token": "secret"}
+            ).status_code
+            == 200
+        )
+    with TestClient(make_app(profiler, admin_token=None)) as client:
+        response = client.get("/admin/profiling", headers={"X-Admin-Token": "x"})
+        assert response.status_code == 403
+
+
+def test_sampled_and_slow_requests_are_recorded():
+    profiler = RequestProfiler(
+        routes=["/slow"], sample_rate=1.0, interval=0.001, slow_threshold=0.01
+    )
+    headers = {"X-Admin-Token": "secret"}
+
+    with TestClient(make_app(profiler)) as client:
+        client.get("/slow")
+        slow = client.get("/admin/slow-requests", headers=headers).json()
+        flamegraph = client.get("/admin/profiling/flamegraph", headers=headers)
+        bad_rate = client.post(
+            "/admin/profiling", json={"sample_rate": 2}, headers=headers
+        )
+
+    assert profiler.sampled_requests == 1
+    assert [entry["path"] for entry in slow] == ["/slow"]
+    assert slow[0]["status"] == 200
+    assert "slow" in flamegraph.text
+    assert bad_rate.status_code == 400
+
+
+def test_sampler_collapses_stacks():
+    sampler = StackSampler(interval=0.001)
+    done = threading.Event()
+
+    def busy_worker():
+        while not done.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy_worker, name="worker")
+    worker.start()
+    sampler.start()
+    time.sleep(0.05)
+    sampler.stop()
+    done.set()
+    worker.join()
+
+    lines = sampler.collapsed().splitlines()
+    assert any("busy_worker" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
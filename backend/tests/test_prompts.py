@@ -0,0 +1,38 @@
+import copy
+
+from shopping_core.catalog import ProductCatalog
+from shopping_core.prompts import PromptBuilder, format_products
+from shopping_core.sample_catalog import PRODUCT_CATALOG
+
+
+def test_prompt_is_rendered_once_per_catalog_version():
+    catalog = ProductCatalog(copy.deepcopy(PRODUCT_CATALOG))
+    renders = []
+
+    def render(snapshot):
+        renders.append(snapshot.version)
+        return f"v{snapshot.version}: {len(snapshot)} products"
+
+    prompts = PromptBuilder(catalog, render)
+
+    assert prompts.get() == prompts.get() == f"v1: {len(catalog)} products"
+    assert renders == [1]
+
+    catalog.apply_changes([], [catalog.products()[0]["id"]])
+
+    assert prompts.get() == f"v2: {len(catalog)} products"
+    assert renders == [1, 2]
+    assert prompts.version == 2
+
+    prompts.invalidate()
+    prompts.get()
+    assert renders == [1, 2, 2]
+
+
+def test_format_products():
+    products = [
+        {"name": "Lamp", "price": 20.0, "description": "Bright"},
+        {"name": "Desk", "price": 150, "description": "Oak"},
+    ]
+
+    assert format_products(products) == "- Lamp ($20.0) - Bright\n- Desk ($150) - Oak"
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from shopping_core.catalog import ProductCatalog
+from shopping_core.reload import CatalogReloader
+
+
+def product(product_id: str, price: float) -> dict:
+    return {
+        "id": product_id,
+        "name": product_id.title(),
+        "price": price,
+        "rating": 4.0,
+        "category": "audio",
+        "description": "",
+        "image": "",
+    }
+
+
+def test_reload_swaps_in_the_new_feed(tmp_path):
+    feed = tmp_path / "catalog.json"
+    feed.write_text(json.dumps({"audio": [product("speaker", 50)]}))
+    catalog = ProductCatalog({"audio": [product("speaker", 60)]})
+    reloader = CatalogReloader(catalog, str(feed))
+    hooks = []
+    reloader.on_reload(lambda: hooks.append(catalog.version))
+    before = catalog.snapshot()
+
+    result = reloader.reload()
+
+    assert result["version"] == 2 and result["products"] == 1
+    assert catalog.get("speaker")["price"] == 50
+    assert before.get("speaker")["price"] == 60
+    assert [p["id"] for p in catalog.search(max_price=55)] == ["speaker"]
+    assert hooks == [2]
+
+
+def test_failed_reload_keeps_the_current_catalog(tmp_path):
+    feed = tmp_path / "catalog.json"
+    feed.write_text("{not json")
+    catalog = ProductCatalog({"audio": [product("speaker", 60)]})
+    reloader = CatalogReloader(catalog, str(feed))
+
+    with pytest.raises(Exception):
+        reloader.reload()
+
+    assert catalog.version == 1
+    assert catalog.get("speaker")["price"] == 60
+    assert reloader.stats()["failures"] == 1
+
+
+def test_reload_needs_a_feed_file():
+    reloader = CatalogReloader(ProductCatalog({}), None)
+
+    assert not reloader.enabled
+    with pytest.raises(ValueError):
+        reloader.reload()
@@ -0,0 +1,22 @@
+from shopping_core.response_cache import ResponseCache
+
+
+def test_similar_question_is_served_with_similarity_enabled():
+    cache = ResponseCache(similarity=0.5)
+    cache.set(1, "", "cheapest wireless headphones for running", "Try the AirPods")
+
+    assert cache.get(1, "", "cheapest wireless headphones for running") == (
+        "Try the AirPods"
+    )
+    assert cache.get(1, "", "cheapest wireless running headphones") == (
+        "Try the AirPods"
+    )
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_similar_question_stays_in_its_version_and_scope():
+    cache = ResponseCache(similarity=0.5)
+    cache.set(1, "alice", "cheapest wireless headphones", "Try the AirPods")
+
+    assert cache.get(1, "bob", "cheapest wireless headphones") is None
+    assert cache.get(2, "alice", "cheapest wireless headphones") is None
@@ -0,0 +1,34 @@
+import copy
+
+from shopping_core.catalog import ProductCatalog
+from shopping_core.retrieval import ProductRetriever
+from shopping_core.sample_catalog import PRODUCT_CATALOG
+
+
+def make_retriever(top_k: int = 3) -> ProductRetriever:
+    return ProductRetriever(ProductCatalog(copy.deepcopy(PRODUCT_CATALOG)), top_k)
+
+
+def test_retrieve_returns_the_top_k_matches():
+    retriever = make_retriever()
+
+    products = retriever.retrieve("a laptop for work")
+
+    assert 0 < len(products) <= 3
+    assert products == retriever.catalog.rank("a laptop for work", 3)[: len(products)]
+
+
+def test_fuse_prefers_products_in_both_rankings():
+    retriever = make_retriever()
+    a, b, c, d = [{"id": name} for name in "abcd"]
+
+    fused = retriever.fuse([a, b, c], [c, d])
+
+    assert [p["id"] for p in fused] == ["c", "a", "b"]
+
+
+def test_no_match_falls_back_to_the_first_catalog_page():
+    retriever = make_retriever()
+
+    assert retriever.retrieve("zzzz qqqq") == retriever.catalog.page(limit=3)
+    assert retriever.retrieve("") == retriever.catalog.page(limit=3)
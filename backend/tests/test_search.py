@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+from shopping_core.search import SearchIndex, product_text, tokenize
+
+WORDS = "wireless laptop laptops headphone running shoe desk lamp book cotton".split()
+GROUPS = ["electronics", "clothing", "home", "books"]
+
+
+def make_entries(count: int, seed: int = 7):
+    rnd = random.Random(seed)
+    entries = []
+    for i in range(count):
+        group = rnd.choice(GROUPS)
+        product = {
+            "id": f"p{i}",
+            "name": " ".join(rnd.sample(WORDS, 2)),
+            "price": float(rnd.randint(1, 400)),
+            "rating": rnd.randint(10, 50) / 10,
+            "category": rnd.choice(["audio", "office", "sport"]),
+            "description": " ".join(rnd.choices(WORDS, k=3)),
+            "image": "",
+        }
+        entries.append((group, product))
+    return entries
+
+
+def linear_search(entries, category=None, max_price=None, min_rating=None, query=None):
+    """Reference: the catalog scan the index replaced"""
+    terms = tokenize(query or "")
+    results = []
+    for group, product in entries:
+        if category and category.lower() not in (
+            group.lower(),
+            product["category"].lower(),
+        ):
+            continue
+        if max_price and product["price"] > max_price:
+            continue
+        if min_rating and product["rating"] < min_rating:
+            continue
+        words = set(tokenize(product_text(group, product)))
+        if terms and not (
+            all(term in words for term in terms[:-1])
+            and any(word.startswith(terms[-1]) for word in words)
+        ):
+            continue
+        results.append(product["id"])
+    return results
+
+
+FILTERS = [
+    {},
+    {"category": "Home"},
+    {"category": "audio"},
+    {"max_price": 50},
+    {"min_rating": 4.5},
+    {"category": "books", "max_price": 200, "min_rating": 3},
+    {"query": "laptop"},
+    {"query": "wireless head"},
+    {"query": "running shoes", "max_price": 150},
+    {"query": "lamp", "category": "home", "min_rating": 2},
+    {"query": "nothingmatches"},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_search_matches_a_linear_scan(filters):
+    entries = make_entries(500)
+    index = SearchIndex(entries)
+
+    found = [product["id"] for product in index.search(**filters)]
+    expected = linear_search(entries, **filters)
+
+    if filters.get("query"):
+        assert sorted(found) == sorted(expected)
+    else:
+        # Without a query results keep catalog order
+        assert found == expected
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_search_limit_returns_the_top_results(filters):
+    index = SearchIndex(make_entries(500))
+
+    assert index.search(**filters, limit=5) == index.search(**filters)[:5]
+
+
+def test_query_results_are_ranked_by_relevance():
+    index = SearchIndex(
+        [
+            ("home", {**make_entries(1)[0][1], "id": "once", "name": "desk"}),
+            (
+                "home",
+                {
+                    **make_entries(1)[0][1],
+                    "id": "often",
+                    "name": "desk lamp",
+                    "description": "lamp lamp for any desk",
+                },
+            ),
+        ]
+    )
+
+    assert [p["id"] for p in index.search(query="lamp")] == ["often"]
+    assert [p["id"] for p in index.search(query="desk lamp")] == ["often"]
+    ranked = index.rank("a lamp for my desk", limit=2)
+    assert [p["id"] for p in ranked] == ["often", "once"]
+
+
+def test_patched_index_matches_a_rebuild():
+    entries = make_entries(300)
+    index = SearchIndex(entries)
+    rnd = random.Random(3)
+    changed = dict(enumerate(entries))
+    for doc_id in rnd.sample(range(300), 60):
+        group, product = changed[doc_id]
+        changed[doc_id] = (
+            group,
+            {**product, "price": float(rnd.randint(1, 400)), "name": rnd.choice(WORDS)},
+        )
+    deleted = rnd.sample(range(300), 20)
+    index.apply(
+        (doc_id, *changed[doc_id]) for doc_id in range(300) if doc_id not in deleted
+    )
+    index.apply((doc_id, None, None) for doc_id in deleted)
+    rebuilt_entries = [changed[i] for i in range(300) if i not in deleted]
+    rebuilt = SearchIndex(rebuilt_entries)
+
+    for filters in FILTERS:
+        found = {p["id"] for p in index.search(**filters)}
+        assert found == {p["id"] for p in rebuilt.search(**filters)}, filters
+        assert found == set(linear_search(rebuilt_entries, **filters)), filters
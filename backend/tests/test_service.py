@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from shopping_core.service import ShoppingService
+
+PRODUCT_ROUTES = {"/products", "/products/search", "/products/{product_id}"}
+
+
+def routes(app):
+    return set(app.openapi()["paths"])
+
+
+def test_backends_share_the_core_routes(do_main, swarms_main):
+    core = ShoppingService(
+        title="Test", description="", version="0", namespace="test_service"
+    )
+    shared = routes(core.app)
+
+    assert PRODUCT_ROUTES | {"/categories", "/health", "/metrics"} <= shared
+    for backend in (do_main, swarms_main):
+        assert shared <= routes(backend.app)
+        assert {"/chat", "/chat/stream", "/chat/batch"} <= routes(backend.app)
+
+
+def test_backends_add_health_sections_and_cache_metrics():
+    core = ShoppingService(
+        title="Test", description="", version="0", namespace="test_service"
+    )
+    core.add_health("memory", lambda: {"writer": "ok"})
+    core.add_cache("memory_context", lambda: {"hits": 5, "misses": 1, "size": 3})
+
+    with TestClient(core.app) as client:
+        health = client.get("/health").json()
+        metrics = client.get("/metrics").text
+
+    assert health["status"] == "ok"
+    assert health["memory"] == {"writer": "ok"}
+    assert health["catalog"]["products"] == len(core.catalog)
+    assert 'cache_hits_total{cache="memory_context"} 5' in metrics
+    assert 'cache_hits_total{cache="response"}' in metrics
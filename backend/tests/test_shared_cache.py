@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from shopping_core.memory import MemoryContextCache
+from shopping_core.shared_cache import open_shared_cache
+
+
+@pytest.fixture
+def cache_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'cache.db'}"
+
+
+def test_workers_share_values_and_counters(cache_url):
+    first = open_shared_cache(cache_url, namespace="do")
+    second = open_shared_cache(cache_url, namespace="do")
+    other = open_shared_cache(cache_url, namespace="swarms")
+
+    first.set("reply", "hello", ttl=60)
+    first.set("expired", "old", ttl=-1)
+
+    assert second.get("reply") == "hello"
+    assert second.get("expired") is None
+    assert other.get("reply") is None
+
+    assert first.incr("generation") == 1
+    assert second.incr("generation") == 2
+    assert first.counter("generation") == 2
+    assert other.counter("generation") == 0
+
+
+def test_concurrent_increments_are_not_lost(cache_url):
+    cache = open_shared_cache(cache_url)
+
+    def bump():
+        for _ in range(25):
+            cache.incr("n")
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.counter("n") == 100
+
+
+def test_invalidation_reaches_every_worker(cache_url):
+    first = MemoryContextCache(shared=open_shared_cache(cache_url))
+    second = MemoryContextCache(shared=open_shared_cache(cache_url))
+    key = first.key("alice", "shoes")
+    first.set(key, "likes trail running")
+
+    assert second.get(second.key("alice", "shoes")) == "likes trail running"
+
+    second.invalidate("alice")
+
+    assert first.get(first.key("alice", "shoes")) is None
+
+
+def test_unsupported_url():
+    assert open_shared_cache(None) is None
+    with pytest.raises(ValueError):
+        open_shared_cache("memcached://localhost")
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from shopping_core.singleflight import SingleFlight
+
+
+def test_concurrent_awaits_of_a_key_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f"result-{key}"
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.do(key, lambda key=key: compute(key)) for key in "aaaab")
+        )
+
+    results = asyncio.run(main())
+
+    assert results == ["result-a"] * 4 + ["result-b"]
+    assert sorted(calls) == ["a", "b"]
+    assert flight.stats() == {"in_flight": 0, "leaders": 2, "shared": 3}
+
+
+def test_completed_keys_are_not_cached():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        return [await flight.do("k", compute), await flight.do("k", compute)]
+
+    assert asyncio.run(main()) == [1, 2]
+
+
+def test_waiters_share_the_leaders_exception():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.do("k", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+
+    assert [str(e) for e in errors] == ["upstream down"] * 3
+    assert flight.stats()["leaders"] == 1
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", compute))
+        second = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(flight.call, "k", compute)
+        started.wait()
+        waiters = [pool.submit(flight.call, "k", compute) for _ in range(4)]
+        results = [leader.result()] + [w.result() for w in waiters]
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "shared": 4}
+
+
+def test_thread_waiters_share_the_leaders_exception():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("bad")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        leader = pool.submit(flight.call, "k", fail)
+        started.wait()
+        waiters = [pool.submit(flight.call, "k", fail) for _ in range(2)]
+        for future in [leader] + waiters:
+            with pytest.raises(ValueError):
+                future.result()
+
+    assert flight.stats()["in_flight"] == 0
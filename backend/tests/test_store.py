@@ -0,0 +1,88 @@
+import pytest
+
+from shopping_core.store import StoredCatalog, open_store
+
+
+def product(product_id: str, category: str, price: float = 10.0) -> dict:
+    return {
+        "id": product_id,
+        "name": f"Product {product_id}",
+        "price": price,
+        "rating": 4.0,
+        "category": category,
+        "description": "",
+        "image": "",
+    }
+
+
+ENTRIES = [
+    ("audio", product("a1", "audio")),
+    ("home", product("h1", "home")),
+    ("audio", product("a2", "audio")),
+    ("home", product("h2", "home")),
+]
+
+
+@pytest.fixture(params=["sqlite", "parquet"])
+def store(request, tmp_path):
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+    store = open_store(f"{request.param}:///{tmp_path / 'catalog.db'}")
+    store.bulk_import(ENTRIES)
+    yield store
+    store.close()
+
+
+def test_products_in_and_categories(store):
+    catalog = StoredCatalog(store)
+
+    assert [p["id"] for p in catalog.products_in("audio")] == ["a1", "a2"]
+    assert catalog.categories() == ["audio", "home"]
+    assert catalog.categories() is catalog.categories()
+
+
+def test_page_walks_the_store_in_order(store):
+    first = store.page(limit=3)
+    rest = store.page(after=first[-1]["id"], limit=3)
+
+    assert [p["id"] for p in first + rest] == ["a1", "h1", "a2", "h2"]
+
+
+def test_sqlite_cursor_at_deleted_product_keeps_paging(tmp_path):
+    store = open_store(f"sqlite:///{tmp_path / 'catalog.db'}")
+    store.bulk_import(ENTRIES)
+
+    store.apply_changes([], ["h1"])
+    assert [p["id"] for p in store.page(after="h1")] == ["a2", "h2"]
+
+    # A product added after the last one was deleted is not skipped
+    store.apply_changes([], ["h2"])
+    store.apply_changes([{**product("n1", "new"), "group": "new"}], [])
+    assert [p["id"] for p in store.page(after="h2")] == ["n1"]
+
+
+def test_sqlite_categories_follow_changes(tmp_path):
+    store = open_store(f"sqlite:///{tmp_path / 'catalog.db'}")
+    store.bulk_import(ENTRIES)
+    assert store.categories() == ["audio", "home"]
+
+    store.apply_changes([{"id": "h1", "group": "audio"}], ["h2"])
+    assert store.categories() == ["audio"]
+
+
+def test_parquet_pages_span_row_groups(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = open_store(f"parquet:///{tmp_path / 'catalog.parquet'}")
+    ids = [f"p{i}" for i in range(7)]
+    store.bulk_import([("g", product(i, "g")) for i in reversed(ids)], batch_size=2)
+
+    seen, cursor = [], None
+    while True:
+        page = store.page(after=cursor, limit=3)
+        if not page:
+            break
+        seen += [p["id"] for p in page]
+        cursor = page[-1]["id"]
+
+    assert seen == list(reversed(ids))
+    assert store.page(after="missing") == []
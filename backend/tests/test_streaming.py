@@ -0,0 +1,116 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from shopping_core.upstream import UpstreamUnavailable
+
+
+async def collect(lines):
+    return [line async for line in lines]
+
+
+def parse_sse(body: str):
+    """(event, data) pairs of a server-sent event stream"""
+    assert body.endswith("\n\n")
+    events = []
+    for message in body[:-2].split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.split("\n"))
+        assert set(fields) <= {"event", "data"}
+        events.append((fields.get("event"), json.loads(fields["data"])))
+    return events
+
+
+def test_sse_event_framing(do_main):
+    assert do_main.sse_event({"token": "Hi\nthere"}) == (
+        'data: {"token": "Hi\\nthere"}\n\n'
+    )
+    assert parse_sse(do_main.sse_event({"detail": "x"}, event="error")) == [
+        ("error", {"detail": "x"})
+    ]
+
+
+def test_chat_stream_emits_tokens_then_done(do_main, monkeypatch):
+    recorded = []
+
+    async def build_chat_messages(user_input, customer_id):
+        return [{"role": "user", "content": user_input}], False
+
+    async def call_upstream(messages, stream=False):
+        async def chunks():
+            for token in ["Try ", "", "the AirPods"]:
+                delta = SimpleNamespace(content=token)
+                yield SimpleNamespace(
+                    choices=[SimpleNamespace(delta=delta)], usage=None
+                )
+
+        return chunks()
+
+    async def record_chat(user_input, customer_id, ai_output, metadata):
+        recorded.append((customer_id, ai_output, metadata["streamed"]))
+
+    monkeypatch.setattr(do_main, "build_chat_messages", build_chat_messages)
+    monkeypatch.setattr(do_main, "call_upstream", call_upstream)
+    monkeypatch.setattr(do_main, "record_chat", record_chat)
+
+    body = "".join(
+        asyncio.run(
+            collect(do_main.stream_chat_with_digitalocean("earbuds for runs", "a"))
+        )
+    )
+    events = parse_sse(body)
+
+    assert events[:2] == [(None, {"token": "Try "}), (None, {"token": "the AirPods"})]
+    assert events[2][0] == "done"
+    assert events[2][1]["response"] == "Try the AirPods"
+    assert len(events) == 3
+    assert recorded == [("a", "Try the AirPods", True)]
+
+
+def test_chat_stream_reports_errors_as_an_error_event(do_main, monkeypatch):
+    errors = []
+
+    async def build_chat_messages(user_input, customer_id):
+        raise RuntimeError("memory offline")
+
+    async def record_chat_error(user_input, customer_id, error_msg):
+        errors.append(error_msg)
+
+    monkeypatch.setattr(do_main, "build_chat_messages", build_chat_messages)
+    monkeypatch.setattr(do_main, "record_chat_error", record_chat_error)
+
+    body = "".join(
+        asyncio.run(collect(do_main.stream_chat_with_digitalocean("hello", "a")))
+    )
+
+    assert parse_sse(body) == [
+        ("error", {"detail": "Sorry, I encountered an error: memory offline"})
+    ]
+    assert errors == ["Sorry, I encountered an error: memory offline"]
+
+
+def test_chat_stream_degrades_to_catalog_reply(do_main, monkeypatch):
+    async def build_chat_messages(user_input, customer_id):
+        return [], False
+
+    async def call_upstream(messages, stream=False):
+        raise UpstreamUnavailable("breaker open")
+
+    async def degraded_reply(user_input):
+        return "catalog only"
+
+    async def record_chat_error(user_input, customer_id, error_msg):
+        pass
+
+    monkeypatch.setattr(do_main, "build_chat_messages", build_chat_messages)
+    monkeypatch.setattr(do_main, "call_upstream", call_upstream)
+    monkeypatch.setattr(do_main, "degraded_reply", degraded_reply)
+    monkeypatch.setattr(do_main, "record_chat_error", record_chat_error)
+
+    body = "".join(
+        asyncio.run(collect(do_main.stream_chat_with_digitalocean("laptops", "a")))
+    )
+    events = parse_sse(body)
+
+    assert events[0] == (None, {"token": "catalog only"})
+    assert events[1][0] == "done"
+    assert events[1][1]["response"] == "catalog only"
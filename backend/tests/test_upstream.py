@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from shopping_core.upstream import (
+    CircuitBreaker,
+    RetryBudget,
+    UpstreamUnavailable,
+    call_with_retries,
+)
+
+
+class Transient(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+def call(func, breaker, budget, max_retries=2):
+    return asyncio.run(
+        call_with_retries(
+            func,
+            breaker=breaker,
+            budget=budget,
+            retryable=lambda e: isinstance(e, Transient),
+            max_retries=max_retries,
+            base_delay=0,
+        )
+    )
+
+
+def failing(error, calls):
+    async def func():
+        calls.append(1)
+        raise error
+
+    return func
+
+
+def test_retry_budget_caps_retries_to_a_fraction_of_requests():
+    budget = RetryBudget(ratio=0.5, min_retries=1, max_tokens=2)
+
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+    for _ in range(10):
+        budget.deposit()
+    assert budget.stats()["tokens"] == 2.0
+    assert budget.stats() == {"tokens": 2.0, "retries": 2, "exhausted": 2}
+
+
+def test_breaker_opens_probes_and_closes(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("shopping_core.upstream.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] += 10
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["trips"] == 1
+
+
+def test_transient_errors_are_retried_until_success():
+    breaker, budget = CircuitBreaker(failure_threshold=5), RetryBudget()
+    calls = []
+
+    async def func():
+        calls.append(1)
+        if len(calls) < 3:
+            raise Transient()
+        return "ok"
+
+    assert call(func, breaker, budget) == "ok"
+    assert len(calls) == 3
+    assert breaker.stats()["consecutive_failures"] == 0
+
+
+def test_retries_stop_when_budget_is_spent():
+    breaker = CircuitBreaker(failure_threshold=100)
+    budget = RetryBudget(ratio=0, min_retries=1)
+    calls = []
+
+    with pytest.raises(UpstreamUnavailable):
+        call(failing(Transient(), calls), breaker, budget, max_retries=5)
+    assert len(calls) == 2
+    assert budget.stats()["exhausted"] == 1
+
+
+def test_non_retryable_error_leaves_breaker_alone():
+    breaker, budget = CircuitBreaker(failure_threshold=2), RetryBudget()
+    calls = []
+
+    with pytest.raises(UpstreamUnavailable):
+        call(failing(Transient(), calls), breaker, budget, max_retries=0)
+    with pytest.raises(BadRequest):
+        call(failing(BadRequest(), calls), breaker, budget)
+    assert breaker.stats()["consecutive_failures"] == 1
+    assert len(calls) == 2
+
+    # A bad request during a half-open probe does not close the breaker
+    breaker.record_failure()
+    breaker.reset_timeout = 0
+    with pytest.raises(BadRequest):
+        call(failing(BadRequest(), calls), breaker, budget)
+    assert breaker.state != "closed"
+
+
+def test_open_breaker_rejects_without_calling():
+    breaker, budget = (
+        CircuitBreaker(failure_threshold=1, reset_timeout=60),
+        RetryBudget(),
+    )
+    breaker.record_failure()
+    calls = []
+
+    with pytest.raises(UpstreamUnavailable):
+        call(failing(Transient(), calls), breaker, budget)
+    assert calls == []
@@ -12,6 +12,9 @@ Features:
 - Product catalog management
 - Memory-enhanced recommendations
 
+Catalog, product routes, caches and metrics come from ``shopping_core``;
+this module adds the DigitalOcean agent and Memori on top.
+
 Requirements:
 - pip install memorisdk openai python-dotenv fastapi uvicorn
 - Set agent_endpoint and agent_access_key in environment or .env file
@@ -20,208 +23,198 @@ Usage:
     uvicorn main:app --reload --host 0.0.0.0 --port 8000
 """
 
+import asyncio
+import json
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
-import openai
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-
-from memori import Memori, create_memory_tool
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 
-# Load environment variables
+# Load environment variables (before shopping_core reads its settings)
 load_dotenv()
 
+# The shared backend package lives one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shopping_core import settings  # noqa: E402
+from shopping_core.batch import stream_batch  # noqa: E402
+from shopping_core.memory import (  # noqa: E402
+    MemoryContextCache,
+    WriteBehindQueue,
+    adds_customer_facts,
+    memori_pool_options,
+    prepare_memory_database,
+    retry_when_locked,
+    write_batch_with_retry,
+    write_each,
+)
+from shopping_core.models import (  # noqa: E402
+    ChatBatchRequest,
+    ChatRequest,
+    ChatResponse,
+)
+from shopping_core.pipeline import Stage, StageStats, run_stages  # noqa: E402
+from shopping_core.prompts import PromptBuilder, format_products  # noqa: E402
+from shopping_core.retrieval import ProductRetriever  # noqa: E402
+from shopping_core.service import ShoppingService  # noqa: E402
+from shopping_core.singleflight import SingleFlight  # noqa: E402
+from shopping_core.upstream import (  # noqa: E402
+    CircuitBreaker,
+    RetryBudget,
+    UpstreamUnavailable,
+    call_with_retries,
+    create_http_client,
+)
+
 # Check for DigitalOcean credentials
 agent_endpoint = os.environ.get("agent_endpoint")
 agent_access_key = os.environ.get("agent_access_key")
 openai_api_key = os.environ.get("OPENAI_API_KEY")
 
 # Constants
-DATABASE_PATH = "sqlite:///smart_shopping_digitalocean.db"
 NAMESPACE = "smart_shopping_digitalocean"
 
-# Mock product database - same as Azure version for consistency
-PRODUCT_CATALOG = {
-    "electronics": [
-        {
-            "id": "iphone15",
-            "name": "iPhone 15 Pro",
-            "price": 999,
-            "rating": 4.8,
-            "category": "smartphone",
-            "description": "Latest iPhone with Pro camera system and titanium design",
-            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/iphone-15-pro-finish-select-202309-6-1inch-naturaltitanium?wid=5120&hei=2880",
-        },
-        {
-            "id": "macbook",
-            "name": "MacBook Air M2",
-            "price": 1199,
-            "rating": 4.9,
-            "category": "laptop",
-            "description": "Powerful M2 chip with all-day battery life",
-            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/macbook-air-midnight-select-20220606?wid=904&hei=840",
-        },
-        {
-            "id": "airpods",
-            "name": "AirPods Pro",
-            "price": 249,
-            "rating": 4.7,
-            "category": "audio",
-            "description": "Active noise cancellation and spatial audio",
-            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/MQD83?wid=2000&hei=2000",
-        },
-        {
-            "id": "ipad",
-            "name": "iPad Air",
-            "price": 599,
-            "rating": 4.6,
-            "category": "tablet",
-            "description": "Versatile iPad with M1 chip for creativity and productivity",
-            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/ipad-air-select-wifi-blue-202203?wid=940&hei=1112",
-        },
-    ],
-    "clothing": [
-        {
-            "id": "nike_shoes",
-            "name": "Nike Air Max",
-            "price": 120,
-            "rating": 4.5,
-            "category": "footwear",
-            "description": "Comfortable running shoes with Air Max cushioning",
-            "image": "https://static.nike.com/a/images/t_PDP_1728_v1/f_auto,q_auto:eco/99486859-0ff3-46b4-949b-2d16af2ad421/air-max-90-mens-shoes-6n7391.png",
-        },
-        {
-            "id": "levi_jeans",
-            "name": "Levi's 501 Jeans",
-            "price": 80,
-            "rating": 4.4,
-            "category": "pants",
-            "description": "Classic straight-leg jeans with authentic fit",
-            "image": "https://lsco.scene7.com/is/image/lsco/005010000-front-pdp?fmt=jpeg&qlt=70,1&op_sharpen=0&resMode=sharp2&op_usm=0.9,1.0,8,0&iccEmbed=0&printRes=72&_tparam_layer_1_src=sw/005010000-front-pdp&_tparam_layer_1_anchor=c&_tparam_layer_1_origin=1",
-        },
-        {
-            "id": "sweater",
-            "name": "Cashmere Sweater",
-            "price": 150,
-            "rating": 4.6,
-            "category": "tops",
-            "description": "Luxurious 100% cashmere sweater for ultimate comfort",
-            "image": "https://images.unsplash.com/photo-1551488831-00ddcb6c6bd3?w=500&h=500&fit=crop",
-        },
-    ],
-    "home": [
-        {
-            "id": "coffee_maker",
-            "name": "Breville Coffee Maker",
-            "price": 300,
-            "rating": 4.7,
-            "category": "kitchen",
-            "description": "Professional-grade espresso machine for home use",
-            "image": "https://images.unsplash.com/photo-1559056199-641a0ac8b55e?w=500&h=500&fit=crop",
-        },
-        {
-            "id": "vacuum",
-            "name": "Dyson V15",
-            "price": 450,
-            "rating": 4.8,
-            "category": "cleaning",
-            "description": "Powerful cordless vacuum with laser detect technology",
-            "image": "https://images.unsplash.com/photo-1558618047-3c8c76ca7d13?w=500&h=500&fit=crop",
-        },
-        {
-            "id": "mattress",
-            "name": "Memory Foam Mattress",
-            "price": 800,
-            "rating": 4.5,
-            "category": "bedroom",
-            "description": "Premium memory foam for optimal sleep comfort",
-            "image": "https://images.unsplash.com/photo-1586023492125-27b2c045efd7?w=500&h=500&fit=crop",
-        },
-    ],
-    "books": [
-        {
-            "id": "ai_book",
-            "name": "AI for Everyone",
-            "price": 25,
-            "rating": 4.3,
-            "category": "technology",
-            "description": "Non-technical guide to understanding artificial intelligence",
-            "image": "https://images.unsplash.com/photo-1485988512492-1d364fe2c5ac?w=500&h=500&fit=crop",
-        },
-        {
-            "id": "cookbook",
-            "name": "Mediterranean Cookbook",
-            "price": 30,
-            "rating": 4.6,
-            "category": "cooking",
-            "description": "Authentic Mediterranean recipes for healthy living",
-            "image": "https://images.unsplash.com/photo-1481627834876-b7833e8f5570?w=500&h=500&fit=crop",
-        },
-    ],
-}
-
-# FastAPI app initialization
-app = FastAPI(
+# Memori database. Workers on one host can share the SQLite file (WAL mode);
+# for several nodes point it at a server database, e.g. postgresql://...
+DATABASE_PATH = os.environ.get(
+    "MEMORY_DATABASE_URL", "sqlite:///smart_shopping_digitalocean.db"
+)
+MEMORY_DB_POOL_SIZE = int(os.environ.get("MEMORY_DB_POOL_SIZE", "5"))
+MEMORY_DB_MAX_OVERFLOW = int(os.environ.get("MEMORY_DB_MAX_OVERFLOW", "10"))
+
+# Memori is synchronous (SQLite + optional ingest calls), so its work runs on a
+# bounded thread pool instead of the event loop
+MEMORY_WORKERS = int(os.environ.get("MEMORY_WORKERS", "8"))
+
+# Conversation records are written to Memori by a background writer
+MEMORY_QUEUE_SIZE = int(os.environ.get("MEMORY_QUEUE_SIZE", "1000"))
+MEMORY_BATCH_SIZE = int(os.environ.get("MEMORY_BATCH_SIZE", "50"))
+
+# Memory search results cached per customer until they expire or the
+# customer's memories change
+MEMORY_CACHE_SIZE = int(os.environ.get("MEMORY_CACHE_SIZE", "10000"))
+MEMORY_CACHE_TTL = float(os.environ.get("MEMORY_CACHE_TTL", "300"))
+
+# Pre-LLM stages run concurrently, each bounded by its own timeout (seconds)
+MEMORY_LOOKUP_TIMEOUT = float(os.environ.get("MEMORY_LOOKUP_TIMEOUT", "1.5"))
+PREFERENCE_LOOKUP_TIMEOUT = float(os.environ.get("PREFERENCE_LOOKUP_TIMEOUT", "1.0"))
+RETRIEVAL_TIMEOUT = float(os.environ.get("RETRIEVAL_TIMEOUT", "0.5"))
+PREFERENCE_QUERY = "preferences likes dislikes size budget favorite brands"
+
+# Upstream connection pool, timeouts (seconds), retries and circuit breaker
+UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get("UPSTREAM_CONNECT_TIMEOUT", "3"))
+UPSTREAM_READ_TIMEOUT = float(os.environ.get("UPSTREAM_READ_TIMEOUT", "30"))
+UPSTREAM_MAX_CONNECTIONS = int(os.environ.get("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE = int(os.environ.get("UPSTREAM_MAX_KEEPALIVE", "20"))
+UPSTREAM_MAX_RETRIES = int(os.environ.get("UPSTREAM_MAX_RETRIES", "2"))
+UPSTREAM_RETRY_BUDGET = float(os.environ.get("UPSTREAM_RETRY_BUDGET", "0.2"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.environ.get("CIRCUIT_RESET_TIMEOUT", "30"))
+
+# Catalog, product routes, response cache, metrics and profiling
+core = ShoppingService(
     title="Smart Shopping Assistant API",
     description="DigitalOcean + Memori powered shopping assistant",
     version="1.0.0",
+    namespace=NAMESPACE,
 )
+app = core.app
+product_catalog = core.catalog
+response_cache = core.response_cache
+chat_metrics = core.metrics
 
-# CORS middleware to allow frontend connections
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:8080",
-        "http://127.0.0.1:8080",
-        "https://preview--smart-shopping-assistant-fastapi.lovable.app",
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-# Pydantic models
-class ChatRequest(BaseModel):
-    message: str
-    customer_id: Optional[str] = "default"
 
+# Static instructions come first so the prompt prefix stays byte-stable even
+# when the catalog changes; products relevant to the turn are appended after
+# it and customer context goes in the user message
+SYSTEM_PROMPT_TEMPLATE = """You are a friendly AI shopping assistant for an online store. You help customers find products and provide personalized recommendations.
 
-class ChatResponse(BaseModel):
-    response: str
-    timestamp: str
-
-
-class Product(BaseModel):
-    id: str
-    name: str
-    price: float
-    rating: float
-    category: str
-    description: str
-    image: str
+Guidelines:
+1. Be conversational and helpful
+2. Recommend specific products from our catalog with prices
+3. Ask clarifying questions if needed
+4. Use customer history to personalize recommendations
+5. Be direct about what we have available
+6. Don't claim to have products not in our catalog
+7. Focus on helping customers find the best products for their needs
 
+Your goal is to provide helpful shopping assistance and product recommendations.
 
-class ProductSearchRequest(BaseModel):
-    category: Optional[str] = None
-    max_price: Optional[float] = None
-    min_rating: Optional[float] = None
-    query: Optional[str] = None
+Product categories in our store: {categories}"""
 
 
 # Global variables for DigitalOcean client and memory system
 digitalocean_client = None
 memory_system = None
 memory_tool = None
+memory_executor = None
+memory_writer = None
+
+# Batch record writes still running, held here so they finish even when the
+# client that started them has gone away
+record_writes: Set[asyncio.Future] = set()
+
+memory_context_cache = MemoryContextCache(
+    max_size=MEMORY_CACHE_SIZE, ttl=MEMORY_CACHE_TTL, shared=core.shared_cache
+)
+chat_stage_stats = StageStats(on_timing=chat_metrics.observe_stage)
+
+# Identical concurrent memory searches and upstream calls share one computation
+memory_flight = SingleFlight()
+chat_flight = SingleFlight()
+
+# Retries are capped at a fraction of upstream calls; repeated failures open
+# the breaker and chat degrades to catalog-only answers
+upstream_retry_budget = RetryBudget(ratio=UPSTREAM_RETRY_BUDGET)
+upstream_breaker = CircuitBreaker(
+    failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=CIRCUIT_RESET_TIMEOUT,
+)
+
+core.add_cache("memory_context", memory_context_cache.stats)
+core.add_health(
+    "memory_queue", lambda: memory_writer.stats() if memory_writer else None
+)
+core.add_health("memory_context_cache", memory_context_cache.stats)
+core.add_health("chat_stages", chat_stage_stats.stats)
+core.add_health(
+    "upstream",
+    lambda: {
+        "circuit_breaker": upstream_breaker.stats(),
+        "retry_budget": upstream_retry_budget.stats(),
+    },
+)
+core.add_health(
+    "single_flight",
+    lambda: {
+        "memory": memory_flight.stats(),
+        "chat": chat_flight.stats(),
+        "search": core.search_flight.stats(),
+    },
+)
+core.metrics_registry.gauge(
+    "memory_queue_pending",
+    "Conversation records waiting to be written to Memori",
+    collect=lambda: {(): memory_writer.stats()["pending"] if memory_writer else 0},
+)
+core.metrics_registry.gauge(
+    "upstream_circuit_open",
+    "1 while the upstream circuit breaker rejects calls",
+    collect=lambda: {(): int(upstream_breaker.state == "open")},
+)
 
 
 def initialize_services():
     """Initialize DigitalOcean client and memory system"""
-    global digitalocean_client, memory_system, memory_tool
+    global digitalocean_client, memory_system, memory_tool, memory_executor
+    global memory_writer
 
     if not agent_endpoint or not agent_access_key:
         print("❌ Warning: DigitalOcean AI credentials not found in environment")
@@ -235,155 +228,558 @@ def initialize_services():
         else f"{agent_endpoint}/api/v1/"
     )
 
-    digitalocean_client = openai.OpenAI(
+    # The agent SDKs are imported here so catalog-only imports of this module
+    # stay light
+    import httpx
+    import openai
+    from memori import Memori, create_memory_tool
+
+    # One shared keep-alive pool for every upstream call; retries are handled
+    # by call_upstream() so they respect the retry budget and circuit breaker
+    digitalocean_client = openai.AsyncOpenAI(
         base_url=base_url,
         api_key=agent_access_key,
+        http_client=create_http_client(
+            connect_timeout=UPSTREAM_CONNECT_TIMEOUT,
+            read_timeout=UPSTREAM_READ_TIMEOUT,
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive=UPSTREAM_MAX_KEEPALIVE,
+        ),
+        timeout=httpx.Timeout(UPSTREAM_READ_TIMEOUT, connect=UPSTREAM_CONNECT_TIMEOUT),
+        max_retries=0,
+    )
+
+    memory_executor = ThreadPoolExecutor(
+        max_workers=MEMORY_WORKERS, thread_name_prefix="memori"
     )
 
     # Initialize Memori memory system
+    prepare_memory_database(DATABASE_PATH)
     memory_system = Memori(
         database_connect=DATABASE_PATH,
         conscious_ingest=True,
         verbose=False,
         namespace=NAMESPACE,
         openai_api_key=openai_api_key,
+        **memori_pool_options(Memori, MEMORY_DB_POOL_SIZE, MEMORY_DB_MAX_OVERFLOW),
     )
     memory_system.enable()
 
     # Create memory tool
     memory_tool = create_memory_tool(memory_system)
 
+    # Record conversations in the background, in batches
+    memory_writer = WriteBehindQueue(
+        write_memory_batch,
+        max_size=MEMORY_QUEUE_SIZE,
+        batch_size=MEMORY_BATCH_SIZE,
+    )
+
     print("✅ Services initialized successfully")
     return True
 
 
-def search_products_in_catalog(
-    category: Optional[str] = None,
-    max_price: Optional[float] = None,
-    min_rating: Optional[float] = None,
-    query: Optional[str] = None,
-) -> List[Dict]:
-    """Search products in the catalog with filters"""
-    products = []
-
-    # Collect all products
-    for cat_name, cat_products in PRODUCT_CATALOG.items():
-        for product in cat_products:
-            # Apply filters
-            if category and category.lower() not in [
-                cat_name.lower(),
-                product["category"].lower(),
-            ]:
-                continue
-            if max_price and product["price"] > max_price:
-                continue
-            if min_rating and product["rating"] < min_rating:
-                continue
-            if query:
-                query_lower = query.lower()
-                product_text = f"{product['name']} {product['category']} {product['description']} {cat_name}".lower()
-                if query_lower not in product_text:
-                    continue
+async def shutdown_services():
+    """Close the upstream client and drain pending memory work"""
+    if digitalocean_client:
+        await digitalocean_client.close()
+    if memory_writer:
+        # Flush queued conversation records before exiting, off the event
+        # loop so other tasks keep running while the writer thread drains
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, memory_writer.stop)
+    if record_writes:
+        await asyncio.gather(*record_writes, return_exceptions=True)
+    if memory_executor:
+        memory_executor.shutdown(wait=True)
 
-            products.append(product)
 
-    return products
+def write_memory_batch(records: List[Dict]) -> None:
+    """Write a batch of queued conversation records to Memori.
 
+    Memori records one conversation per call, so a batch cannot be one
+    transaction; a failure part-way raises ``PartialWriteError`` and only
+    the records after it are retried.
+    """
+    write_each(write_memory_record, records)
 
-def chat_with_digitalocean(user_input: str, customer_id: str = "default") -> str:
-    """Process user input with DigitalOcean AI and memory"""
-    if not digitalocean_client or not memory_system:
-        return "Service not initialized. Please check configuration."
 
-    try:
-        # Search memory for customer context
+def write_memory_record(record: Dict) -> None:
+    """Write one conversation record, invalidating cached context on new facts"""
+    with chat_metrics.stage("memory_write"):
+        # Other workers may hold the SQLite write lock for a moment
+        retry_when_locked(partial(memory_system.record_conversation, **record))
+    if record["metadata"].get("new_facts"):
+        memory_context_cache.invalidate(record["metadata"]["customer_id"])
+
+
+async def run_memory_call(func, *args, **kwargs):
+    """Run a blocking Memori call on the memory worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(memory_executor, partial(func, *args, **kwargs))
+
+
+def render_system_prompt(catalog) -> str:
+    """Render the static part of the system prompt for a catalog version"""
+    return SYSTEM_PROMPT_TEMPLATE.format(categories=", ".join(catalog.categories()))
+
+
+# Rendered once per catalog version, ahead of the first turn after a reload
+system_prompt = PromptBuilder(product_catalog, render_system_prompt)
+core.reloader.on_reload(system_prompt.get)
+
+# Picks the products relevant to each chat turn
+product_retriever = ProductRetriever(product_catalog, top_k=settings.PROMPT_TOP_K)
+
+
+async def run_cache_call(func, *args):
+    """Run a cache call, off the event loop when it reaches the shared cache"""
+    if core.shared_cache is None:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args))
+
+
+async def search_customer_memory(customer_id: str, query: str, label: str) -> str:
+    """Customer memories matching the query, served from cache when fresh"""
+    cache_key = await run_cache_call(memory_context_cache.key, customer_id, query)
+    cached = await run_cache_call(memory_context_cache.get, cache_key)
+    if cached is not None:
+        return cached
+
+    async def search_memory() -> str:
         customer_context = ""
-        if len(user_input.strip()) > 5:
-            try:
-                context_result = memory_tool.execute(
-                    query=f"customer:{customer_id} {user_input[:100]}"
-                )
-                if (
-                    context_result
-                    and "No relevant memories found" not in context_result
-                ):
-                    customer_context = f"\n\nCustomer history: {context_result[:500]}"
-            except Exception:
-                pass
-
-        # Get available products for context
-        available_products = []
-        for _category, products in PRODUCT_CATALOG.items():
-            for product in products:
-                available_products.append(
-                    f"- {product['name']} (${product['price']}) - {product['description']}"
-                )
-
-        products_context = "\n".join(available_products[:10])  # Limit to 10 products
-
-        # Create enhanced prompt
-        system_prompt = f"""You are a friendly AI shopping assistant for an online store. You help customers find products and provide personalized recommendations.
-
-Available Products in Our Store:
-{products_context}
+        context_result = await run_memory_call(
+            memory_tool.execute,
+            query=f"customer:{customer_id} {query}",
+        )
+        if context_result and "No relevant memories found" not in context_result:
+            customer_context = f"\n\n{label}: {context_result[:500]}"
+        await run_cache_call(memory_context_cache.set, cache_key, customer_context)
+        return customer_context
 
-Guidelines:
-1. Be conversational and helpful
-2. Recommend specific products from our catalog with prices
-3. Ask clarifying questions if needed
-4. Use customer history to personalize recommendations
-5. Be direct about what we have available
-6. Don't claim to have products not in our catalog
-7. Focus on helping customers find the best products for their needs
+    try:
+        return await memory_flight.do((label, cache_key), search_memory)
+    except Exception:
+        return ""
+
+
+async def lookup_customer_context(user_input: str, customer_id: str) -> str:
+    """Customer history relevant to the message"""
+    if len(user_input.strip()) <= 5:
+        return ""
+    return await search_customer_memory(
+        customer_id, user_input[:100], "Customer history"
+    )
+
+
+async def lookup_customer_preferences(customer_id: str) -> str:
+    """Standing customer preferences (sizes, budget, likes), independent of the message"""
+    return await search_customer_memory(
+        customer_id, PREFERENCE_QUERY, "Customer preferences"
+    )
+
+
+async def run_catalog_call(func, *args):
+    """Run a catalog call off the event loop (store-backed catalogs do I/O)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args))
+
+
+async def rank_products(text: str) -> List[Dict]:
+    """Catalog products ranked for a text"""
+    return await run_catalog_call(product_retriever.rank, text)
+
+
+def select_products(message_ranked: List[Dict], customer_context: str) -> List[Dict]:
+    """Prompt products: message ranking fused with the context's (blocking)"""
+    context_ranked = []
+    if customer_context:
+        context_ranked = product_retriever.rank(customer_context)
+    return product_retriever.fuse(message_ranked, context_ranked)
+
+
+async def build_chat_messages(user_input: str, customer_id: str):
+    """Build the upstream chat messages, returns (messages, had_context)"""
+    # Memory search, preference lookup and product retrieval are independent,
+    # so they run concurrently; a stage that times out or fails falls back
+    # to an empty result instead of holding up the reply.
+    results = await run_stages(
+        Stage(
+            "memory_search",
+            lambda: lookup_customer_context(user_input, customer_id),
+            MEMORY_LOOKUP_TIMEOUT,
+            "",
+        ),
+        Stage(
+            "preferences",
+            lambda: lookup_customer_preferences(customer_id),
+            PREFERENCE_LOOKUP_TIMEOUT,
+            "",
+        ),
+        Stage(
+            "retrieval",
+            lambda: rank_products(user_input),
+            RETRIEVAL_TIMEOUT,
+            [],
+        ),
+        stats=chat_stage_stats,
+    )
 
-Your goal is to provide helpful shopping assistance and product recommendations."""
+    customer_context = results["memory_search"]
+    if results["preferences"] and results["preferences"] != customer_context:
+        customer_context += results["preferences"]
+
+    # Only the catalog products relevant to this turn go into the prompt; the
+    # customer context nudges the ranking once it is available, in a second
+    # timed stage since it needs the memory results
+    selected = await run_stages(
+        Stage(
+            "context_retrieval",
+            lambda: run_catalog_call(
+                select_products, results["retrieval"], customer_context
+            ),
+            RETRIEVAL_TIMEOUT,
+            results["retrieval"][: product_retriever.top_k],
+        ),
+        stats=chat_stage_stats,
+    )
+    prompt = await run_catalog_call(system_prompt.get)
+
+    with chat_metrics.stage("prompt_build"):
+        relevant_products = selected["context_retrieval"]
+        system_content = (
+            f"{prompt}\n\n"
+            f"Relevant Products in Our Store:\n{format_products(relevant_products)}"
+        )
 
         enhanced_input = user_input
         if customer_context:
             enhanced_input = f"{user_input}{customer_context}"
 
-        # Get response from DigitalOcean AI
-        response = digitalocean_client.chat.completions.create(
+    messages = [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": enhanced_input},
+    ]
+    return messages, bool(customer_context)
+
+
+async def response_scope(customer_id: str, had_context: bool):
+    """Response cache scope: shared unless the reply used customer memories"""
+    if not had_context:
+        return ""
+    generation = await run_cache_call(memory_context_cache.generation, customer_id)
+    return (customer_id, generation)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Upstream errors worth retrying: network, timeouts, rate limits, 5xx"""
+    import openai
+
+    return isinstance(
+        error,
+        (
+            openai.APIConnectionError,
+            openai.RateLimitError,
+            openai.InternalServerError,
+        ),
+    )
+
+
+async def call_upstream(messages: List[Dict], stream: bool = False):
+    """Chat completion from the upstream model with retries and breaker"""
+    return await call_with_retries(
+        lambda: digitalocean_client.chat.completions.create(
             model="n/a",  # DigitalOcean uses "n/a" as model parameter
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": enhanced_input},
-            ],
-        )
+            messages=messages,
+            stream=stream,
+        ),
+        breaker=upstream_breaker,
+        budget=upstream_retry_budget,
+        retryable=is_retryable,
+        max_retries=UPSTREAM_MAX_RETRIES,
+    )
 
-        ai_response = response.choices[0].message.content
 
-        # Record conversation in memory
-        memory_system.record_conversation(
-            user_input=f"[Customer:{customer_id}] {user_input}",
-            ai_output=ai_response,
-            model="digitalocean",
-            metadata={
-                "platform": "digitalocean",
-                "customer_id": customer_id,
-                "interaction_type": "shopping_assistance",
-                "had_context": bool(customer_context),
-            },
+async def degraded_reply(user_input: str) -> str:
+    """Catalog-only answer served while the upstream model is unavailable"""
+    try:
+        products = await asyncio.wait_for(
+            run_catalog_call(product_retriever.retrieve, user_input),
+            RETRIEVAL_TIMEOUT,
         )
+    except Exception:
+        products = []
+    if not products:
+        return "Our shopping assistant is temporarily unavailable, please try again shortly."
+    return (
+        "Our shopping assistant is temporarily unavailable, but here are some "
+        "products from our catalog that match your question:\n"
+        f"{format_products(products)}"
+    )
 
+
+async def complete_chat(
+    user_input: str, messages: List[Dict], catalog_version: int, scope
+) -> Tuple[str, bool]:
+    """Reply to a chat turn, returns (reply, served from cache).
+
+    Served from the response cache when possible; otherwise concurrent
+    turns asking the same question in the same scope share one upstream call.
+    """
+    ai_response = await run_cache_call(
+        response_cache.get, catalog_version, scope, user_input
+    )
+    if ai_response is not None:
+        return ai_response, True
+
+    flight_key = response_cache.key(catalog_version, scope, user_input) or (
+        catalog_version,
+        scope,
+        user_input.strip().lower(),
+    )
+
+    async def call_model() -> str:
+        with chat_metrics.stage("upstream_call"):
+            response = await call_upstream(messages)
+        chat_metrics.count_tokens(getattr(response, "usage", None))
+        ai_response = response.choices[0].message.content
+        if ai_response:
+            await run_cache_call(
+                response_cache.set, catalog_version, scope, user_input, ai_response
+            )
         return ai_response
 
+    return await chat_flight.do(flight_key, call_model), False
+
+
+def chat_record(
+    user_input: str, customer_id: str, ai_output: str, metadata: Dict
+) -> Dict:
+    """Memori conversation record for a chat turn"""
+    return {
+        "user_input": f"[Customer:{customer_id}] {user_input}",
+        "ai_output": ai_output,
+        "model": "digitalocean",
+        "metadata": {
+            "platform": "digitalocean",
+            "customer_id": customer_id,
+            "new_facts": not metadata.get("error") and adds_customer_facts(user_input),
+            **metadata,
+        },
+    }
+
+
+async def submit_chat_record(record: Dict) -> None:
+    """Queue a conversation record for writing to Memori"""
+    if not memory_writer.submit(record):
+        # Queue is full - apply backpressure by writing inline
+        await run_memory_call(write_memory_record, record)
+
+
+async def record_chat(
+    user_input: str, customer_id: str, ai_output: str, metadata: Dict
+) -> None:
+    """Queue a chat turn for recording in Memori"""
+    await submit_chat_record(chat_record(user_input, customer_id, ai_output, metadata))
+
+
+async def record_chat_error(user_input: str, customer_id: str, error_msg: str):
+    """Record a failed chat turn, never raises"""
+    try:
+        await record_chat(user_input, customer_id, error_msg, {"error": True})
+    except:
+        pass
+
+
+async def run_chat_turn(user_input: str, customer_id: str) -> Tuple[str, Dict]:
+    """Answer one chat turn, returns (reply, Memori record for the turn)"""
+    try:
+        messages, had_context = await build_chat_messages(user_input, customer_id)
+        catalog_version = product_catalog.version
+        scope = await response_scope(customer_id, had_context)
+
+        # Get response from DigitalOcean AI
+        ai_response, cached = await complete_chat(
+            user_input, messages, catalog_version, scope
+        )
+        metadata = {
+            "interaction_type": "shopping_assistance",
+            "had_context": had_context,
+            "cached": cached,
+        }
+        return ai_response, chat_record(user_input, customer_id, ai_response, metadata)
+
+    except UpstreamUnavailable as e:
+        error_msg = f"Upstream unavailable: {e}"
+        return await degraded_reply(user_input), chat_record(
+            user_input, customer_id, error_msg, {"error": True}
+        )
+
     except Exception as e:
         error_msg = f"Sorry, I encountered an error: {str(e)}"
-        try:
-            memory_system.record_conversation(
-                user_input=f"[Customer:{customer_id}] {user_input}",
-                ai_output=error_msg,
-                model="digitalocean",
-                metadata={
-                    "platform": "digitalocean",
-                    "customer_id": customer_id,
-                    "error": True,
-                },
+        return error_msg, chat_record(
+            user_input, customer_id, error_msg, {"error": True}
+        )
+
+
+async def chat_with_digitalocean(user_input: str, customer_id: str = "default") -> str:
+    """Process user input with DigitalOcean AI and memory"""
+    if not digitalocean_client or not memory_system:
+        return "Service not initialized. Please check configuration."
+
+    ai_response, record = await run_chat_turn(user_input, customer_id)
+
+    # Record conversation in memory
+    try:
+        await submit_chat_record(record)
+    except Exception as e:
+        print(f"❌ Failed to record conversation: {e}")
+
+    return ai_response
+
+
+async def stream_chat_batch(requests: List[ChatRequest]) -> AsyncIterator[str]:
+    """Answer a batch of chat requests as NDJSON lines, in completion order.
+
+    Preference lookups run once per customer before the turns, and the
+    batch's Memori records are written in groups of ``MEMORY_BATCH_SIZE``
+    instead of one queue submission per turn.
+    """
+    customers = {request.customer_id for request in requests}
+    await asyncio.gather(
+        *(
+            asyncio.wait_for(
+                lookup_customer_preferences(customer_id), PREFERENCE_LOOKUP_TIMEOUT
             )
-        except:
-            pass
-        return error_msg
+            for customer_id in customers
+        ),
+        return_exceptions=True,
+    )
+
+    pending_records: List[Dict] = []
+    writes = []
+
+    def flush_records() -> None:
+        if pending_records:
+            group = pending_records[:]
+            pending_records.clear()
+            write = asyncio.ensure_future(write_record_group(group))
+            record_writes.add(write)
+            write.add_done_callback(record_writes.discard)
+            writes.append(write)
+
+    async def handle(index: int, request: ChatRequest) -> Dict:
+        ai_response, record = await run_chat_turn(request.message, request.customer_id)
+        pending_records.append(record)
+        if len(pending_records) >= MEMORY_BATCH_SIZE:
+            flush_records()
+        return {
+            "customer_id": request.customer_id,
+            "response": ai_response,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    try:
+        async for line in stream_batch(
+            requests, handle, settings.CHAT_BATCH_CONCURRENCY
+        ):
+            yield line
+    finally:
+        # Served turns are recorded even if the client disconnects mid-stream
+        flush_records()
+    await asyncio.gather(*writes)
+
+
+async def write_record_group(records: List[Dict]) -> None:
+    """Write a group of conversation records on one memory worker, never raises"""
+    # Failing records are skipped and none of the rest is written twice
+    await run_memory_call(write_batch_with_retry, write_memory_batch, records)
+
+
+async def stream_chat_with_digitalocean(
+    user_input: str, customer_id: str = "default"
+) -> AsyncIterator[str]:
+    """Stream SSE events for a chat turn as the upstream model produces tokens.
+
+    Emits ``data: {"token": ...}`` events, then a ``done`` event carrying the
+    full response. The conversation is recorded in memory once the stream
+    has finished.
+    """
+    chunks = []
+    degraded = False
+    try:
+        messages, had_context = await build_chat_messages(user_input, customer_id)
+        catalog_version = product_catalog.version
+        scope = await response_scope(customer_id, had_context)
+
+        cached_response = await run_cache_call(
+            response_cache.get, catalog_version, scope, user_input
+        )
+        if cached_response is not None:
+            # A cached reply is delivered as a single token
+            chunks.append(cached_response)
+            yield sse_event({"token": cached_response})
+        else:
+            stream_started = time.perf_counter()
+            stream = await call_upstream(messages, stream=True)
+            async for chunk in stream:
+                chat_metrics.count_tokens(getattr(chunk, "usage", None))
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    chunks.append(token)
+                    yield sse_event({"token": token})
+            chat_metrics.observe_stage(
+                "upstream_call", time.perf_counter() - stream_started
+            )
+
+    except UpstreamUnavailable as e:
+        degraded = True
+        await record_chat_error(user_input, customer_id, f"Upstream unavailable: {e}")
+        chunks.append(await degraded_reply(user_input))
+        yield sse_event({"token": chunks[-1]})
+
+    except Exception as e:
+        error_msg = f"Sorry, I encountered an error: {str(e)}"
+        yield sse_event({"detail": error_msg}, event="error")
+        await record_chat_error(user_input, customer_id, error_msg)
+        return
+
+    ai_response = "".join(chunks)
+    yield sse_event(
+        {"response": ai_response, "timestamp": datetime.now().isoformat()},
+        event="done",
+    )
+    if degraded:
+        return
+
+    if cached_response is None and ai_response:
+        await run_cache_call(
+            response_cache.set, catalog_version, scope, user_input, ai_response
+        )
+
+    try:
+        await record_chat(
+            user_input,
+            customer_id,
+            ai_response,
+            {
+                "interaction_type": "shopping_assistance",
+                "had_context": had_context,
+                "streamed": True,
+                "cached": cached_response is not None,
+            },
+        )
+    except Exception as e:
+        print(f"❌ Failed to record streamed conversation: {e}")
+
+
+def sse_event(data: Dict, event: Optional[str] = None) -> str:
+    """Format a server-sent event"""
+    message = f"data: {json.dumps(data)}\n\n"
+    return f"event: {event}\n{message}" if event else message
 
 
 # API Routes
@@ -395,10 +791,10 @@ async def startup_event():
     initialize_services()
 
 
-@app.get("/")
-async def root():
-    """Health check endpoint"""
-    return {"message": "Smart Shopping Assistant API is running", "status": "healthy"}
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release upstream connections and memory workers on shutdown"""
+    await shutdown_services()
 
 
 @app.post("/chat", response_model=ChatResponse)
@@ -410,47 +806,51 @@ async def chat(request: ChatRequest):
             detail=f"DigitalOcean service not initialized {agent_endpoint}",
         )
 
-    response = chat_with_digitalocean(request.message, request.customer_id)
+    response = await chat_with_digitalocean(request.message, request.customer_id)
 
     return ChatResponse(response=response, timestamp=datetime.now().isoformat())
 
 
-@app.get("/products", response_model=List[Product])
-async def get_all_products():
-    """Get all available products"""
-    products = []
-    for category_products in PRODUCT_CATALOG.values():
-        products.extend(category_products)
-    return products
-
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Chat with the shopping assistant, streaming tokens as server-sent events"""
+    if not digitalocean_client:
+        raise HTTPException(
+            status_code=500,
+            detail=f"DigitalOcean service not initialized {agent_endpoint}",
+        )
 
-@app.post("/products/search", response_model=List[Product])
-async def search_products(request: ProductSearchRequest):
-    """Search products with filters"""
-    products = search_products_in_catalog(
-        category=request.category,
-        max_price=request.max_price,
-        min_rating=request.min_rating,
-        query=request.query,
+    return StreamingResponse(
+        stream_chat_with_digitalocean(request.message, request.customer_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return products
 
 
-@app.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: str):
-    """Get a specific product by ID"""
-    for category_products in PRODUCT_CATALOG.values():
-        for product in category_products:
-            if product["id"] == product_id:
-                return product
-
-    raise HTTPException(status_code=404, detail="Product not found")
+@app.post("/chat/batch")
+async def chat_batch(request: ChatBatchRequest):
+    """Answer many chat requests, streaming results back as NDJSON.
 
+    One line per request, in completion order:
+    ``{"index": ..., "customer_id": ..., "response": ..., "timestamp": ...}``
+    where ``index`` is the request's position in the batch.
+    """
+    if not digitalocean_client:
+        raise HTTPException(
+            status_code=500,
+            detail=f"DigitalOcean service not initialized {agent_endpoint}",
+        )
+    if len(request.requests) > settings.CHAT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large, at most {settings.CHAT_BATCH_MAX_SIZE} requests",
+        )
 
-@app.get("/categories")
-async def get_categories():
-    """Get all product categories"""
-    return {"categories": list(PRODUCT_CATALOG.keys())}
+    return StreamingResponse(
+        stream_chat_batch(request.requests),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/memory/search")
@@ -460,17 +860,12 @@ async def search_memory(query: str):
         raise HTTPException(status_code=500, detail="Memory service not initialized")
 
     try:
-        result = memory_tool.execute(query=query)
+        result = await run_memory_call(memory_tool.execute, query=query)
         return {"query": query, "result": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Memory search error: {str(e)}")
 
 
-@app.get("/health")
-def health():
-    return {"status": "ok"}
-
-
 if __name__ == "__main__":
     import uvicorn
 
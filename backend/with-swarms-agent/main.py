@@ -12,6 +12,9 @@ Features:
 - Intelligent product recommendations
 - Memory-enhanced personalization
 
+Catalog, product routes, caches and metrics come from ``shopping_core``;
+this module adds the Swarms agents and Memori on top.
+
 Requirements:
 - pip install memorisdk swarms python-dotenv fastapi uvicorn
 - Set OPENAI_API_KEY in environment or .env file
@@ -20,215 +23,222 @@ Usage:
     uvicorn main:app --reload --host 0.0.0.0 --port 8000
 """
 
+import asyncio
+import contextvars
+import json
 import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from swarms import Agent
-
-from memori import Memori
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 
-# Load environment variables
+# Load environment variables (before shopping_core reads its settings)
 load_dotenv()
 
-# Check for required API key
-if not os.getenv("OPENAI_API_KEY"):
-    print("❌ Error: OPENAI_API_KEY not found in environment variables")
-    print("Please set your OpenAI API key:")
-    print("export OPENAI_API_KEY='your-api-key-here'")
-    print("or create a .env file with: OPENAI_API_KEY=your-api-key-here")
-    exit(1)
+# The shared backend package lives one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shopping_core import settings  # noqa: E402
+from shopping_core.memory import (  # noqa: E402
+    memori_pool_options,
+    prepare_memory_database,
+)
+from shopping_core.models import (  # noqa: E402
+    ChatBatchRequest,
+    ChatRequest,
+    ChatResponse,
+)
+from shopping_core.prompts import PromptBuilder, format_products  # noqa: E402
+from shopping_core.retrieval import ProductRetriever  # noqa: E402
+from shopping_core.service import ShoppingService  # noqa: E402
 
 # Constants
-DATABASE_PATH = "sqlite:///smart_shopping_swarms.db"
 NAMESPACE = "smart_shopping_swarms"
 
-# Mock product database - same as Azure version for consistency
-PRODUCT_CATALOG = {
-    "electronics": [
-        {
-            "id": "iphone15",
-            "name": "iPhone 15 Pro",
-            "price": 999,
-            "rating": 4.8,
-            "category": "smartphone",
-            "description": "Latest iPhone with Pro camera system and titanium design",
-            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/iphone-15-pro-finish-select-202309-6-1inch-naturaltitanium?wid=5120&hei=2880",
-        },
-        {
-            "id": "macbook",
-            "name": "MacBook Air M2",
-            "price": 1199,
-            "rating": 4.9,
-            "category": "laptop",
-            "description": "Powerful M2 chip with all-day battery life",
-            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/macbook-air-midnight-select-20220606?wid=904&hei=840",
-        },
-        {
-            "id": "airpods",
-            "name": "AirPods Pro",
-            "price": 249,
-            "rating": 4.7,
-            "category": "audio",
-            "description": "Active noise cancellation and spatial audio",
-            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/MQD83?wid=2000&hei=2000",
-        },
-        {
-            "id": "ipad",
-            "name": "iPad Air",
-            "price": 599,
-            "rating": 4.6,
-            "category": "tablet",
-            "description": "Versatile iPad with M1 chip for creativity and productivity",
-            "image": "https://store.storeimages.cdn-apple.com/4982/as-images.apple.com/is/ipad-air-select-wifi-blue-202203?wid=940&hei=1112",
-        },
-    ],
-    "clothing": [
-        {
-            "id": "nike_shoes",
-            "name": "Nike Air Max",
-            "price": 120,
-            "rating": 4.5,
-            "category": "footwear",
-            "description": "Comfortable running shoes with Air Max cushioning",
-            "image": "https://static.nike.com/a/images/t_PDP_1728_v1/f_auto,q_auto:eco/99486859-0ff3-46b4-949b-2d16af2ad421/air-max-90-mens-shoes-6n7391.png",
-        },
-        {
-            "id": "levi_jeans",
-            "name": "Levi's 501 Jeans",
-            "price": 80,
-            "rating": 4.4,
-            "category": "pants",
-            "description": "Classic straight-leg jeans with authentic fit",
-            "image": "https://lsco.scene7.com/is/image/lsco/005010000-front-pdp?fmt=jpeg&qlt=70,1&op_sharpen=0&resMode=sharp2&op_usm=0.9,1.0,8,0&iccEmbed=0&printRes=72&_tparam_layer_1_src=sw/005010000-front-pdp&_tparam_layer_1_anchor=c&_tparam_layer_1_origin=1",
-        },
-        {
-            "id": "sweater",
-            "name": "Cashmere Sweater",
-            "price": 150,
-            "rating": 4.6,
-            "category": "tops",
-            "description": "Luxurious 100% cashmere sweater for ultimate comfort",
-            "image": "https://images.unsplash.com/photo-1551488831-00ddcb6c6bd3?w=500&h=500&fit=crop",
-        },
-    ],
-    "home": [
-        {
-            "id": "coffee_maker",
-            "name": "Breville Coffee Maker",
-            "price": 300,
-            "rating": 4.7,
-            "category": "kitchen",
-            "description": "Professional-grade espresso machine for home use",
-            "image": "https://images.unsplash.com/photo-1559056199-641a0ac8b55e?w=500&h=500&fit=crop",
-        },
-        {
-            "id": "vacuum",
-            "name": "Dyson V15",
-            "price": 450,
-            "rating": 4.8,
-            "category": "cleaning",
-            "description": "Powerful cordless vacuum with laser detect technology",
-            "image": "https://images.unsplash.com/photo-1558618047-3c8c76ca7d13?w=500&h=500&fit=crop",
-        },
-        {
-            "id": "mattress",
-            "name": "Memory Foam Mattress",
-            "price": 800,
-            "rating": 4.5,
-            "category": "bedroom",
-            "description": "Premium memory foam for optimal sleep comfort",
-            "image": "https://images.unsplash.com/photo-1586023492125-27b2c045efd7?w=500&h=500&fit=crop",
-        },
-    ],
-    "books": [
-        {
-            "id": "ai_book",
-            "name": "AI for Everyone",
-            "price": 25,
-            "rating": 4.3,
-            "category": "technology",
-            "description": "Non-technical guide to understanding artificial intelligence",
-            "image": "https://images.unsplash.com/photo-1485988512492-1d364fe2c5ac?w=500&h=500&fit=crop",
-        },
-        {
-            "id": "cookbook",
-            "name": "Mediterranean Cookbook",
-            "price": 30,
-            "rating": 4.6,
-            "category": "cooking",
-            "description": "Authentic Mediterranean recipes for healthy living",
-            "image": "https://images.unsplash.com/photo-1481627834876-b7833e8f5570?w=500&h=500&fit=crop",
-        },
-    ],
-}
-
-# FastAPI app initialization
-app = FastAPI(
+# Memori database. Workers on one host can share the SQLite file (WAL mode);
+# for several nodes point it at a server database, e.g. postgresql://...
+DATABASE_PATH = os.getenv("MEMORY_DATABASE_URL", "sqlite:///smart_shopping_swarms.db")
+MEMORY_DB_POOL_SIZE = int(os.getenv("MEMORY_DB_POOL_SIZE", "5"))
+MEMORY_DB_MAX_OVERFLOW = int(os.getenv("MEMORY_DB_MAX_OVERFLOW", "10"))
+
+# Agent pool sizing - each customer gets their own agent (and conversation),
+# the least recently used ones are evicted once the pool is full
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "64"))
+AGENT_WORKERS = int(os.getenv("AGENT_WORKERS", str((os.cpu_count() or 1) * 4)))
+CONVERSATION_WINDOW = int(os.getenv("CONVERSATION_WINDOW", "20"))
+
+# Catalog, product routes, metrics and profiling (its response cache is unused,
+# see run_swarms_turn)
+core = ShoppingService(
     title="Smart Shopping Assistant API",
     description="Swarms + Memori powered shopping assistant with multi-agent intelligence",
     version="2.0.0",
+    namespace=NAMESPACE,
 )
+app = core.app
+product_catalog = core.catalog
+chat_metrics = core.metrics
 
-# CORS middleware to allow frontend connections
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://127.0.0.1:3000",
-        "http://localhost:3001",
-        "https://preview--smart-shopping-assistant-fastapi.lovable.app",
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-# Pydantic models
-class ChatRequest(BaseModel):
-    message: str
-    customer_id: Optional[str] = "default"
 
+# Static instructions come first so the prompt prefix stays byte-stable even
+# when the catalog changes; relevant products are attached to each message
+SYSTEM_PROMPT_TEMPLATE = """You are a friendly and knowledgeable personal shopping assistant. Your role is to help customers find products that match their needs, preferences, and budget.
 
-class ChatResponse(BaseModel):
-    response: str
-    timestamp: str
+Your capabilities:
+- Help customers find specific products
+- Provide personalized recommendations based on customer history
+- Answer questions about products, prices, and features
+- Assist with comparisons between different products
+- Remember customer preferences for future interactions
 
+Guidelines:
+1. Always be friendly, helpful, and conversational
+2. Recommend specific products from our catalog with accurate prices
+3. Ask clarifying questions when needed to better understand customer needs
+4. Be honest about what's available - don't suggest products not in our catalog
+5. Focus on helping customers make informed decisions
+6. Remember customer interactions for personalization
 
-class Product(BaseModel):
-    id: str
-    name: str
-    price: float
-    rating: float
-    category: str
-    description: str
-    image: str
+When a customer asks for help, provide tailored recommendations based on their needs.
 
+Product categories in our store: {categories}
 
-class ProductSearchRequest(BaseModel):
-    category: Optional[str] = None
-    max_price: Optional[float] = None
-    min_rating: Optional[float] = None
-    query: Optional[str] = None
+Each customer message is followed by the products from our catalog that are
+most relevant to it - recommend from those."""
 
 
 # Global variables for Swarms agents and memory system
-shopping_assistant_agent = None
+agent_pool = None
+agent_executor = None
 memory_system = None
 
 
+class AgentPool:
+    """LRU pool of per-customer Swarms agents.
+
+    Agent.run() appends to the agent's own short_memory, so sharing one agent
+    between customers mixes their conversations. Each customer gets a
+    dedicated agent guarded by its own lock, the pool is capped at
+    ``max_size`` agents and every conversation is trimmed to the last
+    ``window`` messages (plus the system prompt) after each turn.
+    ``prepare`` runs on the agent before each turn, under its lock.
+    """
+
+    def __init__(self, factory, max_size: int, window: int, prepare=None):
+        self._factory = factory
+        self._max_size = max_size
+        self._window = window
+        self._prepare = prepare
+        self._agents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def _checkout(self, customer_id: str):
+        with self._lock:
+            entry = self._agents.get(customer_id)
+            if entry is not None:
+                self._agents.move_to_end(customer_id)
+                return entry
+
+        # Build the agent outside the pool lock, construction is not free
+        entry = (self._factory(customer_id), threading.Lock())
+
+        with self._lock:
+            entry = self._agents.setdefault(customer_id, entry)
+            self._agents.move_to_end(customer_id)
+            while len(self._agents) > self._max_size:
+                self._agents.popitem(last=False)
+            return entry
+
+    def _trim(self, agent) -> None:
+        history = getattr(agent.short_memory, "conversation_history", None)
+        if history is not None and len(history) > self._window + 1:
+            # Keep the system prompt at index 0
+            del history[1 : len(history) - self._window]
+
+    @contextmanager
+    def session(self, customer_id: str):
+        """Hold the customer's agent exclusively for one turn"""
+        agent, lock = self._checkout(customer_id)
+        with lock:
+            if self._prepare is not None:
+                self._prepare(agent)
+            try:
+                yield agent
+            finally:
+                self._trim(agent)
+
+
+def refresh_agent_prompt(agent) -> None:
+    """Move a pooled agent to the current catalog's system prompt.
+
+    Agents keep the prompt they were created with, so after a catalog reload
+    the first turn of each pooled agent swaps it in place, keeping the
+    customer's conversation.
+    """
+    prompt = system_prompt.get()
+    if agent.system_prompt == prompt:
+        return
+    agent.system_prompt = prompt
+    history = getattr(agent.short_memory, "conversation_history", None)
+    if history:
+        history[0]["content"] = prompt
+
+
+def render_system_prompt(catalog) -> str:
+    """Render the agent system prompt for a catalog version"""
+    return SYSTEM_PROMPT_TEMPLATE.format(categories=", ".join(catalog.categories()))
+
+
+# Rendered once per catalog version, ahead of the first turn after a reload
+system_prompt = PromptBuilder(product_catalog, render_system_prompt)
+core.reloader.on_reload(system_prompt.get)
+
+# Picks the products relevant to each chat turn
+product_retriever = ProductRetriever(product_catalog, top_k=settings.PROMPT_TOP_K)
+
+
+core.metrics_registry.gauge(
+    "agent_pool_size",
+    "Per-customer agents currently pooled",
+    collect=lambda: {(): len(agent_pool) if agent_pool is not None else 0},
+)
+core.add_health(
+    "agent_pool", lambda: len(agent_pool) if agent_pool is not None else None
+)
+
+
 def initialize_services():
     """Initialize Swarms agents and memory system"""
-    global shopping_assistant_agent, memory_system
+    global agent_pool, agent_executor, memory_system
+
+    # Without a key the product routes still work and chat reports that the
+    # agents are not initialized
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ Warning: OPENAI_API_KEY not found in environment variables")
+        print("Please set your OpenAI API key:")
+        print("export OPENAI_API_KEY='your-api-key-here'")
+        print("or create a .env file with: OPENAI_API_KEY=your-api-key-here")
+        return False
+
+    # The agent SDKs are imported here so catalog-only imports of this module
+    # stay light
+    from memori import Memori
+    from swarms import Agent
 
     print("🧠 Initializing Memori memory system...")
 
     # Initialize Memori memory system
+    prepare_memory_database(DATABASE_PATH)
     memory_system = Memori(
         database_connect=DATABASE_PATH,
         auto_ingest=True,  # Automatically store conversation history
@@ -236,112 +246,246 @@ def initialize_services():
         verbose=False,  # Enable logging for audit purposes
         openai_api_key=os.getenv("OPENAI_API_KEY"),
         namespace=NAMESPACE,
+        **memori_pool_options(Memori, MEMORY_DB_POOL_SIZE, MEMORY_DB_MAX_OVERFLOW),
     )
     memory_system.enable()
 
-    print("🤖 Creating Swarms agents...")
+    print("🤖 Creating Swarms agent pool...")
+
+    # Create Personal Shopping Assistant Agents on demand, one per customer
+    def create_shopping_agent(customer_id: str) -> "Agent":
+        return Agent(
+            agent_name=f"shopping-assistant-{customer_id}",
+            model_name="gpt-4o",
+            system_prompt=system_prompt.get(),
+            max_loops=1,
+        )
+
+    agent_pool = AgentPool(
+        create_shopping_agent,
+        max_size=AGENT_POOL_SIZE,
+        window=CONVERSATION_WINDOW,
+        prepare=refresh_agent_prompt,
+    )
+    agent_executor = ThreadPoolExecutor(
+        max_workers=AGENT_WORKERS, thread_name_prefix="swarms-agent"
+    )
 
-    # Get available products for context
-    available_products = []
-    for category, products in PRODUCT_CATALOG.items():
-        for product in products:
-            available_products.append(
-                f"- {product['name']} (${product['price']}) - {product['description']}"
-            )
+    print("✅ Swarms agents and memory system initialized successfully")
+    return True
 
-    products_context = "\n".join(available_products)
 
-    # Create Personal Shopping Assistant Agent
-    shopping_assistant_agent = Agent(
-        model_name="gpt-4o",
-        system_prompt=f"""You are a friendly and knowledgeable personal shopping assistant. Your role is to help customers find products that match their needs, preferences, and budget.
+def shutdown_services():
+    """Wait for in-flight agent turns to finish"""
+    if agent_executor:
+        agent_executor.shutdown(wait=True)
 
-Available Products in Our Store:
-{products_context}
 
-Your capabilities:
-- Help customers find specific products
-- Provide personalized recommendations based on customer history
-- Answer questions about products, prices, and features
-- Assist with comparisons between different products
-- Remember customer preferences for future interactions
+def run_swarms_turn(user_input: str, customer_id: str, streaming_callback=None) -> str:
+    """Run one agent turn for a customer and return the agent's reply.
 
-Guidelines:
-1. Always be friendly, helpful, and conversational
-2. Recommend specific products from our catalog with accurate prices
-3. Ask clarifying questions when needed to better understand customer needs
-4. Be honest about what's available - don't suggest products not in our catalog
-5. Focus on helping customers make informed decisions
-6. Remember customer interactions for personalization
+    With ``streaming_callback`` the agent runs in streaming mode and the
+    callback receives each token as the model produces it.
+    """
+    with agent_pool.session(customer_id) as agent:
+        return run_agent_turn(agent, user_input, customer_id, streaming_callback)
 
-When a customer asks for help, provide tailored recommendations based on their needs.""",
-        max_loops=1,
-    )
 
-    print("✅ Swarms agents and memory system initialized successfully")
-    return True
+def run_agent_turn(
+    agent, user_input: str, customer_id: str, streaming_callback=None
+) -> str:
+    """One turn on an agent whose session the caller holds"""
+    # The customer's recent turns act as context for product retrieval
+    history = getattr(agent.short_memory, "conversation_history", None) or []
+
+    with chat_metrics.stage("retrieval"):
+        recent_context = " ".join(
+            str(message.get("content", "")) for message in history[1:][-2:]
+        )
+        relevant_products = product_retriever.retrieve(user_input, recent_context)
+
+    # Create enhanced input with customer context and relevant products
+    with chat_metrics.stage("prompt_build"):
+        enhanced_input = (
+            f"[Customer ID: {customer_id}] {user_input}\n\n"
+            f"Relevant products in our store:\n{format_products(relevant_products)}"
+        )
+
+    # Run the agent - Memori will automatically handle memory, so its
+    # memory search and write are part of the upstream call stage. Turns
+    # are not shared between customers: each prompt carries the customer's
+    # id and Memori context, and the session lock serializes a customer.
+    with chat_metrics.stage("upstream_call"):
+        if streaming_callback is None:
+            agent.run(enhanced_input)
+        else:
+            agent.streaming_on = True
+            try:
+                agent.run(enhanced_input, streaming_callback=streaming_callback)
+            finally:
+                agent.streaming_on = False
 
+    # Use Swarms' built-in method to get the latest response from conversation history
+    # The session lock guarantees this is the reply to our own turn
+    ai_response = agent.short_memory.get_last_message_as_string()
 
-def search_products_in_catalog(
-    category: Optional[str] = None,
-    max_price: Optional[float] = None,
-    min_rating: Optional[float] = None,
-    query: Optional[str] = None,
-) -> List[Dict]:
-    """Search products in the catalog with filters"""
-    products = []
-
-    # Collect all products
-    for cat_name, cat_products in PRODUCT_CATALOG.items():
-        for product in cat_products:
-            # Apply filters
-            if category and category.lower() not in [
-                cat_name.lower(),
-                product["category"].lower(),
-            ]:
-                continue
-            if max_price and product["price"] > max_price:
-                continue
-            if min_rating and product["rating"] < min_rating:
-                continue
-            if query:
-                query_lower = query.lower()
-                product_text = f"{product['name']} {product['category']} {product['description']} {cat_name}".lower()
-                if query_lower not in product_text:
-                    continue
-
-            products.append(product)
-
-    return products
+    # Fallback if no response is available
+    if not ai_response or ai_response.strip() == "":
+        ai_response = "I apologize, but I couldn't process your request at the moment."
+
+    return ai_response
 
 
 def chat_with_swarms(user_input: str, customer_id: str = "default") -> str:
     """Process user input with Swarms agents and memory"""
-    if not shopping_assistant_agent or not memory_system:
+    if agent_pool is None or not memory_system:
         return "Service not initialized. Please check configuration."
 
     try:
-        # Create enhanced input with customer context
-        enhanced_input = f"[Customer ID: {customer_id}] {user_input}"
+        return run_swarms_turn(user_input, customer_id)
 
-        # Run the agent - Memori will automatically handle memory
-        shopping_assistant_agent.run(enhanced_input)
+    except Exception as e:
+        error_msg = f"Sorry, I encountered an error: {str(e)}"
+        return error_msg
 
-        # Use Swarms' built-in method to get the latest response from conversation history
-        # This avoids hardcoded parsing and uses the framework's intended approach
-        ai_response = shopping_assistant_agent.short_memory.get_last_message_as_string()
 
-        # Fallback if no response is available
-        if not ai_response or ai_response.strip() == "":
-            ai_response = (
-                "I apologize, but I couldn't process your request at the moment."
-            )
+async def stream_chat_with_swarms(
+    user_input: str, customer_id: str = "default"
+) -> AsyncIterator[str]:
+    """Stream SSE events for a chat turn as the agent produces tokens.
+
+    The agent runs on the agent worker pool and hands tokens back to the
+    event loop through a queue. Memori records the turn through its LiteLLM
+    hook once the streamed completion has finished.
+    """
+    loop = asyncio.get_running_loop()
+    tokens = asyncio.Queue()
+
+    def on_token(token: str) -> None:
+        loop.call_soon_threadsafe(tokens.put_nowait, token)
+
+    turn = loop.run_in_executor(
+        agent_executor,
+        contextvars.copy_context().run,
+        run_swarms_turn,
+        user_input,
+        customer_id,
+        on_token,
+    )
+    turn.add_done_callback(lambda _: tokens.put_nowait(None))
 
-        return ai_response
+    streamed = False
+    while True:
+        token = await tokens.get()
+        if token is None:
+            break
+        if token:
+            streamed = True
+            yield sse_event({"token": token})
 
+    try:
+        ai_response = await turn
     except Exception as e:
         error_msg = f"Sorry, I encountered an error: {str(e)}"
-        return error_msg
+        yield sse_event({"detail": error_msg}, event="error")
+        return
+
+    # Agents without token streaming support still deliver the whole reply
+    if not streamed:
+        yield sse_event({"token": ai_response})
+
+    yield sse_event(
+        {"response": ai_response, "timestamp": datetime.now().isoformat()},
+        event="done",
+    )
+
+
+def run_customer_turns(
+    customer_id: str,
+    turns: List[Tuple[int, str]],
+    deliver: Callable[[Dict], None],
+    cancelled: threading.Event,
+) -> None:
+    """Run a customer's batch turns in order, in one agent session.
+
+    Each ``(index, message)`` turn's result is passed to ``deliver`` as soon
+    as it is ready; turns not started when ``cancelled`` is set are skipped.
+    """
+    done = 0
+    try:
+        with agent_pool.session(customer_id) as agent:
+            for index, message in turns:
+                if cancelled.is_set():
+                    return
+                try:
+                    ai_response = run_agent_turn(agent, message, customer_id)
+                except Exception as e:
+                    ai_response = f"Sorry, I encountered an error: {str(e)}"
+                deliver(
+                    {
+                        "index": index,
+                        "customer_id": customer_id,
+                        "response": ai_response,
+                        "timestamp": datetime.now().isoformat(),
+                    }
+                )
+                done += 1
+    except Exception as e:
+        # The session itself failed, every remaining turn gets an error line
+        for index, _message in turns[done:]:
+            deliver({"index": index, "error": str(e)})
+
+
+async def stream_chat_batch(requests: List[ChatRequest]) -> AsyncIterator[str]:
+    """Answer a batch of chat requests as NDJSON lines, in completion order.
+
+    A customer's requests run in batch order in one agent session, so each
+    customer takes their agent (and its lock) once per batch rather than
+    once per request. ``CHAT_BATCH_CONCURRENCY`` customers run at once.
+    """
+    loop = asyncio.get_running_loop()
+    lines: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def deliver(result: Dict) -> None:
+        loop.call_soon_threadsafe(lines.put_nowait, json.dumps(result) + "\n")
+
+    turns_by_customer: Dict[str, List[Tuple[int, str]]] = {}
+    for index, request in enumerate(requests):
+        turns = turns_by_customer.setdefault(request.customer_id, [])
+        turns.append((index, request.message))
+
+    semaphore = asyncio.Semaphore(max(settings.CHAT_BATCH_CONCURRENCY, 1))
+
+    async def run(customer_id: str, turns: List[Tuple[int, str]]) -> None:
+        async with semaphore:
+            await loop.run_in_executor(
+                agent_executor,
+                run_customer_turns,
+                customer_id,
+                turns,
+                deliver,
+                cancelled,
+            )
+
+    tasks = [
+        asyncio.ensure_future(run(customer_id, turns))
+        for customer_id, turns in turns_by_customer.items()
+    ]
+    try:
+        for _ in requests:
+            yield await lines.get()
+    finally:
+        # The client went away (or the batch is done): stop remaining turns
+        cancelled.set()
+        for task in tasks:
+            task.cancel()
+
+
+def sse_event(data: Dict, event: Optional[str] = None) -> str:
+    """Format a server-sent event"""
+    message = f"data: {json.dumps(data)}\n\n"
+    return f"event: {event}\n{message}" if event else message
 
 
 # API Routes
@@ -353,59 +497,66 @@ async def startup_event():
     initialize_services()
 
 
-@app.get("/")
-async def root():
-    """Health check endpoint"""
-    return {"message": "Smart Shopping Assistant API is running", "status": "healthy"}
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Drain agent workers on shutdown"""
+    shutdown_services()
 
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Chat with the shopping assistant"""
-    if not shopping_assistant_agent:
+    if agent_pool is None:
         raise HTTPException(status_code=500, detail="Swarms agents not initialized")
 
-    response = chat_with_swarms(request.message, request.customer_id)
+    # Agent.run() is blocking, keep it off the event loop. The request's
+    # context goes along so stage timings land in its breakdown.
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(
+        agent_executor,
+        contextvars.copy_context().run,
+        chat_with_swarms,
+        request.message,
+        request.customer_id,
+    )
 
     return ChatResponse(response=response, timestamp=datetime.now().isoformat())
 
 
-@app.get("/products", response_model=List[Product])
-async def get_all_products():
-    """Get all available products"""
-    products = []
-    for category_products in PRODUCT_CATALOG.values():
-        products.extend(category_products)
-    return products
-
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Chat with the shopping assistant, streaming tokens as server-sent events"""
+    if agent_pool is None:
+        raise HTTPException(status_code=500, detail="Swarms agents not initialized")
 
-@app.post("/products/search", response_model=List[Product])
-async def search_products(request: ProductSearchRequest):
-    """Search products with filters"""
-    products = search_products_in_catalog(
-        category=request.category,
-        max_price=request.max_price,
-        min_rating=request.min_rating,
-        query=request.query,
+    return StreamingResponse(
+        stream_chat_with_swarms(request.message, request.customer_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return products
 
 
-@app.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: str):
-    """Get a specific product by ID"""
-    for category_products in PRODUCT_CATALOG.values():
-        for product in category_products:
-            if product["id"] == product_id:
-                return product
+@app.post("/chat/batch")
+async def chat_batch(request: ChatBatchRequest):
+    """Answer many chat requests, streaming results back as NDJSON.
 
-    raise HTTPException(status_code=404, detail="Product not found")
-
-
-@app.get("/categories")
-async def get_categories():
-    """Get all product categories"""
-    return {"categories": list(PRODUCT_CATALOG.keys())}
+    One line per request, in completion order:
+    ``{"index": ..., "customer_id": ..., "response": ..., "timestamp": ...}``
+    where ``index`` is the request's position in the batch.
+    """
+    if agent_pool is None:
+        raise HTTPException(status_code=500, detail="Swarms agents not initialized")
+    if len(request.requests) > settings.CHAT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large, at most {settings.CHAT_BATCH_MAX_SIZE} requests",
+        )
+
+    return StreamingResponse(
+        stream_chat_batch(request.requests),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/memory/search")
@@ -48,18 +48,29 @@ const ChatWidget = forwardRef<ChatWidgetRef>((props, ref) => {
   const inputRef = useRef<HTMLInputElement>(null);
   const { toast } = useToast();
 
-  // Mutation for sending messages to API
+  // Mutation for sending messages to API, the reply is streamed token by token
   const sendMessageMutation = useMutation({
-    mutationFn: (message: string) => apiService.sendMessage(message),
-    onSuccess: (response: ChatResponse) => {
+    mutationFn: async (message: string) => {
+      const aiMessageId = Date.now().toString() + '-ai';
+      const response = await apiService.streamMessage(message, (token) => {
+        setMessages(prev => {
+          if (!prev.some(m => m.id === aiMessageId)) {
+            return [...prev, { id: aiMessageId, content: token, sender: "ai", timestamp: new Date() }];
+          }
+          return prev.map(m => m.id === aiMessageId ? { ...m, content: m.content + token } : m);
+        });
+      });
+      return { aiMessageId, response };
+    },
+    onSuccess: ({ aiMessageId, response }: { aiMessageId: string; response: ChatResponse }) => {
       const aiMessage: Message = {
-        id: Date.now().toString() + '-ai',
+        id: aiMessageId,
         content: response.response,
         sender: "ai",
         timestamp: new Date(response.timestamp),
         suggestions: generateSuggestions(response.response)
       };
-      setMessages(prev => [...prev, aiMessage]);
+      setMessages(prev => [...prev.filter(m => m.id !== aiMessageId), aiMessage]);
     },
     onError: (error) => {
       console.error('Error sending message:', error);
@@ -255,8 +266,8 @@ const ChatWidget = forwardRef<ChatWidgetRef>((props, ref) => {
                       </div>
                     ))}
 
-                    {/* Typing Indicator */}
-                    {sendMessageMutation.isPending && (
+                    {/* Typing Indicator - shown until the first streamed token arrives */}
+                    {sendMessageMutation.isPending && messages[messages.length - 1]?.sender === "user" && (
                       <div className="flex gap-2">
                         <div className="p-1 rounded-full gradient-primary flex-shrink-0 mt-1">
                           <Bot className="h-3 w-3 text-white" />
@@ -22,6 +22,11 @@ export interface ChatResponse {
   timestamp: string;
 }
 
+export interface ProductPage {
+  products: Product[];
+  nextCursor: string | null;
+}
+
 export interface ProductSearchRequest {
   category?: string;
   max_price?: number;
@@ -49,6 +54,61 @@ class ApiService {
     }
   }
 
+  async streamMessage(
+    message: string,
+    onToken: (token: string) => void,
+    customerId: string = 'default'
+  ): Promise<ChatResponse> {
+    try {
+      const response = await fetch(`${this.baseURL}/chat/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          Accept: 'text/event-stream',
+        },
+        body: JSON.stringify({ message, customer_id: customerId }),
+      });
+      if (!response.ok || !response.body) {
+        throw new Error(`Unexpected response status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Server-sent events are separated by a blank line
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+          const rawEvent = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf('\n\n');
+
+          let event = 'message';
+          let data = '';
+          for (const line of rawEvent.split('\n')) {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) data += line.slice(5).trim();
+          }
+          if (!data) continue;
+
+          const payload = JSON.parse(data);
+          if (event === 'error') throw new Error(payload.detail);
+          if (event === 'done') return payload as ChatResponse;
+          onToken(payload.token);
+        }
+      }
+      throw new Error('Stream ended before the response completed');
+    } catch (error) {
+      console.error('Error streaming message:', error);
+      throw new Error('Failed to send message');
+    }
+  }
+
   async getProducts(): Promise<Product[]> {
     try {
       const response = await axios.get(`${this.baseURL}/products`);
@@ -59,6 +119,21 @@ class ApiService {
     }
   }
 
+  async getProductsPage(cursor?: string, limit: number = 24): Promise<ProductPage> {
+    try {
+      const response = await axios.get(`${this.baseURL}/products`, {
+        params: { cursor, limit }
+      });
+      return {
+        products: response.data,
+        nextCursor: response.headers['x-next-cursor'] || null,
+      };
+    } catch (error) {
+      console.error('Error fetching products:', error);
+      throw new Error('Failed to fetch products');
+    }
+  }
+
   async searchProducts(filters: ProductSearchRequest): Promise<Product[]> {
     try {
       const response = await axios.post(`${this.baseURL}/products/search`, filters);
@@ -1,5 +1,5 @@
 import { useState, useEffect } from "react";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery, useQuery } from "@tanstack/react-query";
 import { Search, Grid, List, Star, Heart, ShoppingCart, Loader2 } from "lucide-react";
 import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
@@ -24,11 +24,21 @@ const Products = () => {
   });
   const { toast } = useToast();
 
-  // Fetch products
-  const { data: products = [], isLoading: productsLoading, error: productsError } = useQuery({
+  // Fetch products one page at a time
+  const {
+    data: productPages,
+    isLoading: productsLoading,
+    error: productsError,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ['products'],
-    queryFn: () => apiService.getProducts(),
+    queryFn: ({ pageParam }) => apiService.getProductsPage(pageParam),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.nextCursor ?? undefined,
   });
+  const products = productPages?.pages.flatMap(page => page.products) ?? [];
 
   // Fetch categories
   const { data: categoriesData = [], isLoading: categoriesLoading } = useQuery({
@@ -240,6 +250,21 @@ const Products = () => {
             ))}
           </div>
         )}
+
+        {/* Load more (only when browsing the full catalog) */}
+        {!isLoading && displayProducts === products && hasNextPage && (
+          <div className="flex justify-center mt-8">
+            <Button
+              variant="outline"
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="glass"
+            >
+              {isFetchingNextPage && <Loader2 className="h-4 w-4 mr-2 animate-spin" />}
+              Load more
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );